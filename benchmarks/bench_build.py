@@ -0,0 +1,169 @@
+"""Benchmark of full site builds on a synthetic site.
+
+Generates a site with site_generator.py and times, through the same
+SiteBuilder used by pyssg -b:
+
+    cold: first build, nothing in dst, the db or the cache.
+    noop: build again without changes (a new SiteBuilder, as a new run).
+    edit: build again after appending a paragraph to a single post.
+
+Each build is done --repeat times on a fresh site and the best time is
+kept. The results are appended to a JSON lines file along with the pyssg
+version and the parameters, and compared with the last stored results
+for the same parameters, so regressions show up across versions. The
+times only make sense on the same machine, so the file is kept outside
+of the repo, in $XDG_CACHE_HOME/pyssg by default (to compare against
+another checkout, point --results to the same file). Run with:
+
+    python benchmarks/bench_build.py [--posts N] [--jobs N] [--help]
+"""
+from __future__ import annotations
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+from datetime import datetime, timezone
+from importlib.metadata import version
+from logging import getLogger, ERROR
+from typing import Any
+
+from pyssg.configuration import get_parsed_config, get_static_config
+from pyssg.site_builder import SiteBuilder
+
+# benchmarks is not a package, run as a script
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from site_generator import (add_site_arguments, get_site_params,  # noqa: E402
+                            generate_site, get_post_path)
+
+DEFAULT_RESULTS_PATH: str = os.path.join(
+    os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')),
+    'pyssg', 'bench_results.jsonl')
+BUILDS: list[str] = ['cold', 'noop', 'edit']
+
+
+# same as pyssg does for each config document before building
+def get_config(config_path: str) -> dict[str, Any]:
+    config: dict[str, Any] = get_parsed_config(config_path)[0]
+    static_config: dict[str, Any] = get_static_config()
+    config['fmt']['rss_date'] = static_config['fmt']['rss_date']
+    config['fmt']['sitemap_date'] = static_config['fmt']['sitemap_date']
+    config['info'] = dict(version=static_config['info']['version'],
+                          debug='False')
+    return config
+
+
+def time_build(config_path: str, jobs: int, incremental: bool) -> float:
+    # the config is read and the builder created on every run of pyssg,
+    #   so they are part of the time too
+    start: float = time.perf_counter()
+    SiteBuilder(get_config(config_path), jobs, incremental).build()
+    return time.perf_counter() - start
+
+
+def edit_post(site_path: str, params: dict[str, int]) -> None:
+    post_path: str = os.path.join(site_path, 'src',
+                                  get_post_path(params,
+                                                params['posts'] // 2))
+    with open(post_path, 'a') as f:
+        f.write('\nAn extra paragraph, added by the benchmark.\n')
+
+
+# best time of each build
+def run(params: dict[str, int],
+        jobs: int,
+        incremental: bool,
+        repeat: int) -> dict[str, float]:
+    best: dict[str, float] = {b: float('inf') for b in BUILDS}
+    for _ in range(repeat):
+        site_path: str = tempfile.mkdtemp(prefix='pyssg-bench-')
+        try:
+            config_path: str = generate_site(site_path, params)
+            times: dict[str, float] = dict()
+            times['cold'] = time_build(config_path, jobs, incremental)
+            times['noop'] = time_build(config_path, jobs, incremental)
+            edit_post(site_path, params)
+            times['edit'] = time_build(config_path, jobs, incremental)
+        finally:
+            shutil.rmtree(site_path)
+        for b in BUILDS:
+            best[b] = min(best[b], times[b])
+    return best
+
+
+# last stored result with the same parameters, if any
+def get_previous(results_path: str,
+                 record: dict[str, Any]) -> dict[str, Any] | None:
+    if not os.path.exists(results_path):
+        return None
+    previous: dict[str, Any] | None = None
+    with open(results_path, 'r') as f:
+        for line in f:
+            r: dict[str, Any] = json.loads(line)
+            if r['params'] == record['params'] and \
+                    r['jobs'] == record['jobs'] and \
+                    r['incremental'] == record['incremental']:
+                previous = r
+    return previous
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description='benchmark pyssg builds on a synthetic site')
+    add_site_arguments(parser)
+    parser.add_argument('--jobs', default=1, type=int,
+                        help='same as pyssg --jobs; defaults to 1')
+    parser.add_argument('--no-incremental', action='store_true',
+                        help='''build without --incremental, so every build
+                        parses all the MD files again''')
+    parser.add_argument('--repeat', default=3, type=int,
+                        help='times each build is done; defaults to 3')
+    parser.add_argument('--results', default=DEFAULT_RESULTS_PATH,
+                        help=f'''file the results are appended to; defaults
+                        to {DEFAULT_RESULTS_PATH}''')
+    parser.add_argument('--no-save', action='store_true',
+                        help='only show the results, don\'t store them')
+    args: argparse.Namespace = parser.parse_args()
+
+    # the build summaries would get in the way of the results
+    getLogger('pyssg').setLevel(ERROR)
+    params: dict[str, int] = get_site_params(args)
+    incremental: bool = not args.no_incremental
+    best: dict[str, float] = run(params, args.jobs, incremental, args.repeat)
+
+    record: dict[str, Any] = dict(version=version('pyssg'),
+                                  python=platform.python_version(),
+                                  date=datetime.now(timezone.utc).isoformat(),
+                                  params=params,
+                                  jobs=args.jobs,
+                                  incremental=incremental,
+                                  repeat=args.repeat,
+                                  times=best)
+    previous: dict[str, Any] | None = get_previous(args.results, record)
+
+    print(f'pyssg {record["version"]}, {params["posts"]} posts,'
+          f' {args.jobs} job(s), incremental: {incremental}')
+    header: str = f'{"build":>6} {"time (s)":>10}'
+    if previous is not None:
+        header += f' {previous["version"]:>16} {"change":>8}'
+    print(header)
+    for b in BUILDS:
+        line: str = f'{b:>6} {best[b]:>10.4f}'
+        if previous is not None:
+            old: float = previous['times'][b]
+            line += f' {old:>16.4f} {(best[b] - old) / old:>+8.1%}'
+        print(line)
+
+    if not args.no_save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.results)),
+                    exist_ok=True)
+        with open(args.results, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Benchmark of utils.get_dir_structure against the number of directories.
+
+Compares the current implementation with the previous list based one
+(kept here only for reference), which was quadratic on the number of
+directories. Run with:
+
+    python benchmarks/bench_dir_structure.py [dir counts...]
+"""
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Callable
+
+from pyssg.utils import get_dir_structure
+
+
+# previous implementation, for comparison
+def list_dir_structure(path: str,
+                       exclude: list[str] = []) -> list[str]:
+    dir_list: list[str] = []
+    for root, dirs, _ in os.walk(path):
+        if exclude != []:
+            dirs[:] = [d for d in dirs if d not in exclude]
+        for d in dirs:
+            if root in dir_list:
+                dir_list.remove(root)
+            dir_list.append(os.path.join(root, d))
+    return [d.replace(path, '')[1:] for d in dir_list]
+
+
+# half of the dirs are at the top level, each with one subdir, so every
+#   top level dir goes in and out of the list
+def create_tree(path: str, dir_count: int) -> None:
+    for i in range(dir_count // 2):
+        os.makedirs(os.path.join(path, f'd{i}', 'sub'))
+
+
+def get_time(func: Callable[..., Any], path: str, repeat: int = 3) -> float:
+    best: float = float('inf')
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        func(path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    dir_counts: list[int] = [int(n) for n in sys.argv[1:]] \
+        or [1000, 4000, 16000, 32000]
+    print(f'{"dirs":>8} {"list (s)":>10} {"set (s)":>10} {"speedup":>8}')
+    for dir_count in dir_counts:
+        with tempfile.TemporaryDirectory() as path:
+            create_tree(path, dir_count)
+            assert list_dir_structure(path) == get_dir_structure(path)
+            old: float = get_time(list_dir_structure, path)
+            new: float = get_time(get_dir_structure, path)
+            print(f'{dir_count:>8} {old:>10.4f} {new:>10.4f}'
+                  f' {old / new:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""Synthetic site generator for the build benchmarks.
+
+Generates a site (sources, the bundled templates and a config file) of
+a given size, so builds can be timed on something close to a real site
+without depending on one. The output only depends on the arguments,
+including the file modification times. Run with:
+
+    python benchmarks/site_generator.py PATH [--posts N] [--help]
+"""
+import os
+import random
+import argparse
+from importlib.resources import path as rpath
+
+from pyssg.utils import copy_file
+
+TEMPLATES: list[str] = ['index.html', 'page.html', 'tag.html', 'rss.xml',
+                        'sitemap.xml']
+
+# same for every site, so the timestamps don't depend on when it's generated
+BASE_TIMESTAMP: int = 1600000000
+
+
+# size of the generated site
+DEFAULT_PARAMS: dict[str, int] = {
+    # number of md files
+    'posts': 500,
+    'tags_per_post': 3,
+    # number of different tags used
+    'tags': 20,
+    # depth of the directories the posts are placed in, 0 for all of them
+    #   directly under each dir_path
+    'depth': 2,
+    # number of dirs.* entries, the first one is "/"
+    'dir_paths': 1,
+    # number of paragraphs of each post
+    'paragraphs': 10,
+    # number of html files copied as they are
+    'html_files': 10,
+    'seed': 0}
+
+
+def _get_paragraph(rnd: random.Random, i: int) -> str:
+    words: list[str] = [rnd.choice(['lorem', 'ipsum', 'dolor', 'sit', 'amet',
+                                    'consectetur', 'adipiscing', 'elit',
+                                    'sed', 'do', 'eiusmod', 'tempor'])
+                        for _ in range(60)]
+    # a bit of everything the md extensions handle
+    extras: list[str] = ['*emphasis*', '**strong**', '`code`',
+                         '[link](https://example.com)', '==mark==',
+                         '^^insert^^', '~~delete~~', '"quotes"',
+                         f'footnote[^{i}]']
+    words.insert(rnd.randrange(len(words)), rnd.choice(extras))
+    return ' '.join(words)
+
+
+def _get_post(rnd: random.Random, params: dict[str, int], i: int) -> str:
+    tags: list[str] = rnd.sample([f'tag{t}' for t in range(params['tags'])],
+                                 min(params['tags_per_post'], params['tags']))
+    lines: list[str] = [f'title: Post {i}',
+                        'author: Someone',
+                        f'summary: Summary of post {i}.',
+                        'tags: ' + '\n    '.join(tags),
+                        '']
+    for p in range(params['paragraphs']):
+        if p % 4 == 0:
+            lines.extend([f'## Section {p}', ''])
+        lines.extend([_get_paragraph(rnd, p), ''])
+        if p % 5 == 4:
+            lines.extend(['- [x] done', '- [ ] todo', '- item', ''])
+        if p % 7 == 6:
+            lines.extend(['```python', 'print("hello")', '```', ''])
+    lines.extend([f'[^{p}]: Footnote {p}.'
+                  for p in range(params['paragraphs'])])
+    return '\n'.join(lines) + '\n'
+
+
+def _get_config(path: str, params: dict[str, int]) -> str:
+    lines: list[str] = ['%YAML 1.2',
+                        '---',
+                        'title: "Benchmark"',
+                        'path:',
+                        f'  src: "{path}/src"',
+                        f'  dst: "{path}/dst"',
+                        f'  plt: "{path}/plt"',
+                        f'  db: "{path}/.files"',
+                        'url:',
+                        '  main: "https://example.com"',
+                        '  static: "https://static.example.com"',
+                        'fmt:',
+                        '  date: "%a, %b %d, %Y @ %H:%M %Z"',
+                        '  list_date: "%b %d"',
+                        '  list_sep_date: "%B %Y"',
+                        'dirs:']
+    for dir_path in get_dir_paths(params):
+        lines.extend([f'  {dir_path}:',
+                      '    cfg:',
+                      '      plt: "page.html"',
+                      '      tags: True',
+                      '      index: True',
+                      '      rss: True',
+                      '      sitemap: True'])
+    lines.append('...')
+    return '\n'.join(lines) + '\n'
+
+
+def get_dir_paths(params: dict[str, int]) -> list[str]:
+    return ['/'] + [f'section{d}' for d in range(1, params['dir_paths'])]
+
+
+# relative to src
+def get_post_path(params: dict[str, int], i: int) -> str:
+    dir_paths: list[str] = get_dir_paths(params)
+    dir_path: str = dir_paths[i % len(dir_paths)]
+    parts: list[str] = [] if dir_path == '/' else [dir_path]
+    # spread the posts over depth levels of 4 subdirs each
+    for level in range(i % (params['depth'] + 1)):
+        parts.append(f'd{level}_{(i // (level + 1)) % 4}')
+    return os.path.join(*parts, f'post{i}.md')
+
+
+# returns the path of the config file
+def generate_site(path: str, params: dict[str, int]) -> str:
+    path = os.path.abspath(path)
+    rnd: random.Random = random.Random(params['seed'])
+    src: str = os.path.join(path, 'src')
+    plt: str = os.path.join(path, 'plt')
+    os.makedirs(src, exist_ok=True)
+    os.makedirs(plt, exist_ok=True)
+    for t in TEMPLATES:
+        with rpath('pyssg.plt', t) as p:
+            copy_file(str(p), os.path.join(plt, t))
+
+    for i in range(params['posts']):
+        post_path: str = os.path.join(src, get_post_path(params, i))
+        os.makedirs(os.path.dirname(post_path), exist_ok=True)
+        with open(post_path, 'w') as f:
+            f.write(_get_post(rnd, params, i))
+        timestamp: int = BASE_TIMESTAMP + i * 3600
+        os.utime(post_path, (timestamp, timestamp))
+
+    for i in range(params['html_files']):
+        html_path: str = os.path.join(src, 'static', f'file{i}.html')
+        os.makedirs(os.path.dirname(html_path), exist_ok=True)
+        with open(html_path, 'w') as f:
+            f.write(f'<p>{_get_paragraph(rnd, i)}</p>\n')
+
+    config_path: str = os.path.join(path, 'config.yaml')
+    with open(config_path, 'w') as f:
+        f.write(_get_config(path, params))
+    return config_path
+
+
+def add_site_arguments(parser: argparse.ArgumentParser) -> None:
+    for param, default in DEFAULT_PARAMS.items():
+        parser.add_argument(f'--{param.replace("_", "-")}',
+                            default=default,
+                            type=int,
+                            help=f'defaults to {default}')
+
+
+def get_site_params(args: argparse.Namespace) -> dict[str, int]:
+    return {param: getattr(args, param) for param in DEFAULT_PARAMS.keys()}
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description='generate a synthetic site for benchmarking pyssg')
+    parser.add_argument('path', help='directory to generate the site in')
+    add_site_arguments(parser)
+    args: argparse.Namespace = parser.parse_args()
+    config_path: str = generate_site(args.path, get_site_params(args))
+    print(f'generated site, build it with: pyssg -c {config_path} -b')
+
+
+if __name__ == '__main__':
+    main()
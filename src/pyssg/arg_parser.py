@@ -30,6 +30,94 @@ def get_parser() -> ArgumentParser:
                         help='''generates all HTML files by parsing MD files
                         present in source directory and copies over manually
                         written HTML files''')
+    parser.add_argument('-w', '--watch',
+                        action='store_true',
+                        help='''builds the site and keeps watching the source
+                        and template directories, rebuilding (incrementally)
+                        on changes''')
+    parser.add_argument('-s', '--serve',
+                        action='store_true',
+                        help='''same as --watch, but also serves the built
+                        site locally, reloading the open pages after every
+                        rebuild; one port per config document, starting
+                        from --port''')
+    parser.add_argument('--host',
+                        default='localhost',
+                        type=str,
+                        help='''host (address) used by --serve; defaults to
+                        localhost''')
+    parser.add_argument('--port',
+                        default=8000,
+                        type=int,
+                        help='''first port used by --serve; defaults to
+                        8000''')
+    parser.add_argument('-j', '--jobs',
+                        default=1,
+                        type=int,
+                        help='''number of processes used to parse MD files and
+                        render the templates; 0 uses all available CPUs;
+                        defaults to 1''')
+    parser.add_argument('--incremental',
+                        action='store_true',
+                        help='''reuse the cached HTML of MD files that haven't
+                        changed since the last build, instead of parsing
+                        them again''')
+    parser.add_argument('--clear-cache',
+                        action='store_true',
+                        help='''removes the cache directory before doing
+                        anything else''')
+    parser.add_argument('--cache-size',
+                        default=256,
+                        type=int,
+                        help='''maximum size (in MiB) of the cache of parsed
+                        MD files, least recently used files are removed
+                        first; defaults to 256''')
+    parser.add_argument('--paranoid',
+                        action='store_true',
+                        help='''always calculate the checksum of the MD files
+                        to detect changes, instead of trusting their size,
+                        modification time and inode''')
+    parser.add_argument('--checksum',
+                        default='md5',
+                        choices=['md5', 'blake2b'],
+                        help='''checksum algorithm used for new or modified MD
+                        files, blake2b is faster on 64 bit platforms; existing
+                        checksums are updated the next time they're checked;
+                        defaults to md5''')
+    parser.add_argument('--fsync',
+                        action='store_true',
+                        help='''flush all written files to disk once the build
+                        finishes, so they survive a power loss; files are
+                        always replaced atomically''')
+    parser.add_argument('--gc-dry-run',
+                        action='store_true',
+                        help='''only list the stale db entries (without a
+                        source file) and orphaned files (not produced anymore)
+                        instead of removing them; the build itself still
+                        renders and writes the files as usual''')
+    parser.add_argument('--profile',
+                        action='store_true',
+                        help='''time each stage of the build (scanning,
+                        hashing, MD parsing, metadata, rendering and writing)
+                        for each file and show the totals and the slowest
+                        files and templates once it finishes''')
+    parser.add_argument('--profile-top',
+                        default=10,
+                        type=int,
+                        help='''number of slowest files and templates shown
+                        by --profile; defaults to 10''')
+    parser.add_argument('--profile-output',
+                        help='''also write the --profile timings to this file,
+                        in chrome trace (JSON) format, it can be opened with
+                        chrome://tracing or https://ui.perfetto.dev; implies
+                        --profile''')
+    parser.add_argument('--md-ext-stats',
+                        action='store_true',
+                        help='''measure the time spent by each MD extension
+                        (pre, block, inline, tree and post processors) on all
+                        the MD files and show it once the build finishes; the
+                        MD files are parsed again (not taken from the cache)
+                        and by a single process''')
     parser.add_argument('--debug',
                         action='store_true',
                         help='''change logging level from info to debug''')
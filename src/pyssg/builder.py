@@ -1,28 +1,117 @@
+from __future__ import annotations
 import os
 import sys
+import threading
 from copy import deepcopy
-from operator import itemgetter
+from collections import ChainMap
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_all_start_methods, get_context
 from logging import Logger, getLogger
+from hashlib import md5
+from typing import IO, Any, Mapping
 
-from jinja2 import Environment, Template, FileSystemLoader as FSLoader
+from jinja2 import (Environment, Template, FileSystemLoader as FSLoader,
+                    FileSystemBytecodeCache)
+from jinja2.environment import TemplateStream
 
-from .utils import get_file_list, get_dir_structure, create_dir, copy_file
+from .utils import create_dir, copy_file, atomic_open, get_tmp_path
+from .scanner import DirScan, scan_dir
 from .database import Database
+from .manifest import Manifest
+from .deps import DepGraph, get_digest, get_template_deps
+from .cache import RenderCache
 from .md_parser import MDParser
 from .page import Page
+from .profiler import profiler, ProfileEvent
+from .pagination import Pagination, Feed, paginate, get_page_file_name
 
 log: Logger = getLogger(__name__)
 
+# kind of render (page, tag, index, feed or common), template name, file name,
+#   index of the page or tag in all_files or all_tags (-1 for the main
+#   feed) and page number (starting from 0) for paginated listings
+RenderJob = tuple[str, str, str, int, int]
+
+# file name relative to path.dst, checksum of the content
+#   and if it was actually written
+RenderResult = tuple[str, str, bool]
+
+# rendered files bigger than this (in bytes) are streamed to disk
+#   instead of kept in memory (rss, sitemap and big index pages)
+STREAM_THRESHOLD: int = 1024 * 1024
+# number of pieces yielded by jinja joined at a time when rendering
+STREAM_BUFFER_ITEMS: int = 256
+
+# variables that depend on all pages
+_SITE_VARS: set[str] = {'all_pages', 'tag_index'}
+# variables that only depend on the tags (and their number of pages)
+_TAG_VARS: set[str] = {'all_tags', 'tag_counts'}
+
+# set to the builder right before forking the render workers, so they get
+#   a shared read-only (copy on write) view of it and its common_vars,
+#   instead of a pickled copy per job
+_render_builder: 'Builder | None' = None
+
+
+# forking with other threads running (serve mode rebuilds in one) can
+#   deadlock the workers, the files are rendered serially then
+def _can_fork() -> bool:
+    return 'fork' in get_all_start_methods() \
+        and threading.active_count() == 1
+
+
+# the profiling events (if any) are sent back with the result
+def _render_worker(job: RenderJob) -> tuple[RenderResult, list[ProfileEvent]]:
+    if _render_builder is None:
+        raise RuntimeError('render worker used without a builder')
+    return _render_builder.render_job(job), profiler.pop_events()
+
+
+# bytecode_cache_path is where the compiled templates are kept between runs
+def get_jinja_env(config: dict,
+                  bytecode_cache_path: str | None = None) -> Environment:
+    log.debug('initializing the jinja environment')
+    bytecode_cache: FileSystemBytecodeCache | None = None
+    if bytecode_cache_path is not None:
+        os.makedirs(bytecode_cache_path, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(bytecode_cache_path)
+    # the autoescape option could be a security risk if used in a dynamic
+    # website, as far as i can tell
+    return Environment(loader=FSLoader(config['path']['plt']),
+                       autoescape=False,
+                       trim_blocks=True,
+                       lstrip_blocks=True,
+                       bytecode_cache=bytecode_cache)
+
 
 # TODO: need to better handle when using dir_path other than "/", as the "dir_path" is removed
 class Builder:
     def __init__(self, config: dict,
                  db: Database,
-                 dir_path: str) -> None:
+                 dir_path: str,
+                 cache: RenderCache | None = None,
+                 jobs: int = 1,
+                 manifest: Manifest | None = None,
+                 deps: DepGraph | None = None,
+                 outputs: dict[str, bytes] | None = None,
+                 env: Environment | None = None,
+                 md_ext_stats: bool = False) -> None:
         log.debug('initializing site builder')
         self.config: dict = config
         self.db: Database = db
         self.dir_path: str = dir_path
+        self.cache: RenderCache | None = cache
+        self.jobs: int = jobs
+        # only write the files that actually changed
+        self.manifest: Manifest | None = manifest
+        # only used to skip rendering on incremental builds,
+        #   but always kept up to date
+        self.deps: DepGraph | None = deps
+        # rendered content by file name (relative to path.dst), used by the
+        #   preview server to serve the files before they hit the disk
+        self.outputs: dict[str, bytes] | None = outputs
+        # measure the time spent by each md extension
+        self.md_ext_stats: bool = md_ext_stats
 
         if self.dir_path not in self.config['dirs']:
             log.error('couldn\'t find "dirs.%s" attribute in config file', self.dir_path)
@@ -45,14 +134,18 @@ class Builder:
             self.dir_cfg['dst'] = os.path.join(self.config['path']['dst'], self.dir_path)
             self.dir_cfg['url'] = f'{self.config["url"]["main"]}/{self.dir_path}'
 
-        # the autoescape option could be a security risk if used in a dynamic
-        # website, as far as i can tell
-        log.debug('initializing the jinja environment')
-        self.env: Environment = Environment(loader=FSLoader(self.config['path']['plt']),
-                                            autoescape=False,
-                                            trim_blocks=True,
-                                            lstrip_blocks=True)
+        # subdirectories with their own dirs.* entry are built by that one
+        self.owned_dirs: list[str] = self.__get_owned_dirs()
+
+        # usually shared by all the builders of a config
+        self.env: Environment = env if env is not None \
+            else get_jinja_env(self.config)
+        # templates used in the current build, looking them up in the env
+        #   checks if they changed on disk every time
+        self.templates: dict[str, Template] = dict()
 
+        self.parser: MDParser | None = None
+        self.scan: DirScan
         self.dirs: list[str]
         self.md_files: list[str]
         self.html_files: list[str]
@@ -60,10 +153,21 @@ class Builder:
         # files and pages are synoyms
         self.all_files: list[Page]
         self.all_tags: list[tuple[str, str]]
+        self.tag_index: dict[str, list[Page]]
         self.common_vars: dict
 
-    def build(self) -> None:
+        # digests of the inputs of the rendered files
+        self.config_digest: str
+        self.site_digest: str
+        self.tags_digest: str
+        self.page_digests: dict[str, str]
+        self.template_deps: dict[str, tuple[list[str], set[str], str]]
+
+    # src_scan is a scan of the whole path.src, shared by all dir_paths
+    def build(self, src_scan: DirScan | None = None) -> None:
         log.debug('building site for dir path "%s"', self.dir_path)
+        # the templates could've changed since the last build
+        self.templates = dict()
         if 'exclude_dirs' not in self.dir_cfg:
             log.debug('"exclude_dirs" field not found in "dirs.%s.cfg"', self.dir_path)
             self.dir_cfg['exclude_dirs'] = []
@@ -71,28 +175,46 @@ class Builder:
             log.error('"exclude_dirs" field in "dirs.%s.cfg" isn\'t of type "list"', self.dir_path)
             sys.exit(1)
 
-        self.dirs = get_dir_structure(self.dir_cfg['src'],
-                                      self.dir_cfg['exclude_dirs'])
-        self.md_files = get_file_list(self.dir_cfg['src'],
-                                      ('.md',),
-                                      self.dir_cfg['exclude_dirs'])
-        self.html_files = get_file_list(self.dir_cfg['src'],
-                                        ('.html',),
-                                        self.dir_cfg['exclude_dirs'])
+        if src_scan is None:
+            self.scan = scan_dir(self.dir_cfg['src'],
+                                 self.dir_cfg['exclude_dirs']) \
+                .get_subtree('', [], self.owned_dirs)
+        else:
+            self.scan = src_scan.get_subtree(
+                os.path.relpath(self.dir_cfg['src'],
+                                self.config['path']['src']),
+                self.dir_cfg['exclude_dirs'],
+                self.owned_dirs)
+        # all dirs instead of only the leaves, the result is the same
+        self.dirs = self.scan.dirs
+        self.md_files = self.scan.get_files(('.md',))
+        self.html_files = self.scan.get_files(('.html',))
 
         self.__create_dir_structure()
         self.__copy_html_files()
 
         # TODO: check if need to pass dirs.dir_path.files
-        parser: MDParser = MDParser(self.md_files,
-                                    self.config,
-                                    self.dir_cfg,
-                                    self.db)
-        parser.parse_files()
+        # the parser (and its md object) is kept between builds
+        if self.parser is None:
+            self.parser = MDParser(self.md_files,
+                                   self.config,
+                                   self.dir_cfg,
+                                   self.db,
+                                   self.cache,
+                                   self.jobs,
+                                   self.scan.stats,
+                                   self.md_ext_stats)
+        else:
+            self.parser.files = self.md_files
+            self.parser.stats = self.scan.stats
+        parser: MDParser = self.parser
+        with profiler.span('parse', self.dir_path):
+            parser.parse_files()
 
         # just so i don't have to pass these vars to all the functions
         self.all_files = parser.all_files
         self.all_tags = parser.all_tags
+        self.tag_index = parser.tag_index
 
         # TODO: check if need to pass dirs.dir_path.files
         # dict for the keyword args to pass to the template renderer
@@ -100,31 +222,68 @@ class Builder:
         self.common_vars = dict(config=self.config,
                                 dir_config=self.dir_cfg,
                                 all_pages=self.all_files,
-                                all_tags=self.all_tags)
+                                all_tags=self.all_tags,
+                                tag_index=self.tag_index,
+                                tag_counts=parser.tag_counts)
+
+        if self.deps is not None:
+            self.__init_digests(parser.md_fingerprint, parser.env_digests)
 
-        self.__render_pages(self.dir_cfg['plt'])
+        jobs: list[RenderJob] = self.__get_page_jobs(self.dir_cfg['plt'])
 
         if self.dir_cfg['tags']:
             log.debug('rendering tags for dir_path "%s"', self.dir_path)
             create_dir(os.path.join(self.dir_cfg['dst'], 'tag'), True, True)
             if isinstance(self.dir_cfg['tags'], str):
-                self.__render_tags(self.dir_cfg['tags'])
+                jobs.extend(self.__get_tag_jobs(self.dir_cfg['tags']))
             else:
-                self.__render_tags('tag.html')
-
-        default_plts: dict[str, str] = {'index': 'index.html',
-                                        'rss': 'rss.xml',
-                                        'sitemap': 'sitemap.xml'}
-        for opt in default_plts.keys():
-            if self.dir_cfg[opt]:
-                if isinstance(self.dir_cfg[opt], str):
-                    self.__render_template(self.dir_cfg[opt],
-                                           default_plts[opt],
-                                           **self.common_vars)
-                else:
-                    self.__render_template(default_plts[opt],
-                                           default_plts[opt],
-                                           **self.common_vars)
+                jobs.extend(self.__get_tag_jobs('tag.html'))
+
+        if self.dir_cfg['rss']:
+            log.debug('rendering feeds for dir_path "%s"', self.dir_path)
+            if isinstance(self.dir_cfg['rss'], str):
+                jobs.extend(self.__get_feed_jobs(self.dir_cfg['rss']))
+            else:
+                jobs.extend(self.__get_feed_jobs('rss.xml'))
+
+        if self.dir_cfg['index']:
+            log.debug('rendering index for dir_path "%s"', self.dir_path)
+            if isinstance(self.dir_cfg['index'], str):
+                jobs.extend(self.__get_index_jobs(self.dir_cfg['index']))
+            else:
+                jobs.extend(self.__get_index_jobs('index.html'))
+
+        if self.dir_cfg['sitemap']:
+            if isinstance(self.dir_cfg['sitemap'], str):
+                jobs.append(('common',
+                             self.dir_cfg['sitemap'],
+                             'sitemap.xml',
+                             0, 0))
+            else:
+                jobs.append(('common',
+                             'sitemap.xml',
+                             'sitemap.xml',
+                             0, 0))
+
+        self.__render_jobs(jobs)
+
+    # paths (relative to this dir_path src) of the other dir_paths inside
+    #   of this one, so each file is only built once
+    def __get_owned_dirs(self) -> list[str]:
+        owned_dirs: list[str] = []
+        for dir_path in self.config['dirs'].keys():
+            if dir_path == self.dir_path:
+                continue
+            # same as dir_cfg['src'], but for the other dir_path
+            src: str = self.config['path']['src'] \
+                if dir_path.strip() == '/' \
+                else os.path.join(self.config['path']['src'], dir_path)
+            rel: str = os.path.relpath(src, self.dir_cfg['src'])
+            if rel != '.' and rel != '..' and not rel.startswith('../'):
+                log.debug('"%s" is built by dir_path "%s", skipping it',
+                          rel, dir_path)
+                owned_dirs.append(rel)
+        return owned_dirs
 
     def __create_dir_structure(self) -> None:
         log.debug('creating dir structure for dir_path "%s"', self.dir_path)
@@ -145,50 +304,407 @@ class Builder:
             src_file = os.path.join(self.dir_cfg['src'], file)
             dst_file = os.path.join(self.dir_cfg['dst'], file)
             log.debug('copying "%s"', file)
-            copy_file(src_file, dst_file)
+            # the manifest keeps it, so it has to be up to date
+            copy_file(src_file, dst_file, self.scan.stats[file], True)
+            if self.manifest is not None:
+                self.manifest.keep(self.__get_dst(file)[1])
 
-    def __render_pages(self, template_name: str) -> None:
+    def __get_page_jobs(self, template_name: str) -> list[RenderJob]:
         log.debug('rendering pages with template "%s"', template_name)
-        page_vars: dict = deepcopy(self.common_vars)
-
-        for p in self.all_files:
+        jobs: list[RenderJob] = []
+        for i, p in enumerate(self.all_files):
             p_fname: str = p.name.replace('.md', '.html')
-            log.debug('adding page "%s" to exposed vars for jinja', p_fname)
-            page_vars['page'] = p
-            # actually render article
-            self.__render_template(template_name, p_fname, **page_vars)
+            jobs.append(('page', template_name, p_fname, i, 0))
+        return jobs
 
-    def __render_tags(self, template_name: str) -> None:
+    # one per page of each tag (tag/@x.html, tag/@x/2.html, ...)
+    def __get_tag_jobs(self, template_name: str) -> list[RenderJob]:
         log.debug('rendering tags with template "%s"', template_name)
-        tag_vars: dict = deepcopy(self.common_vars)
-        tag_pages: list[Page]
-        for t in self.all_tags:
+        jobs: list[RenderJob] = []
+        for i, t in enumerate(self.all_tags):
+            jobs.extend(('tag', template_name, t_fname, i, n)
+                        for n, t_fname in enumerate(self.__get_listing_files(
+                            f'tag/@{t[0]}',
+                            self.tag_index[t[0]],
+                            'tag_page_size')))
+        return jobs
+
+    # one per page of the index (index.html, index/2.html, ...)
+    def __get_index_jobs(self, template_name: str) -> list[RenderJob]:
+        log.debug('rendering index with template "%s"', template_name)
+        return [('index', template_name, i_fname, 0, n)
+                for n, i_fname in enumerate(self.__get_listing_files(
+                    'index', self.all_files, 'index_page_size'))]
+
+    # file name of each page of a listing with the base name, paginated by
+    #   the size in size_opt, creating the directory for the rest of the
+    #   pages if there is more than one
+    def __get_listing_files(self, base: str,
+                            pages: list[Page],
+                            size_opt: str) -> list[str]:
+        page_count: int = len(paginate(pages, self.__get_size(size_opt)))
+        if page_count > 1:
+            create_dir(os.path.join(self.dir_cfg['dst'], base), True, True)
+        return [get_page_file_name(base, '.html', n)
+                for n in range(1, page_count + 1)]
+
+    # page n (starting from 0) of a listing
+    def __get_pagination(self, base: str,
+                         pages: list[Page],
+                         size_opt: str,
+                         n: int) -> Pagination:
+        listing: list[list[Page]] = paginate(pages,
+                                             self.__get_size(size_opt))
+        urls: list[str] = [f'{self.dir_cfg["url"]}/'
+                           f'{get_page_file_name(base, ".html", m)}'
+                           for m in range(1, len(listing) + 1)]
+        return Pagination(listing[n], n + 1, urls)
+
+    def __get_tag_pagination(self, i: int, n: int) -> Pagination:
+        t: tuple[str, str] = self.all_tags[i]
+        return self.__get_pagination(f'tag/@{t[0]}', self.tag_index[t[0]],
+                                     'tag_page_size', n)
+
+    def __get_index_pagination(self, n: int) -> Pagination:
+        return self.__get_pagination('index', self.all_files,
+                                     'index_page_size', n)
+
+    # optional dir_cfg option, checking its type if present
+    def __get_opt(self, opt: str, opt_type: type, default: Any) -> Any:
+        if opt not in self.dir_cfg:
+            return default
+        value: Any = self.dir_cfg[opt]
+        # bool is a subclass of int
+        if not isinstance(value, opt_type) or \
+                (opt_type is int and isinstance(value, bool)):
+            log.error('"%s" field in "dirs.%s.cfg" isn\'t of type "%s"',
+                      opt, self.dir_path, opt_type.__name__)
+            sys.exit(1)
+        return value
+
+    # optional dir_cfg option for a number of items, 0 (the default)
+    #   meaning all of them
+    def __get_size(self, opt: str) -> int:
+        size: int = self.__get_opt(opt, int, 0)
+        if size < 0:
+            log.error('"%s" field in "dirs.%s.cfg" can\'t be negative',
+                      opt, self.dir_path)
+            sys.exit(1)
+        return size
+
+    # items of each page of a feed, only the first rss_limit items (all of
+    #   them if 0) unless rss_archive is set, then the rest of the items are
+    #   in the archived pages
+    def __get_feed_pages(self, pages: list[Page]) -> list[list[Page]]:
+        feed_pages: list[list[Page]] = paginate(pages,
+                                                self.__get_size('rss_limit'))
+        if not self.__get_opt('rss_archive', bool, False):
+            return feed_pages[:1]
+        return feed_pages
+
+    # file name of each page of the feed with the base name
+    def __get_feed_file_names(self, base: str,
+                              pages: list[Page]) -> list[str]:
+        return [get_page_file_name(base, '.xml', n)
+                for n in range(1, len(self.__get_feed_pages(pages)) + 1)]
+
+    # the main feed (rss.xml, rss/2.xml, ...) and if rss_tags is set,
+    #   one per tag (tag/@x.xml, tag/@x/2.xml, ...)
+    def __get_feed_jobs(self, template_name: str) -> list[RenderJob]:
+        log.debug('rendering feeds with template "%s"', template_name)
+        feeds: list[tuple[str, int, list[Page]]] = [('rss', -1,
+                                                     self.all_files)]
+        if self.__get_opt('rss_tags', bool, False):
+            for i, t in enumerate(self.all_tags):
+                feeds.append((f'tag/@{t[0]}', i, self.tag_index[t[0]]))
+
+        jobs: list[RenderJob] = []
+        for base, i, pages in feeds:
+            file_names: list[str] = self.__get_feed_file_names(base, pages)
+            if len(file_names) > 1:
+                create_dir(os.path.join(self.dir_cfg['dst'], base),
+                           True, True)
+            elif base != 'rss':
+                create_dir(os.path.join(self.dir_cfg['dst'], 'tag'),
+                           True, True)
+            for n, f_name in enumerate(file_names):
+                jobs.append(('feed', template_name, f_name, i, n))
+        return jobs
+
+    def __get_feed(self, i: int, n: int) -> Feed:
+        base: str = 'rss'
+        pages: list[Page] = self.all_files
+        tag: tuple[str, str] | None = None
+        if i >= 0:
+            tag = self.all_tags[i]
+            base = f'tag/@{tag[0]}'
+            pages = self.tag_index[tag[0]]
+        urls: list[str] = [f'{self.dir_cfg["url"]}/{f}'
+                           for f in self.__get_feed_file_names(base, pages)]
+        return Feed(self.__get_feed_pages(pages)[n],
+                    n + 1,
+                    urls,
+                    self.__get_opt('rss_summary', bool, False),
+                    tag)
+
+    def __init_digests(self, md_fingerprint: str,
+                       env_digests: dict[str, str]) -> None:
+        log.debug('computing input digests for dir_path "%s"', self.dir_path)
+        # the page objects depend on the config too (urls, dates),
+        #   so it is part of every fingerprint; except for the debug flag,
+        #   switching it shouldn't render everything again
+        info: dict[str, Any] = {k: v for k, v
+                                in self.config.get('info', dict()).items()
+                                if k != 'debug'}
+        self.config_digest = get_digest([dict(self.config, info=info),
+                                         self.dir_cfg,
+                                         md_fingerprint])
+        # the db entry contains the checksum, timestamps and tags, plus the
+        #   env vars the page references (if any)
+        self.page_digests = {p.name: get_digest([*self.db.e[p.name]
+                                                 .get_raw_entry(),
+                                                 env_digests.get(p.name, '')])
+                             for p in self.all_files}
+        self.site_digest = get_digest([[p.name, self.page_digests[p.name]]
+                                       for p in self.all_files])
+        self.tags_digest = get_digest(self.common_vars['tag_counts'])
+        self.template_deps = dict()
+
+    # fingerprint of all the inputs of a render job, plus the templates,
+    #   source files and variables it depends on
+    def __get_job_deps(self, job: RenderJob) -> tuple[str, list[str],
+                                                      list[str], list[str]]:
+        kind, template_name, _, i, n = job
+        if template_name not in self.template_deps:
+            self.template_deps[template_name] = \
+                get_template_deps(self.env, template_name)
+        templates, variables, templates_digest = \
+            self.template_deps[template_name]
+
+        parts: list[str] = [self.config_digest, templates_digest]
+        sources: list[str] = []
+        if variables & _SITE_VARS:
+            parts.append(self.site_digest)
+            sources.append('*')
+        elif variables & _TAG_VARS:
+            parts.append(self.tags_digest)
+
+        if kind == 'page':
+            p: Page = self.all_files[i]
+            # neighbours are exposed through page.next and page.previous
+            neighbours: list[Page | None] = [p, p.next, p.previous]
+            for neighbour in neighbours:
+                if neighbour is not None:
+                    parts.append(self.page_digests[neighbour.name])
+                    sources.append(neighbour.name)
+        elif kind == 'tag':
+            t: tuple[str, str] = self.all_tags[i]
+            tag_pagination: Pagination = self.__get_tag_pagination(i, n)
+            parts.extend([t[0], str(tag_pagination)])
+            # tag_pages contains all the pages of the tag, not only
+            #   the ones in this page of the listing
+            tag_pages: list[Page] = self.tag_index[t[0]] \
+                if 'tag_pages' in variables else tag_pagination.items
+            for tp in tag_pages:
+                parts.append(self.page_digests[tp.name])
+                sources.append(tp.name)
+        elif kind == 'index':
+            index_pagination: Pagination = self.__get_index_pagination(n)
+            parts.append(str(index_pagination))
+            for ip in index_pagination.items:
+                parts.append(self.page_digests[ip.name])
+                sources.append(ip.name)
+        elif kind == 'feed':
+            feed: Feed = self.__get_feed(i, n)
+            parts.extend([str(feed.tag), str(feed.number), str(feed.count),
+                          str(feed.summary_only)])
+            for fp in feed.items:
+                parts.append(self.page_digests[fp.name])
+                sources.append(fp.name)
+        return get_digest(parts), templates, sources, sorted(variables)
+
+    # only on incremental builds (when there is a cache), the rendered file
+    #   also has to be in the manifest so it can be kept there
+    def __is_fresh(self, file_name: str, fingerprint: str) -> bool:
+        if self.cache is None or self.deps is None or self.manifest is None:
+            return False
+        dst_path, dst_name = self.__get_dst(file_name)
+        if not self.deps.is_fresh(dst_name, fingerprint) or \
+                dst_name not in self.manifest.e or \
+                not os.path.exists(dst_path):
+            return False
+        log.debug('"%s" inputs didn\'t change, not rendering', dst_name)
+        self.manifest.update(dst_name, self.manifest.e[dst_name], False)
+        return True
+
+    def __render_jobs(self, all_jobs: list[RenderJob]) -> None:
+        jobs: list[RenderJob] = all_jobs
+        if self.deps is not None:
+            jobs = []
+            for job in all_jobs:
+                fingerprint, templates, sources, variables = \
+                    self.__get_job_deps(job)
+                if not self.__is_fresh(job[2], fingerprint):
+                    jobs.append(job)
+                _, dst_name = self.__get_dst(job[2])
+                self.deps.update(dst_name, fingerprint,
+                                 templates, sources, variables)
+            log.debug('%d of %d files need to be rendered',
+                      len(jobs), len(all_jobs))
+
+        log.debug('rendering %d files', len(jobs))
+        # the workers can't add to the outputs, the files they render are
+        #   served from the disk instead
+        if self.jobs < 2 or len(jobs) < 2 or not _can_fork():
+            for job in jobs:
+                self.__update_manifest(self.render_job(job))
+            return
+
+        log.debug('rendering %d files with %d jobs', len(jobs), self.jobs)
+        # compile all templates before forking, so the workers
+        #   don't have to compile them again
+        for template_name in set(job[1] for job in jobs):
+            self.__get_template(template_name)
+
+        global _render_builder
+        _render_builder = self
+        try:
+            with ProcessPoolExecutor(max_workers=self.jobs,
+                                     mp_context=get_context('fork'),
+                                     initializer=profiler.reset) as ex:
+                chunksize: int = max(1, len(jobs) // (self.jobs * 4))
+                # the results are small, the manifest is only
+                #   updated in this process
+                for result, events in ex.map(_render_worker,
+                                             jobs,
+                                             chunksize=chunksize):
+                    self.__update_manifest(result)
+                    profiler.extend(events)
+        finally:
+            _render_builder = None
+
+    def __update_manifest(self, result: RenderResult) -> None:
+        if self.manifest is not None:
+            self.manifest.update(*result)
+
+    def render_job(self, job: RenderJob) -> RenderResult:
+        kind, template_name, file_name, i, n = job
+        if kind == 'page':
+            p: Page = self.all_files[i]
+            log.debug('adding page "%s" to exposed vars for jinja', file_name)
+            # layered on top of common_vars, so nothing gets copied
+            page_vars: ChainMap[str, Any] = ChainMap(dict(page=p),
+                                                     self.common_vars)
+            # actually render article
+            return self.__render_template(template_name, file_name, page_vars)
+        elif kind == 'tag':
+            t: tuple[str, str] = self.all_tags[i]
             log.debug('rendering tag "%s"', t[0])
-            # clean tag_pages
-            tag_pages = []
-            log.debug('adding all pages that contain current tag')
-            for p in self.all_files:
-                if p.tags is not None and t[0] in list(map(itemgetter(0),
-                                                           p.tags)):
-                    log.debug('adding page "%s" as it contains tag "%s"',
-                              p.name, t[0])
-                    tag_pages.append(p)
-            log.debug('adding tag and tag_pages to exposed vars for jinja')
-            tag_vars['tag'] = t
-            tag_vars['tag_pages'] = tag_pages
-            t_fname: str = f'tag/@{t[0]}.html'
+            tag_pages: list[Page] = self.tag_index[t[0]]
+            pagination: Pagination = self.__get_tag_pagination(i, n)
+            log.debug('adding tag, tag_pages and pagination'
+                      ' to exposed vars for jinja')
+            tag_vars: ChainMap[str, Any] = ChainMap(
+                dict(tag=t, tag_pages=tag_pages, pagination=pagination),
+                self.common_vars)
             # actually render tag page
-            self.__render_template(template_name, t_fname, **tag_vars)
+            return self.__render_template(template_name, file_name, tag_vars)
+        elif kind == 'index':
+            log.debug('adding pagination to exposed vars for jinja')
+            index_vars: ChainMap[str, Any] = ChainMap(
+                dict(pagination=self.__get_index_pagination(n)),
+                self.common_vars)
+            return self.__render_template(template_name, file_name, index_vars)
+        elif kind == 'feed':
+            feed: Feed = self.__get_feed(i, n)
+            log.debug('adding feed "%s" to exposed vars for jinja', feed)
+            feed_vars: ChainMap[str, Any] = ChainMap(dict(feed=feed),
+                                                     self.common_vars)
+            return self.__render_template(template_name, file_name, feed_vars)
+        else:
+            return self.__render_template(template_name,
+                                          file_name,
+                                          self.common_vars)
+
+    def __get_template(self, template_name: str) -> Template:
+        if template_name not in self.templates:
+            self.templates[template_name] = \
+                self.env.get_template(template_name)
+        return self.templates[template_name]
+
+    # full path and path relative to path.dst (shared by all dir_paths)
+    def __get_dst(self, file_name: str) -> tuple[str, str]:
+        dst_path: str = os.path.join(self.dir_cfg['dst'], file_name)
+        return dst_path, os.path.relpath(dst_path, self.config['path']['dst'])
 
     def __render_template(self, template_name: str,
                           file_name: str,
-                          **template_vars) -> None:
+                          template_vars: Mapping[str, Any]) -> RenderResult:
+        with profiler.span('render', file_name, template=template_name):
+            return self.__stream_template(template_name,
+                                          file_name,
+                                          template_vars)
+
+    def __stream_template(self, template_name: str,
+                          file_name: str,
+                          template_vars: Mapping[str, Any]) -> RenderResult:
         log.debug('rendering html "%s" with template "%s"',
                   file_name, template_name)
-        template: Template = self.env.get_template(template_name)
-        content: str = template.render(**template_vars)
-        dst_path: str = os.path.join(self.dir_cfg['dst'], file_name)
+        template: Template = self.__get_template(template_name)
+        dst_path, dst_name = self.__get_dst(file_name)
+        stream: TemplateStream = template.stream(template_vars)
+        # joins the small pieces jinja yields, so they're not
+        #   encoded and hashed one by one
+        stream.enable_buffering(STREAM_BUFFER_ITEMS)
+
+        file_hash = md5()
+        size: int = 0
+        chunks: list[bytes] = []
+        tmp_path: str = get_tmp_path(dst_path)
+        # only once the content is bigger than STREAM_THRESHOLD, then it
+        #   isn't kept in the outputs either
+        tmp_file: IO[bytes] | None = None
+        try:
+            for chunk in stream:
+                data: bytes = chunk.encode('utf-8')
+                file_hash.update(data)
+                size += len(data)
+                if tmp_file is not None:
+                    tmp_file.write(data)
+                    continue
+                chunks.append(data)
+                if size > STREAM_THRESHOLD:
+                    log.debug('streaming html file to path "%s"', dst_path)
+                    tmp_file = open(tmp_path, 'wb')
+                    tmp_file.writelines(chunks)
+                    chunks = []
+            if tmp_file is not None:
+                tmp_file.close()
+        except BaseException:
+            if tmp_file is not None:
+                tmp_file.close()
+                os.remove(tmp_path)
+            raise
+        cksm: str = file_hash.hexdigest()
+
+        content: bytes = b''
+        if tmp_file is None:
+            content = b''.join(chunks)
+            if self.outputs is not None:
+                self.outputs[dst_name] = content
+
+        if self.manifest is not None and \
+                self.manifest.is_unchanged(dst_name, dst_path, cksm, size):
+            log.debug('html file "%s" didn\'t change, not writing', dst_path)
+            if tmp_file is not None:
+                os.remove(tmp_path)
+            return (dst_name, cksm, False)
 
         log.debug('writing html file to path "%s"', dst_path)
-        with open(dst_path, 'w') as f:
-            f.write(content)
+        with profiler.span('write', dst_name):
+            if tmp_file is not None:
+                os.replace(tmp_path, dst_path)
+            else:
+                with atomic_open(dst_path, 'wb') as f:
+                    f.write(content)
+        return (dst_name, cksm, True)
@@ -0,0 +1,123 @@
+from __future__ import annotations
+import os
+import json
+import shutil
+from hashlib import sha256
+from logging import Logger, getLogger
+from typing import Any
+
+from .utils import atomic_open
+
+log: Logger = getLogger(__name__)
+
+# html, toc, toc_tokens and meta, as produced by the md conversion
+MDResult = tuple[str, str, list[Any], dict[str, Any]]
+# in MiB
+DEFAULT_CACHE_SIZE: int = 256
+
+
+def get_cache_path(config: dict[str, Any]) -> str:
+    if 'cache' in config['path']:
+        return str(config['path']['cache'])
+    # default to a directory next to the db, one per db so multiple
+    #   config documents don't step on each other
+    db_root, _ = os.path.splitext(config['path']['db'])
+    return f'{db_root}.cache'
+
+
+# content addressed store for the md conversion results, the key is made of
+#   the checksum of the source file (the same one stored in the db) and
+#   the fingerprint of the md pipeline, so unchanged files can skip
+#   the md conversion completely
+class RenderCache:
+    __MD_DIR: str = 'md'
+
+    def __init__(self, cache_path: str,
+                 max_size: int = DEFAULT_CACHE_SIZE) -> None:
+        log.debug('initializing the render cache on path "%s"', cache_path)
+        self.cache_path: str = cache_path
+        self.md_path: str = os.path.join(cache_path, self.__MD_DIR)
+        self.max_size: int = max_size * 1024 * 1024
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __entry_path(self, checksum: str, fingerprint: str) -> str:
+        key: str = sha256(f'{checksum}:{fingerprint}'.encode('utf-8'))\
+            .hexdigest()
+        # shard by the first two chars, to avoid huge directories
+        return os.path.join(self.md_path, key[:2], f'{key}.json')
+
+    def get(self, checksum: str, fingerprint: str = '') -> MDResult | None:
+        path: str = self.__entry_path(checksum, fingerprint)
+        try:
+            with open(path, 'r') as f:
+                raw: dict[str, Any] = json.load(f)
+            result: MDResult = (str(raw['html']),
+                                str(raw['toc']),
+                                list(raw['toc_tokens']),
+                                dict(raw['meta']))
+        except FileNotFoundError:
+            log.debug('no cached result for checksum "%s"', checksum)
+            self.misses += 1
+            return None
+        except (ValueError, KeyError, TypeError):
+            log.warning('cached result "%s" is corrupted, ignoring', path)
+            self.misses += 1
+            return None
+        log.debug('using cached result for checksum "%s"', checksum)
+        # mtime is used as the last access time for the eviction,
+        #   atime is not reliable (noatime mounts)
+        os.utime(path)
+        self.hits += 1
+        return result
+
+    def set(self, checksum: str,
+            result: MDResult,
+            fingerprint: str = '') -> None:
+        log.debug('caching result for checksum "%s"', checksum)
+        path: str = self.__entry_path(checksum, fingerprint)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        html, toc, toc_tokens, meta = result
+        with atomic_open(path, 'w') as f:
+            json.dump(dict(html=html,
+                           toc=toc,
+                           toc_tokens=toc_tokens,
+                           meta=meta), f)
+
+    # removes the least recently used entries until the cache fits
+    #   in max_size, returns the number of removed entries
+    def evict(self) -> int:
+        log.debug('checking render cache size')
+        entries: list[tuple[float, int, str]] = []
+        total: int = 0
+        for root, _, files in os.walk(self.md_path):
+            for file in files:
+                path: str = os.path.join(root, file)
+                st: os.stat_result = os.stat(path)
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+        log.debug('render cache size: %d bytes, limit: %d bytes',
+                  total, self.max_size)
+        if total <= self.max_size:
+            return 0
+
+        entries.sort()
+        removed: int = 0
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+            log.debug('evicting cached result "%s"', path)
+            os.remove(path)
+            total -= size
+            removed += 1
+        log.info('evicted %d cached result(s) from "%s"',
+                 removed, self.cache_path)
+        return removed
+
+    def clear(self) -> None:
+        if not os.path.exists(self.cache_path):
+            log.debug('cache "%s" doesn\'t exist, nothing to clear',
+                      self.cache_path)
+            return
+        shutil.rmtree(self.cache_path)
+        log.info('cleared cache "%s"', self.cache_path)
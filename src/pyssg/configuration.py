@@ -1,5 +1,4 @@
 import sys
-from importlib.metadata import version
 from datetime import datetime, timezone
 from logging import Logger, getLogger
 from typing import Any
@@ -9,10 +8,19 @@ from .yaml_parser import get_parsed_yaml
 
 log: Logger = getLogger(__name__)
 DEFAULT_CONFIG_PATH: str = '$XDG_CONFIG_HOME/pyssg/config.yaml'
-VERSION: str = version('pyssg')
+# the configurable extensions (exts.*) and the types of their options
+EXTS_OPTIONS: dict[str, dict[str, type]] = {
+    'pymdvar': {'variables': dict,
+                'enable_env': bool}}
+
+
+# importlib.metadata is slow to import and to query,
+#   so only when the version is actually needed
+def get_version() -> str:
+    from importlib.metadata import version
+    return version('pyssg')
 
 
-# TODO: add checking for extensions config (such as pymdvar)
 def __check_well_formed_config(config: dict[str, Any],
                                config_base: list[dict[str, Any]],
                                prefix_key: str = '') -> None:
@@ -52,6 +60,36 @@ def __check_well_formed_config(config: dict[str, Any],
         __check_well_formed_config(config[key], new_config_base, current_key)
 
 
+# exts is optional, but anything in it has to be known
+def __check_exts_config(config: dict[str, Any]) -> None:
+    if 'exts' not in config:
+        log.debug('"exts" field not found in config')
+        return
+    if not isinstance(config['exts'], dict):
+        log.error('"exts" field isn\'t of type "dict"')
+        sys.exit(1)
+    for ext, options in config['exts'].items():
+        log.debug('checking "exts.%s"', ext)
+        if ext not in EXTS_OPTIONS:
+            log.error('"exts.%s" isn\'t a configurable extension,'
+                      ' only (%s) are', ext, ', '.join(EXTS_OPTIONS.keys()))
+            sys.exit(1)
+        if not isinstance(options, dict):
+            log.error('"exts.%s" field isn\'t of type "dict"', ext)
+            sys.exit(1)
+        for option, value in options.items():
+            if option not in EXTS_OPTIONS[ext]:
+                log.error('"exts.%s.%s" isn\'t an option of "%s",'
+                          ' only (%s) are', ext, option, ext,
+                          ', '.join(EXTS_OPTIONS[ext].keys()))
+                sys.exit(1)
+            option_type: type = EXTS_OPTIONS[ext][option]
+            if not isinstance(value, option_type):
+                log.error('"exts.%s.%s" field isn\'t of type "%s"',
+                          ext, option, option_type.__name__)
+                sys.exit(1)
+
+
 def __expand_all_paths(config: dict[str, Any]) -> None:
     log.debug('expanding all path options: %s', config['path'].keys())
     for option in config['path'].keys():
@@ -70,6 +108,7 @@ def get_parsed_config(path: str,
     log.debug('checking that config file is well formed')
     for config in config_all:
         __check_well_formed_config(config, mandatory_config)
+        __check_exts_config(config)
         __expand_all_paths(config)
     return config_all
 
@@ -85,7 +124,7 @@ def get_static_config(sc_package: str = 'static_config.yaml',
     def __time(fmt: str) -> str:
         return datetime.now(tz=timezone.utc).strftime(config['fmt'][fmt])
 
-    config['info']['version'] = VERSION
+    config['info']['version'] = get_version()
     config['info']['rss_run_date'] = __time('rss_date')
     config['info']['sitemap_run_date'] = __time('sitemap_date')
     return config
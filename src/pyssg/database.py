@@ -1,9 +1,10 @@
+from __future__ import annotations
 import os
 import sys
 import csv
 from logging import Logger, getLogger
 
-from .utils import get_checksum
+from .utils import get_checksum, get_checksum_algorithm, atomic_open
 from .database_entry import DatabaseEntry
 
 log: Logger = getLogger(__name__)
@@ -12,12 +13,26 @@ log: Logger = getLogger(__name__)
 # db class that works for both html and md files
 class Database:
     __COLUMN_NUM: int = 5
+    # size, mtime_ns and inode
+    __STAT_COLUMN_NUM: int = 3
     __COLUMN_DELIMITER: str = '|'
 
-    def __init__(self, db_path: str) -> None:
+    def __init__(self, db_path: str,
+                 paranoid: bool = False,
+                 checksum: str = 'md5') -> None:
         log.debug('initializing the page db on path "%s"', db_path)
         self.db_path: str = db_path
+        # always calculate the checksum, even if the stat didn't change
+        self.paranoid: bool = paranoid
+        # checksum algorithm for new or modified files
+        self.checksum: str = checksum
         self.e: dict[str, DatabaseEntry] = dict()
+        # entries changed since the db was read
+        self.dirty: set[str] = set()
+        # entries removed since the db was read
+        self.removed: set[str] = set()
+        # entries updated since the last prune
+        self.seen: set[str] = set()
 
     def update_tags(self, file_name: str,
                     new_tags: set[str]) -> None:
@@ -28,7 +43,10 @@ class Database:
             log.debug('entry "%s" old tags: %s',
                       file_name, self.e[file_name].tags)
 
+            old_tags: set[str] = set(self.e[file_name].tags)
             self.e[file_name].update_tags(new_tags)
+            if self.e[file_name].tags != old_tags:
+                self.dirty.add(file_name)
             log.debug('entry "%s" new tags: %s',
                       file_name, self.e[file_name].tags)
         else:
@@ -36,8 +54,10 @@ class Database:
                       ' as it is not present in db', file_name)
             sys.exit(1)
 
+    # st is the stat result of file_name, if already known
     def update(self, file_name: str,
-               remove: str = '') -> None:
+               remove: str = '',
+               st: os.stat_result | None = None) -> None:
         log.debug('updating entry for file "%s"', file_name)
         f: str = file_name
         tags: set[str] = set()
@@ -46,11 +66,25 @@ class Database:
             log.debug('removed "%s" from "%s": "%s"', remove, file_name, f)
 
         # get current time, needs actual file name
-        time: float = os.stat(file_name).st_mtime
+        if st is None:
+            st = os.stat(file_name)
+        time: float = st.st_mtime
         log.debug('time for "%s": %s', file_name, time)
+        stat: tuple[int, int, int] = (st.st_size, st.st_mtime_ns, st.st_ino)
+        self.seen.add(f)
+
+        # the file is assumed unchanged if the stat didn't change,
+        #   unless paranoid
+        oe: DatabaseEntry
+        if f in self.e and not self.paranoid:
+            oe = self.e[f]
+            if oe.stat == stat and \
+                    get_checksum_algorithm(oe.checksum) == self.checksum:
+                log.debug('entry "%s" hasn\'t been modified (same stat)', f)
+                return
 
         # calculate current checksum, also needs actual file name
-        cksm: str = get_checksum(file_name)
+        cksm: str = get_checksum(file_name, self.checksum)
         log.debug('checksum for "%s": "%s"', file_name, cksm)
 
         # three cases, 1) entry didn't exist,
@@ -60,29 +94,74 @@ class Database:
         if f not in self.e:
             log.debug('entry "%s" didn\'t exist, adding with defaults', f)
             self.e[f] = DatabaseEntry((f, time, 0.0, cksm, tags))
+            self.e[f].stat = stat
+            self.dirty.add(f)
             return
 
         # oe is old entity
-        oe: DatabaseEntry = self.e[f]
+        oe = self.e[f]
         log.debug('entry "%s" old content: %s', f, oe)
 
+        # the old checksum could've been calculated with another algorithm
+        old_cksm: str = cksm
+        old_algorithm: str = get_checksum_algorithm(oe.checksum)
+        if old_algorithm != self.checksum:
+            log.debug('entry "%s" checksum uses "%s", calculating it again',
+                      f, old_algorithm)
+            old_cksm = get_checksum(file_name, old_algorithm)
+
         # 2)
-        if cksm != oe.checksum:
+        if old_cksm != oe.checksum:
             log.debug('entry "%s" has been modified, updating; '
                       'using old tags', f)
             self.e[f] = DatabaseEntry((f, oe.ctimestamp, time, cksm, oe.tags))
+            self.e[f].stat = stat
+            self.dirty.add(f)
             log.debug('entry "%s" new content: %s', f, self.e[f])
         # 3)
         else:
+            if (oe.checksum, oe.stat) != (cksm, stat):
+                oe.checksum = cksm
+                oe.stat = stat
+                self.dirty.add(f)
             log.debug('entry "%s" hasn\'t been modified', f)
 
+    # removes the entries without a source file (not updated since the last
+    #   prune and not found in any of src_paths), or only lists them if
+    #   dry_run; returns the file names
+    def prune(self, src_paths: list[str],
+              dry_run: bool = False) -> list[str]:
+        # the ones not updated could still exist: excluded or of another
+        #   config document sharing the db
+        stale: list[str] = [f for f in self.e.keys()
+                            if f not in self.seen
+                            and not any(os.path.exists(os.path.join(p, f))
+                                        for p in src_paths)]
+        for f in stale:
+            if dry_run:
+                log.info('would remove stale db entry "%s"', f)
+                continue
+            log.debug('removing stale db entry "%s"', f)
+            del self.e[f]
+            self.dirty.discard(f)
+            self.removed.add(f)
+        self.seen = set()
+        return stale
+
     def write(self) -> None:
         log.debug('writing db')
-        with open(self.db_path, 'w') as file:
+        with atomic_open(self.db_path, 'w') as file:
             csv_writer = csv.writer(file, delimiter=self.__COLUMN_DELIMITER)
             for _, v in self.e.items():
                 log.debug('writing row: %s', v)
-                csv_writer.writerow(v.get_raw_entry())
+                # the stat columns are left out when unknown or unused
+                #   (paranoid), so older versions can still read the row
+                row: list[str] = v.get_raw_entry()
+                if not self.paranoid and any(v.stat):
+                    row += v.get_raw_stat()
+                csv_writer.writerow(row)
+        self.dirty.clear()
+        self.removed.clear()
 
     def _db_path_exists(self) -> bool:
         log.debug('checking that "%s" exists or is a file', self.db_path)
@@ -104,7 +183,7 @@ class Database:
         log.debug('db contains %d rows', len(rows))
         return rows
 
-    # TODO: don't include files that are not in the db anymore
+    # entries without a source file are removed by prune
     def read(self) -> None:
         log.debug('reading db')
         if not self._db_path_exists():
@@ -117,10 +196,14 @@ class Database:
             i: int = it + 1
             col_num: int = len(row)
             log.debug('row %d content: "%s"', i, row)
-            if col_num != self.__COLUMN_NUM:
-                log.critical('row %d doesn\'t contain %s columns, contains %d'
-                             ' columns: "%s"',
-                             i, self.__COLUMN_NUM, col_num, row)
+            # dbs written by older versions don't have the stat columns
+            if col_num not in (self.__COLUMN_NUM,
+                               self.__COLUMN_NUM + self.__STAT_COLUMN_NUM):
+                log.critical('row %d doesn\'t contain %s or %s columns,'
+                             ' contains %d columns: "%s"',
+                             i, self.__COLUMN_NUM,
+                             self.__COLUMN_NUM + self.__STAT_COLUMN_NUM,
+                             col_num, row)
                 sys.exit(1)
             # actual value types
             r: tuple[str, float, float, str, str] = (str(row[0]),
@@ -129,4 +212,6 @@ class Database:
                                                      str(row[3]),
                                                      str(row[4]))
             entry: DatabaseEntry = DatabaseEntry(r)
+            if col_num > self.__COLUMN_NUM:
+                entry.stat = (int(row[5]), int(row[6]), int(row[7]))
             self.e[entry.fname] = entry
@@ -1,3 +1,4 @@
+from __future__ import annotations
 import sys
 from logging import Logger, getLogger
 
@@ -12,6 +13,9 @@ class DatabaseEntry:
         self.mtimestamp: float = float(entry[2])
         self.checksum: str = str(entry[3])
         self.tags: set[str] = set()
+        # size, mtime (ns) and inode of the file when the checksum was
+        #   calculated, all 0 if unknown
+        self.stat: tuple[int, int, int] = (0, 0, 0)
 
         if isinstance(entry[4], set):
             self.tags = entry[4]
@@ -49,6 +53,11 @@ class DatabaseEntry:
                 self.checksum,
                 ','.join(sorted(self.tags)) if self.tags else '-']
 
+    # stored next to the raw entry, not part of it as it changes
+    #   without the content changing
+    def get_raw_stat(self) -> list[str]:
+        return [str(s) for s in self.stat]
+
     def update_tags(self, new_tags: set[str]) -> None:
         self.tags = new_tags
         self.__remove_invalid()
@@ -0,0 +1,131 @@
+import os
+import sys
+import csv
+import json
+from hashlib import sha256
+from logging import Logger, getLogger
+from typing import Any
+
+from jinja2 import Environment, meta
+
+from .utils import atomic_open
+
+log: Logger = getLogger(__name__)
+
+
+def get_digest(obj: Any) -> str:
+    raw: str = json.dumps(obj, sort_keys=True, default=str)
+    return sha256(raw.encode('utf-8')).hexdigest()
+
+
+# returns all templates used by template_name (itself, extends, includes and
+#   imports, recursively), all the variables they use from the context
+#   and a digest of their sources
+def get_template_deps(env: Environment,
+                      template_name: str) -> tuple[list[str], set[str], str]:
+    if env.loader is None:
+        log.error('jinja environment doesn\'t have a loader')
+        sys.exit(1)
+
+    templates: list[str] = []
+    variables: set[str] = set()
+    sources: dict[str, str] = dict()
+    pending: list[str] = [template_name]
+    while pending:
+        name: str = pending.pop()
+        if name in templates:
+            continue
+        templates.append(name)
+        source, _, _ = env.loader.get_source(env, name)
+        sources[name] = source
+        ast = env.parse(source)
+        variables.update(meta.find_undeclared_variables(ast))
+        for ref in meta.find_referenced_templates(ast):
+            if ref is None:
+                # dynamic reference (a variable), can't know which one,
+                #   so depend on all of them
+                log.debug('template "%s" has a dynamic reference,'
+                          ' depending on all templates', name)
+                pending.extend(t for t in env.list_templates()
+                               if t not in templates)
+                continue
+            pending.append(ref)
+    return sorted(templates), variables, get_digest(sources)
+
+
+# keeps the fingerprint of the inputs (templates, source files and shared
+#   variables) used for every rendered file, so a rebuild only renders the
+#   files whose inputs changed
+class DepGraph:
+    __COLUMN_NUM: int = 5
+    __COLUMN_DELIMITER: str = '|'
+    __LIST_DELIMITER: str = ','
+
+    def __init__(self, deps_path: str) -> None:
+        log.debug('initializing the dependency graph on path "%s"', deps_path)
+        self.deps_path: str = deps_path
+        # file name (relative to path.dst) to fingerprint
+        self.e: dict[str, str] = dict()
+        # file name to the templates, source files and variables used
+        self.templates: dict[str, list[str]] = dict()
+        self.sources: dict[str, list[str]] = dict()
+        self.variables: dict[str, list[str]] = dict()
+
+    def is_fresh(self, file_name: str, fingerprint: str) -> bool:
+        return self.e.get(file_name) == fingerprint
+
+    def update(self, file_name: str,
+               fingerprint: str,
+               templates: list[str],
+               sources: list[str],
+               variables: list[str]) -> None:
+        log.debug('updating dependencies for "%s"', file_name)
+        self.e[file_name] = fingerprint
+        self.templates[file_name] = templates
+        self.sources[file_name] = sources
+        self.variables[file_name] = variables
+
+    def remove(self, file_name: str) -> None:
+        log.debug('removing dependencies for "%s"', file_name)
+        for d in (self.e, self.templates, self.sources, self.variables):
+            d.pop(file_name, None)
+
+    def write(self) -> None:
+        log.debug('writing dependency graph')
+        os.makedirs(os.path.dirname(self.deps_path), exist_ok=True)
+        ld: str = self.__LIST_DELIMITER
+        with atomic_open(self.deps_path, 'w') as file:
+            csv_writer = csv.writer(file, delimiter=self.__COLUMN_DELIMITER)
+            for k, v in self.e.items():
+                csv_writer.writerow([k,
+                                     v,
+                                     ld.join(self.templates.get(k, [])),
+                                     ld.join(self.sources.get(k, [])),
+                                     ld.join(self.variables.get(k, []))])
+
+    def read(self) -> None:
+        log.debug('reading dependency graph')
+        if not os.path.exists(self.deps_path):
+            log.debug('"%s" doesn\'t exist, all files will be rendered',
+                      self.deps_path)
+            return
+        if not os.path.isfile(self.deps_path):
+            log.error('"%s" is not a file', self.deps_path)
+            sys.exit(1)
+
+        ld: str = self.__LIST_DELIMITER
+        with open(self.deps_path, 'r') as f:
+            csv_reader = csv.reader(f, delimiter=self.__COLUMN_DELIMITER)
+            for i, row in enumerate(csv_reader):
+                if len(row) != self.__COLUMN_NUM:
+                    # not critical, the file will just be rendered again
+                    log.warning('row %d doesn\'t contain %s columns,'
+                                ' ignoring: "%s"',
+                                i + 1, self.__COLUMN_NUM, row)
+                    continue
+                self.update(row[0],
+                            row[1],
+                            row[2].split(ld) if row[2] else [],
+                            row[3].split(ld) if row[3] else [],
+                            row[4].split(ld) if row[4] else [])
+        log.debug('dependency graph contains %d entries', len(self.e))
@@ -0,0 +1,133 @@
+import os
+import sys
+import csv
+from logging import Logger, getLogger
+
+from .utils import atomic_open
+
+log: Logger = getLogger(__name__)
+
+
+# keeps track of the checksum of every rendered file, so files whose
+#   content didn't change are not written again (and keep their mtime);
+#   the entries are kept by dst root, so config documents sharing the
+#   manifest (same db) only see their own files
+class Manifest:
+    # dst root, file name and checksum
+    __COLUMN_NUM: int = 3
+    # written by older versions, without the dst root
+    __OLD_COLUMN_NUM: int = 2
+    __COLUMN_DELIMITER: str = '|'
+
+    def __init__(self, manifest_path: str, dst_path: str) -> None:
+        log.debug('initializing the output manifest on path "%s"',
+                  manifest_path)
+        self.manifest_path: str = manifest_path
+        self.dst_path: str = os.path.abspath(dst_path)
+        # file name (relative to path.dst) to checksum
+        self.e: dict[str, str] = dict()
+        self.written: int = 0
+        self.skipped: int = 0
+        # file names written since the counters were reset
+        self.written_files: list[str] = []
+        # file names produced (written or not) since the counters were reset
+        self.seen: set[str] = set()
+
+    def reset(self) -> None:
+        self.written = 0
+        self.skipped = 0
+        self.written_files = []
+        self.seen = set()
+
+    def is_unchanged(self, file_name: str,
+                     dst_path: str,
+                     checksum: str,
+                     size: int) -> bool:
+        if self.e.get(file_name) != checksum:
+            return False
+        # the file could've been removed or modified outside of pyssg
+        try:
+            return os.stat(dst_path).st_size == size
+        except FileNotFoundError:
+            return False
+
+    def update(self, file_name: str,
+               checksum: str,
+               written: bool) -> None:
+        self.e[file_name] = checksum
+        self.seen.add(file_name)
+        if written:
+            log.debug('"%s" written', file_name)
+            self.written += 1
+            self.written_files.append(file_name)
+        else:
+            log.debug('"%s" skipped, content didn\'t change', file_name)
+            self.skipped += 1
+
+    # for files produced without rendering (copied), so they're not orphaned
+    def keep(self, file_name: str) -> None:
+        self.e.setdefault(file_name, '-')
+        self.seen.add(file_name)
+
+    # removes the files that were produced by a previous build but not by
+    #   this one (since the last reset), or only lists them if dry_run;
+    #   returns the file names
+    def prune(self, dry_run: bool = False) -> list[str]:
+        orphans: list[str] = [f for f in self.e.keys() if f not in self.seen]
+        for f in orphans:
+            path: str = os.path.join(self.dst_path, f)
+            if dry_run:
+                log.info('would remove orphaned file "%s"', path)
+                continue
+            log.info('removing orphaned file "%s"', path)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                log.debug('"%s" was already removed', path)
+            del self.e[f]
+        return orphans
+
+    def write(self) -> None:
+        log.debug('writing output manifest')
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        # read again, other config documents could've written theirs
+        #   since this one was read
+        other_rows: list[list[str]] = [
+            row for row in self.__read_rows()
+            if len(row) == self.__COLUMN_NUM and row[0] != self.dst_path]
+        with atomic_open(self.manifest_path, 'w') as file:
+            csv_writer = csv.writer(file, delimiter=self.__COLUMN_DELIMITER)
+            csv_writer.writerows(other_rows)
+            for k, v in self.e.items():
+                csv_writer.writerow([self.dst_path, k, v])
+
+    def read(self) -> None:
+        log.debug('reading output manifest')
+        if not os.path.exists(self.manifest_path):
+            log.debug('"%s" doesn\'t exist, all files will be written',
+                      self.manifest_path)
+            return
+        if not os.path.isfile(self.manifest_path):
+            log.error('"%s" is not a file', self.manifest_path)
+            sys.exit(1)
+
+        for i, row in enumerate(self.__read_rows()):
+            if len(row) == self.__OLD_COLUMN_NUM:
+                self.e[row[0]] = row[1]
+            elif len(row) == self.__COLUMN_NUM:
+                if row[0] == self.dst_path:
+                    self.e[row[1]] = row[2]
+            else:
+                # not critical, the file will just be written again
+                log.warning('row %d doesn\'t contain %s or %s columns,'
+                            ' ignoring: "%s"',
+                            i + 1, self.__OLD_COLUMN_NUM, self.__COLUMN_NUM,
+                            row)
+        log.debug('manifest contains %d entries', len(self.e))
+
+    def __read_rows(self) -> list[list[str]]:
+        if not os.path.isfile(self.manifest_path):
+            return []
+        with open(self.manifest_path, 'r') as f:
+            csv_reader = csv.reader(f, delimiter=self.__COLUMN_DELIMITER)
+            return list(csv_reader)
@@ -0,0 +1,86 @@
+from time import perf_counter
+from logging import Logger, getLogger
+from typing import Any, Callable
+
+from markdown import Markdown
+
+log: Logger = getLogger(__name__)
+
+# kind of processor to the methods of it that are timed
+_METHODS: dict[str, tuple[str, ...]] = {'pre': ('run',),
+                                        'block': ('test', 'run'),
+                                        'inline': ('handleMatch',),
+                                        'tree': ('run',),
+                                        'post': ('run',)}
+
+
+def _get_processors(md: Markdown) -> list[tuple[str, Any]]:
+    registries: dict[str, Any] = {'pre': md.preprocessors,
+                                  'block': md.parser.blockprocessors,
+                                  'inline': md.inlinePatterns,
+                                  'tree': md.treeprocessors,
+                                  'post': md.postprocessors}
+    return [(kind, p) for kind, registry in registries.items()
+            for p in registry]
+
+
+# time spent by the processors of each md extension, by kind of processor;
+#   only the time of the processor itself is counted, the time of the
+#   processors it calls (such as the inline patterns run by the inline
+#   treeprocessor) goes to them
+class MDExtTimer:
+    def __init__(self) -> None:
+        # extension name to processor kind to seconds
+        self.times: dict[str, dict[str, float]] = dict()
+        # processors already attributed to an extension
+        self.seen: set[int] = set()
+        # time of the nested calls, for each call in progress
+        self.nested: list[float] = []
+
+    # attributes the processors of md not seen yet to ext_name, so it has to
+    #   be called right after each extension is registered ("core" for the
+    #   ones markdown has by default)
+    def instrument(self, md: Markdown, ext_name: str) -> None:
+        self.times.setdefault(ext_name, dict())
+        for kind, p in _get_processors(md):
+            if id(p) in self.seen:
+                continue
+            self.seen.add(id(p))
+            for method in _METHODS[kind]:
+                if hasattr(p, method):
+                    setattr(p, method,
+                            self.__timed(getattr(p, method), ext_name, kind))
+
+    def __timed(self, func: Callable[..., Any],
+                ext_name: str,
+                kind: str) -> Callable[..., Any]:
+        times: dict[str, float] = self.times[ext_name]
+
+        def _timed(*args: Any, **kwargs: Any) -> Any:
+            start: float = perf_counter()
+            self.nested.append(0.0)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed: float = perf_counter() - start
+                times[kind] = times.get(kind, 0.0) \
+                    + elapsed - self.nested.pop()
+                if self.nested:
+                    self.nested[-1] += elapsed
+        return _timed
+
+    def get_total(self, ext_name: str) -> float:
+        return sum(self.times[ext_name].values())
+
+    def report(self, title: str) -> None:
+        total: float = sum(self.get_total(e) for e in self.times.keys())
+        log.info('time per md extension for "%s":', title)
+        log.info('  %-16s %9s %9s %9s %9s %9s %9s %6s', 'extension', 'total',
+                 *_METHODS.keys(), '%')
+        for ext_name in sorted(self.times.keys(), key=self.get_total,
+                               reverse=True):
+            ext_total: float = self.get_total(ext_name)
+            log.info('  %-16s %8.3fs %s %5.1f%%', ext_name, ext_total,
+                     ' '.join(f'{self.times[ext_name].get(k, 0.0):8.3f}s'
+                              for k in _METHODS.keys()),
+                     100 * ext_total / total if total else 0.0)
@@ -1,50 +1,211 @@
+from __future__ import annotations
 import os
+import re
+import sys
+import json
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import cache
+from hashlib import sha256
+from importlib import metadata
+from importlib.metadata import entry_points, version, PackageNotFoundError
+from multiprocessing import get_all_start_methods, get_context
+from multiprocessing.context import BaseContext
 from operator import itemgetter
 from logging import Logger, getLogger
 from typing import Any
 
-from markdown import Markdown
+from markdown import Markdown, __version__ as md_version
 from yafg import YafgExtension
 from pymdvar import VariableExtension
 from markdown_checklist.extension import ChecklistExtension
 from markdown.extensions.toc import TocExtension
 
 from .database import Database
+from .deps import get_digest
+from .cache import MDResult, RenderCache
 from .page import Page
+from .profiler import profiler, ProfileEvent
+from .md_ext_stats import MDExtTimer
 
 log: Logger = getLogger(__name__)
 
 
-# TODO: add configuration testing for extensions config (pymdvar for ex)
+# same as the variables pymdvar replaces, ${VAR}
+ENV_VAR_RE: re.Pattern[str] = re.compile(r'\$\{([a-zA-Z_0-9]*)\}')
+
+# used unless md_exts is set in the config or the dir config; any other
+#   extension python-markdown can load by name can be used too
+DEFAULT_MD_EXTS: list[str] = ['extra',
+                              'meta',
+                              'sane_lists',
+                              'smarty',
+                              'wikilinks',
+                              'toc',
+                              'pymdvar',
+                              'yafg',
+                              'checklist',
+                              'pymdownx.mark',
+                              'pymdownx.caret',
+                              'pymdownx.tilde']
+
+
+def __get_md_exts(variables: dict[str, str],
+                  enable_env: bool,
+                  ext_names: list[str]) -> list[tuple[str, Any]]:
+    # the ones that are configured here, the rest are loaded by name
+    configured: dict[str, Any] = {
+        'toc': lambda: TocExtension(permalink=True,
+                                    baselevel=2),
+        'pymdvar': lambda: VariableExtension(variables=variables,
+                                             enable_env=enable_env),
+        # stripTitle generates an error when True,
+        # if there is no title attr
+        'yafg': lambda: YafgExtension(stripTitle=False,
+                                      figureClass="",
+                                      figcaptionClass="",
+                                      figureNumbering=False,
+                                      figureNumberClass="number",
+                                      figureNumberText="Figure"),
+        'checklist': lambda: ChecklistExtension()}
+    return [(name, configured[name]() if name in configured else name)
+            for name in ext_names]
+
+
+# the timer gets the time spent by each extension, which needs them to be
+#   registered one by one
 def get_md_obj(variables: dict[str, str],
-               enable_env: bool) -> Markdown:
-    exts: list = ['extra',
-                  'meta',
-                  'sane_lists',
-                  'smarty',
-                  'wikilinks',
-                  TocExtension(permalink=True,
-                               baselevel=2),
-                  VariableExtension(variables=variables,
-                                    enable_env=enable_env),
-                  # stripTitle generates an error when True,
-                  # if there is no title attr
-                  YafgExtension(stripTitle=False,
-                                figureClass="",
-                                figcaptionClass="",
-                                figureNumbering=False,
-                                figureNumberClass="number",
-                                figureNumberText="Figure"),
-                  ChecklistExtension(),
-                  'pymdownx.mark',
-                  'pymdownx.caret',
-                  'pymdownx.tilde']
+               enable_env: bool,
+               ext_names: list[str] = DEFAULT_MD_EXTS,
+               timer: MDExtTimer | None = None) -> Markdown:
+    exts: list[tuple[str, Any]] = __get_md_exts(variables,
+                                                enable_env,
+                                                ext_names)
     log.debug('list of md extensions: (%s)',
-              ', '.join([e if isinstance(e, str) else type(e).__name__
-                         for e in exts]))
-    # for some reason, the definition for output_format doesn't include html5
-    #   even though it is listed in the documentation, ignoring
-    return Markdown(extensions=exts, output_format='html5')  # type: ignore
+              ', '.join([name for name, _ in exts]))
+    try:
+        # for some reason, the definition for output_format doesn't include
+        #   html5 even though it is listed in the documentation, ignoring
+        if timer is None:
+            return Markdown(extensions=[e for _, e in exts],
+                            output_format='html5')  # type: ignore
+        md: Markdown = Markdown(output_format='html5')  # type: ignore
+        timer.instrument(md, 'core')
+        for name, e in exts:
+            md.registerExtensions([e], {})
+            timer.instrument(md, name)
+        return md
+    except (ImportError, AttributeError, TypeError) as e:
+        log.error('couldn\'t load md extensions (%s): %s',
+                  ', '.join(ext_names), e)
+        sys.exit(1)
+
+
+# module the extension is loaded from, the name can be an entry point
+#   (such as "extra") or a module path (such as "pymdownx.mark")
+def _get_ext_module(ext: Any) -> str:
+    if not isinstance(ext, str):
+        return type(ext).__module__
+    eps: Any = entry_points()
+    # a dict of groups before python 3.10
+    group: Any = eps.select(group='markdown.extensions') \
+        if hasattr(eps, 'select') else eps.get('markdown.extensions', [])
+    for ep in group:
+        if ep.name == ext:
+            return str(ep.value.split(':')[0])
+    return ext.split(':')[0]
+
+
+# version of the package that provides the module, empty if not known;
+#   packages_distributions is only there since python 3.10, before that
+#   the package is expected to be named after the module
+@cache
+def _get_module_version(module: str) -> str:
+    top: str = module.split('.')[0]
+    dists: list[str] = [top]
+    if hasattr(metadata, 'packages_distributions'):
+        dists = metadata.packages_distributions().get(top, [])
+    for dist in dists:
+        try:
+            return version(dist)
+        except PackageNotFoundError:
+            continue
+    return ''
+
+
+# identifies the md pipeline (markdown version, extensions, their versions
+#   and configs), so cached html is only reused if it would be generated
+#   the same way
+def get_md_fingerprint(variables: dict[str, str],
+                       enable_env: bool,
+                       ext_names: list[str] = DEFAULT_MD_EXTS) -> str:
+    exts: list[tuple[str, Any]] = __get_md_exts(variables,
+                                                enable_env,
+                                                ext_names)
+    desc: list[Any] = [md_version]
+    for _, e in exts:
+        ext_version: str = _get_module_version(_get_ext_module(e))
+        if isinstance(e, str):
+            desc.append([e, ext_version])
+        else:
+            desc.append([type(e).__name__, ext_version, e.getConfigs()])
+    # the env vars used by pymdvar (if enabled) are only an input of the
+    #   files that reference them, see MDParser.env_digests
+
+    # callables (such as the toc slugify) are identified by name
+    #   as their repr includes the memory address
+    def __default(o: Any) -> str:
+        if callable(o):
+            return f'{o.__module__}.{o.__qualname__}'
+        return str(o)
+
+    raw: str = json.dumps(desc, sort_keys=True, default=__default)
+    return sha256(raw.encode('utf-8')).hexdigest()
+
+
+def convert_md(md: Markdown, src_file: str) -> MDResult:
+    log.debug('parsing md into html for "%s"', src_file)
+    with profiler.span('md', src_file), open(src_file, 'r') as f:
+        content: str = md.reset().convert(f.read())
+    # ignoring md.Meta type as it is not yet defined
+    #   (because it is from an extension); the toc extension
+    #   could be disabled
+    return (content,
+            getattr(md, 'toc', ''),
+            getattr(md, 'toc_tokens', []),
+            md.Meta)  # type: ignore
+
+
+# each worker process holds its own md object, created once
+#   by the pool initializer
+_worker_md: Markdown | None = None
+
+
+def _init_worker(variables: dict[str, str],
+                 enable_env: bool,
+                 ext_names: list[str],
+                 profile: bool = False) -> None:
+    global _worker_md
+    _worker_md = get_md_obj(variables, enable_env, ext_names)
+    profiler.enabled = profile
+    profiler.reset()
+
+
+# forking with other threads running (serve mode rebuilds in one) can
+#   deadlock the workers, start them from scratch then
+def _get_mp_context() -> BaseContext:
+    if threading.active_count() == 1:
+        return get_context()
+    if 'forkserver' in get_all_start_methods():
+        return get_context('forkserver')
+    return get_context('spawn')
+
+
+# the profiling events (if any) are sent back with the result
+def _convert_worker(src_file: str) -> tuple[MDResult, list[ProfileEvent]]:
+    if _worker_md is None:
+        raise RuntimeError('md worker used without being initialized')
+    return convert_md(_worker_md, src_file), profiler.pop_events()
 
 
 # page and file is basically a synonym
@@ -52,13 +213,23 @@ class MDParser:
     def __init__(self, files: list[str],
                  config: dict,
                  dir_config: dict,
-                 db: Database):
+                 db: Database,
+                 cache: RenderCache | None = None,
+                 jobs: int = 1,
+                 stats: dict[str, os.stat_result] | None = None,
+                 ext_stats: bool = False):
         log.debug('initializing the md parser with %d files', len(files))
         self.files: list[str] = files
+        # stat results of the files, if already known
+        self.stats: dict[str, os.stat_result] = stats if stats is not None \
+            else dict()
         self.config: dict = config
         self.dir_config: dict = dir_config
         self.db: Database = db
-        # TODO: actually add extensions support, for now only pymdvar is configured
+        # only used for incremental builds
+        self.cache: RenderCache | None = cache
+        # number of processes used to convert the md files
+        self.jobs: int = jobs
         self.pymdvar_vars: dict[str, str] = dict()
         self.pymdvar_enable_env: bool = False
         if 'exts' in config and 'pymdvar' in config['exts']:
@@ -70,33 +241,152 @@ class MDParser:
         log.debug('pymdvar_variables: %s', self.pymdvar_vars)
         log.debug('pymdvar_enable_env: %s', self.pymdvar_enable_env)
 
-        self.md: Markdown = get_md_obj(self.pymdvar_vars, self.pymdvar_enable_env)
+        self.md_exts: list[str] = self.__get_md_exts()
+        # measures the time of each md extension, only if asked for
+        self.timer: MDExtTimer | None = MDExtTimer() if ext_stats else None
+        self.md: Markdown = get_md_obj(self.pymdvar_vars,
+                                       self.pymdvar_enable_env,
+                                       self.md_exts,
+                                       self.timer)
+        self.md_fingerprint: str = get_md_fingerprint(self.pymdvar_vars,
+                                                      self.pymdvar_enable_env,
+                                                      self.md_exts)
+        log.debug('md fingerprint: "%s"', self.md_fingerprint)
+        # digest of the env vars referenced by each file (with their values),
+        #   only if pymdvar reads them; the html of a file depends on these
+        #   and not on the rest of the env
+        self.env_digests: dict[str, str] = dict()
 
         self.all_files: list[Page] = []
         self.all_tags: list[tuple[str, str]] = []
+        # tag name to the pages that contain it, in the same order as all_files
+        self.tag_index: dict[str, list[Page]] = dict()
+        self.tag_counts: dict[str, int] = dict()
+
+    # from the dir config, else from the config, else the default ones
+    def __get_md_exts(self) -> list[str]:
+        value: Any = self.dir_config.get('md_exts',
+                                         self.config.get('md_exts',
+                                                         DEFAULT_MD_EXTS))
+        if not isinstance(value, list) or \
+                not all(isinstance(e, str) for e in value):
+            log.error('"md_exts" field isn\'t of type "list" of "str"')
+            sys.exit(1)
+        md_exts: list[str] = value
+        # the page metadata is read from it
+        if 'meta' not in md_exts:
+            log.warning('"meta" md extension is required, adding it')
+            md_exts = ['meta', *md_exts]
+        log.debug('md_exts: %s', md_exts)
+        return md_exts
+
+    # empty if the file doesn't reference any env var (not in the pymdvar
+    #   variables, which take precedence) or they aren't read at all
+    def __get_env_digest(self, src_file: str) -> str:
+        if not self.pymdvar_enable_env or 'pymdvar' not in self.md_exts:
+            return ''
+        with open(src_file, 'r') as f:
+            names: set[str] = set(ENV_VAR_RE.findall(f.read()))
+        env: dict[str, str | None] = {n: os.environ.get(n)
+                                      for n in names
+                                      if n not in self.pymdvar_vars}
+        return get_digest(env) if env else ''
+
+    # the cached html of a file also depends on the env vars it references
+    def __get_fingerprint(self, file_name: str) -> str:
+        env_digest: str = self.env_digests.get(file_name, '')
+        if not env_digest:
+            return self.md_fingerprint
+        return f'{self.md_fingerprint}:{env_digest}'
+
+    # the checksum was just computed by the db, so use it to look up
+    #   the previous conversion result before running the md pipeline
+    def __get_cached_result(self, file_name: str) -> MDResult | None:
+        # all files need to be converted to measure the extensions
+        if self.cache is None or self.timer is not None:
+            return None
+        checksum: str = self.db.e[file_name].checksum
+        return self.cache.get(checksum, self.__get_fingerprint(file_name))
+
+    def __convert_files(self, files: list[str]) -> dict[str, MDResult]:
+        src_files: list[str] = [os.path.join(self.dir_config['src'], f)
+                                for f in files]
+        converted: list[MDResult]
+        # the extensions are only measured in this process
+        if self.jobs > 1 and len(files) > 1 and self.timer is None:
+            log.debug('parsing %d files with %d jobs', len(files), self.jobs)
+            # send the files in batches, so each worker gets a few
+            #   files per round trip
+            chunksize: int = max(1, len(files) // (self.jobs * 4))
+            with ProcessPoolExecutor(max_workers=self.jobs,
+                                     mp_context=_get_mp_context(),
+                                     initializer=_init_worker,
+                                     initargs=(self.pymdvar_vars,
+                                               self.pymdvar_enable_env,
+                                               self.md_exts,
+                                               profiler.enabled)) as ex:
+                # map keeps the order of the input, so the results
+                #   are merged back deterministically
+                converted = []
+                for result, events in ex.map(_convert_worker,
+                                             src_files,
+                                             chunksize=chunksize):
+                    converted.append(result)
+                    profiler.extend(events)
+        else:
+            converted = [convert_md(self.md, sf) for sf in src_files]
+
+        results: dict[str, MDResult] = dict(zip(files, converted))
+        if self.cache is not None:
+            for f, result in results.items():
+                self.cache.set(self.db.e[f].checksum,
+                               result,
+                               self.__get_fingerprint(f))
+        return results
 
     def parse_files(self) -> None:
         log.debug('parsing all files')
-        for i, f in enumerate(self.files):
-            log.debug('parsing file "%s"', f)
+        self.all_files = []
+        self.all_tags = []
+        self.tag_index = dict()
+        self.tag_counts = dict()
+        self.env_digests = dict()
+
+        results: dict[str, MDResult] = dict()
+        pending: list[str] = []
+        for f in self.files:
+            log.debug('updating db entry for file "%s"', f)
             src_file: str = os.path.join(self.dir_config['src'], f)
             log.debug('path "%s"', src_file)
-            self.db.update(src_file, remove=f'{self.dir_config["src"]}/')
+            with profiler.span('db', f):
+                self.db.update(src_file,
+                               remove=f'{self.dir_config["src"]}/',
+                               st=self.stats.get(f))
+            self.env_digests[f] = self.__get_env_digest(src_file)
 
-            log.debug('parsing md into html')
-            content: str = self.md.reset().convert(open(src_file).read())
-            # ignoring md.Meta type as it is not yet defined
-            #   (because it is from an extension)
+            cached: MDResult | None = self.__get_cached_result(f)
+            if cached is None:
+                pending.append(f)
+            else:
+                results[f] = cached
+
+        log.debug('parsing md into html for %d files', len(pending))
+        results.update(self.__convert_files(pending))
+
+        for f in self.files:
+            log.debug('parsing file "%s"', f)
+            content, toc, toc_tokens, meta = results[f]
             page: Page = Page(f,
                               self.db.e[f].ctimestamp,
                               self.db.e[f].mtimestamp,
                               content,
-                              self.md.toc,  # type: ignore
-                              self.md.toc_tokens,  # type: ignore
-                              self.md.Meta,  # type: ignore
+                              toc,
+                              toc_tokens,
+                              meta,
                               self.config,
                               self.dir_config)
-            page.parse_metadata()
+            with profiler.span('metadata', f):
+                page.parse_metadata()
 
             log.debug('adding to file list')
             self.all_files.append(page)
@@ -107,9 +397,10 @@ class MDParser:
 
                 log.debug('add all tags to tag list')
                 for t in page.tags:
-                    if t[0] not in list(map(itemgetter(0), self.all_tags)):
+                    if t[0] not in self.tag_index:
                         log.debug('adding tag "%s"', t[0])
                         self.all_tags.append(t)
+                        self.tag_index[t[0]] = []
                     else:
                         log.debug('ignoring tag "%s"; already present', t[0])
             else:
@@ -119,6 +410,16 @@ class MDParser:
         self.all_files.sort(reverse=True)
         self.all_tags.sort(key=itemgetter(0))
 
+        # filled after sorting so each tag keeps the order of all_files
+        log.debug('building tag index')
+        self.tag_index = {t[0]: [] for t in self.all_tags}
+        for p in self.all_files:
+            # a tag could be repeated in the metadata
+            for tag_name in set(map(itemgetter(0), p.tags)):
+                if tag_name in self.tag_index:
+                    self.tag_index[tag_name].append(p)
+        self.tag_counts = {k: len(v) for k, v in self.tag_index.items()}
+
         pages_amount: int = len(self.all_files)
         # note that prev and next are switched because of the
         # reverse ordering of all_pages
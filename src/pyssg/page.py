@@ -1,3 +1,4 @@
+from __future__ import annotations
 from datetime import datetime, timezone
 from logging import Logger, getLogger
 from typing import Any
@@ -0,0 +1,59 @@
+from __future__ import annotations
+from logging import Logger, getLogger
+from typing import Any
+
+log: Logger = getLogger(__name__)
+
+
+# splits the items in pages of size items, all of them in a
+#   single page if size is 0
+def paginate(items: list[Any], size: int) -> list[list[Any]]:
+    if size <= 0 or not items:
+        return [items]
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+# file name of page number (starting from 1) of a listing, the first page
+#   keeps the name the listing always had, so links to it don't change;
+#   the rest go in a directory with the same name (index.html, index/2.html)
+def get_page_file_name(base: str, ext: str, number: int) -> str:
+    if number == 1:
+        return f'{base}{ext}'
+    return f'{base}/{number}{ext}'
+
+
+# a page of a listing, as exposed to the templates
+class Pagination:
+    def __init__(self, items: list[Any],
+                 number: int,
+                 urls: list[str]) -> None:
+        # items in this page only
+        self.items: list[Any] = items
+        # starting from 1
+        self.number: int = number
+        self.count: int = len(urls)
+        # urls of all the pages of the listing
+        self.urls: list[str] = urls
+        self.url: str = urls[number - 1]
+        self.first_url: str = urls[0]
+        self.last_url: str = urls[-1]
+        self.previous_url: str | None = urls[number - 2] \
+            if number > 1 else None
+        self.next_url: str | None = urls[number] \
+            if number < self.count else None
+
+    def __str__(self) -> str:
+        return f'{self.number}/{self.count} ({self.url})'
+
+
+# a page of a feed, the main one or the one of a tag
+class Feed(Pagination):
+    def __init__(self, items: list[Any],
+                 number: int,
+                 urls: list[str],
+                 summary_only: bool = False,
+                 tag: tuple[str, str] | None = None) -> None:
+        super().__init__(items, number, urls)
+        # only include the summary of the pages, not the content
+        self.summary_only: bool = summary_only
+        self.tag: tuple[str, str] | None = tag
@@ -0,0 +1,141 @@
+from __future__ import annotations
+import os
+import json
+import threading
+from time import perf_counter
+from contextlib import contextmanager
+from logging import Logger, getLogger
+from typing import Any, Iterator
+
+from .utils import atomic_open
+
+log: Logger = getLogger(__name__)
+
+# stage, name (file or template), start and duration (in seconds),
+#   process id, thread id and extra info
+ProfileEvent = tuple[str, str, float, float, int, int, dict[str, Any]]
+
+# number of slowest files shown for each stage by default
+DEFAULT_TOP: int = 10
+
+
+# records how long each stage of the build takes for each file, disabled
+#   by default so it costs next to nothing unless --profile is used; the
+#   stages are nested (the build stage includes all the others), so their
+#   totals overlap
+class Profiler:
+    def __init__(self) -> None:
+        self.enabled: bool = False
+        self.events: list[ProfileEvent] = []
+        # the timestamps of the trace are relative to this
+        self.origin: float = perf_counter()
+
+    def enable(self) -> None:
+        log.debug('enabling the profiler')
+        self.enabled = True
+        self.origin = perf_counter()
+        self.reset()
+
+    # forked workers start with a copy of the events of the main process,
+    #   which would be sent back again otherwise
+    def reset(self) -> None:
+        self.events = []
+
+    @contextmanager
+    def span(self, stage: str,
+             name: str = '',
+             **info: Any) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        start: float = perf_counter()
+        try:
+            yield
+        finally:
+            self.events.append((stage, name, start, perf_counter() - start,
+                                os.getpid(), threading.get_ident(), info))
+
+    # events recorded since the last call, used by the worker processes
+    #   to send theirs back with each result
+    def pop_events(self) -> list[ProfileEvent]:
+        events: list[ProfileEvent] = self.events
+        self.events = []
+        return events
+
+    def extend(self, events: list[ProfileEvent]) -> None:
+        self.events.extend(events)
+
+    # stage to number of events and total time
+    def get_totals(self) -> dict[str, tuple[int, float]]:
+        totals: dict[str, tuple[int, float]] = dict()
+        for stage, _, _, duration, _, _, _ in self.events:
+            count, total = totals.get(stage, (0, 0.0))
+            totals[stage] = (count + 1, total + duration)
+        return totals
+
+    # the top slowest names of the stage, with their total time; by one of
+    #   the extra info keys instead of the name if given (template)
+    def get_top(self, stage: str,
+                top: int = DEFAULT_TOP,
+                key: str | None = None) -> list[tuple[str, float]]:
+        totals: dict[str, float] = dict()
+        for s, name, _, duration, _, _, info in self.events:
+            if s != stage:
+                continue
+            k: str = str(info.get(key, '')) if key is not None else name
+            totals[k] = totals.get(k, 0.0) + duration
+        return sorted(totals.items(), key=lambda t: t[1], reverse=True)[:top]
+
+    def report(self, top: int = DEFAULT_TOP) -> None:
+        totals: dict[str, tuple[int, float]] = self.get_totals()
+        if not totals:
+            log.info('no profiling data recorded')
+            return
+        log.info('time per stage (stages are nested, totals overlap):')
+        for stage, (count, total) in sorted(totals.items(),
+                                            key=lambda t: t[1][1],
+                                            reverse=True):
+            log.info('  %-10s %9.3fs %7d event(s)', stage, total, count)
+        for stage in sorted(totals.keys()):
+            names: list[tuple[str, float]] = self.get_top(stage, top)
+            # stages without per file events are only shown in the totals
+            if all(n == '' for n, _ in names):
+                continue
+            log.info('slowest %d in "%s":', len(names), stage)
+            for name, total in names:
+                log.info('  %9.3fs %s', total, name)
+        templates: list[tuple[str, float]] = self.get_top('render', top,
+                                                          'template')
+        if templates:
+            log.info('slowest %d templates:', len(templates))
+            for name, total in templates:
+                log.info('  %9.3fs %s', total, name)
+
+    # chrome trace event format, can be loaded with chrome://tracing
+    #   or https://ui.perfetto.dev
+    def get_trace(self) -> dict[str, Any]:
+        trace_events: list[dict[str, Any]] = []
+        for stage, name, start, duration, pid, tid, info in self.events:
+            trace_events.append(dict(name=f'{stage} {name}'.strip(),
+                                     cat=stage,
+                                     ph='X',
+                                     ts=(start - self.origin) * 1e6,
+                                     dur=duration * 1e6,
+                                     pid=pid,
+                                     tid=tid,
+                                     args=info))
+        totals: dict[str, Any] = {stage: dict(count=count, total=total)
+                                  for stage, (count, total)
+                                  in self.get_totals().items()}
+        return dict(traceEvents=trace_events,
+                    displayTimeUnit='ms',
+                    otherData=dict(totals=totals))
+
+    def write(self, trace_path: str) -> None:
+        log.info('writing profile trace to "%s"', trace_path)
+        with atomic_open(trace_path, 'w') as f:
+            json.dump(self.get_trace(), f)
+
+
+# shared by the whole process (and the forked workers)
+profiler: Profiler = Profiler()
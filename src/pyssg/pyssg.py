@@ -1,15 +1,23 @@
+from __future__ import annotations
 import os
 import sys
-from importlib.resources import path as rpath
-from typing import Union
+from typing import TYPE_CHECKING, Union
 from logging import Logger, getLogger, DEBUG
 from argparse import ArgumentParser
 
 from .arg_parser import get_parser
 from .utils import create_dir, copy_file, get_expanded_path
-from .configuration import get_parsed_config, get_static_config, DEFAULT_CONFIG_PATH, VERSION
-from .database import Database
-from .builder import Builder
+from .configuration import get_parsed_config, get_static_config, DEFAULT_CONFIG_PATH, get_version
+from .cache import RenderCache, get_cache_path
+from .profiler import profiler
+
+# the builders (jinja, markdown and its extensions), the watcher, the
+#   server (asyncio) and importlib.resources are slow to import, so they're
+#   imported only once they're used; pyssg is run a lot for small things
+#   (--version, --init)
+if TYPE_CHECKING:
+    from .site_builder import SiteBuilder
+    from .watcher import Watcher
 
 log: Logger = getLogger(__name__)
 
@@ -37,7 +45,7 @@ def main() -> None:
         _log_perror('no arguments passed other than "debug" and "config"')
 
     if args['version']:
-        log.info('pyssg v%s', VERSION)
+        log.info('pyssg v%s', get_version())
         sys.exit(0)
 
     if args['debug']:
@@ -57,6 +65,7 @@ def main() -> None:
     log.debug('checked config file path, final config path "%s"', config_path)
 
     if args['copy_default_config']:
+        from importlib.resources import path as rpath
         log.info('copying default config file')
         create_dir(config_dir)
         with rpath('pyssg.plt', 'default.yaml') as p:
@@ -80,7 +89,15 @@ def main() -> None:
         config['info']['version'] = static_config['info']['version']
         config['info']['debug'] = str(args['debug'])
 
+    if args['clear_cache']:
+        for config in config_all:
+            log.info('clearing cache for "%s"', config['title'])
+            RenderCache(get_cache_path(config)).clear()
+        if not (args['build'] or args['watch'] or args['serve']):
+            sys.exit(0)
+
     if args['init']:
+        from importlib.resources import path as rpath
         log.info('initializing the directory structure and copying over templates')
         for config in config_all:
             log.info('initializing directories for "%s"', config['title'])
@@ -101,19 +118,129 @@ def main() -> None:
         log.info('finished initialization')
         sys.exit(0)
 
-    if args['build']:
+    if args['build'] or args['watch'] or args['serve']:
+        from .site_builder import SiteBuilder
         log.info('building the html files')
+        jobs: int = int(args['jobs']) or os.cpu_count() or 1
+        log.debug('using %d job(s)', jobs)
+        # watching only makes sense if rebuilds are incremental
+        incremental: bool = bool(args['incremental']
+                                 or args['watch']
+                                 or args['serve'])
+        profile: bool = bool(args['profile'] or args['profile_output'])
+        if profile:
+            profiler.enable()
+        site_builders: list[SiteBuilder] = []
         for config in config_all:
-            log.info('building html for "%s"', config['title'])
-            db: Database = Database(config['path']['db'])
-            db.read()
-
-            log.debug('building all dir_paths found in config')
-            for dir_path in config['dirs'].keys():
-                log.debug('building for "%s"', dir_path)
-                builder: Builder = Builder(config, db, dir_path)
-                builder.build()
-
-            db.write()
+            # rendered files are kept in memory only to serve them
+            outputs: dict[str, bytes] | None = dict() if args['serve'] \
+                else None
+            site_builder: SiteBuilder = SiteBuilder(config,
+                                                    jobs,
+                                                    incremental,
+                                                    int(args['cache_size']),
+                                                    outputs,
+                                                    bool(args['paranoid']),
+                                                    str(args['checksum']),
+                                                    bool(args['fsync']),
+                                                    bool(args['gc_dry_run']),
+                                                    bool(args['md_ext_stats']))
+            site_builder.build()
+            site_builders.append(site_builder)
         log.info('finished building the html files')
+
+        if profile:
+            profiler.report(int(args['profile_top']))
+            if args['profile_output']:
+                profiler.write(get_expanded_path(str(args['profile_output'])))
+            # rebuilds are usually too small to be worth profiling
+            profiler.enabled = False
+
+        if args['serve']:
+            _serve(site_builders, str(args['host']), int(args['port']))
+        elif args['watch']:
+            _watch(site_builders)
         sys.exit(0)
+
+
+def _get_watcher(site_builders: list['SiteBuilder']) -> 'Watcher':
+    from .watcher import Watcher
+    paths: list[str] = []
+    exclude: list[str] = []
+    for sb in site_builders:
+        for path in (sb.config['path']['src'], sb.config['path']['plt']):
+            if path not in paths:
+                paths.append(path)
+        # in case these live inside src or plt
+        exclude.extend([sb.config['path']['dst'],
+                        sb.config['path']['db'],
+                        get_cache_path(sb.config)])
+    return Watcher(paths, exclude)
+
+
+def _rebuild(site_builders: list['SiteBuilder'], changes: set[str]) -> None:
+    log.info('detected %d changed file(s), rebuilding', len(changes))
+    for sb in site_builders:
+        sb.build()
+    log.info('finished rebuilding the html files')
+
+
+# an error while rebuilding (a template typo, a broken md file or any of the
+#   config checks, which exit) shouldn't stop watching for the fix; returns
+#   if the rebuild succeeded
+def _try_rebuild(site_builders: list['SiteBuilder'],
+                 changes: set[str]) -> bool:
+    try:
+        _rebuild(site_builders, changes)
+    except (Exception, SystemExit):
+        log.exception('couldn\'t rebuild the html files, waiting for changes')
+        return False
+    return True
+
+
+def _watch(site_builders: list['SiteBuilder']) -> None:
+    watcher: 'Watcher' = _get_watcher(site_builders)
+    try:
+        watcher.watch(lambda changes: _try_rebuild(site_builders, changes))
+    except KeyboardInterrupt:
+        log.info('stopped watching')
+
+
+def _serve(site_builders: list['SiteBuilder'], host: str, port: int) -> None:
+    import asyncio
+    from .server import Server
+
+    # each config document has its own dst, so one server (port) for each
+    servers: list[Server] = [Server(sb.config['path']['dst'],
+                                    sb.outputs,
+                                    host,
+                                    port + i)
+                             for i, sb in enumerate(site_builders)]
+    watcher: 'Watcher' = _get_watcher(site_builders)
+
+    async def _run() -> None:
+        for server in servers:
+            await server.start()
+        log.info('watching for changes in (%s), press Ctrl+C to stop',
+                 ', '.join(watcher.paths))
+        try:
+            while True:
+                # polling and building block, keep the servers responsive
+                changes: set[str] = await asyncio.to_thread(watcher.poll)
+                if changes:
+                    rebuilt: bool = await asyncio.to_thread(_try_rebuild,
+                                                            site_builders,
+                                                            changes)
+                    # the pages are only reloaded once the error is fixed
+                    if rebuilt:
+                        for server in servers:
+                            server.reload()
+                await asyncio.sleep(watcher.interval)
+        finally:
+            for server in servers:
+                await server.stop()
+
+    try:
+        asyncio.run(_run())
+    except KeyboardInterrupt:
+        log.info('stopped serving')
@@ -0,0 +1,120 @@
+import os
+from logging import Logger, getLogger
+
+log: Logger = getLogger(__name__)
+
+
+# snapshot of a directory tree, taken in a single pass, so the directories,
+#   the files (by extension) and their stat results can be queried without
+#   touching the filesystem again; paths are relative to path and are in the
+#   same order os.walk would give them
+class DirScan:
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self.dirs: list[str] = []
+        # file name to dir entry, only the files returned by get_files
+        #   are stat'd (most of the tree are usually assets)
+        self.files: dict[str, os.DirEntry[str]] = dict()
+        # file name to stat result (following symlinks)
+        self.stats: dict[str, os.stat_result] = dict()
+        # symlinked dirs are listed but not walked, same as os.walk
+        self.links: set[str] = set()
+
+    # the files that can't be stat'd (broken symlinks) are left out
+    def get_files(self, exts: tuple[str, ...]) -> list[str]:
+        files: list[str] = []
+        for f, entry in self.files.items():
+            if not f.endswith(exts):
+                continue
+            if f not in self.stats:
+                try:
+                    self.stats[f] = entry.stat()
+                except OSError:
+                    log.debug('couldn\'t stat "%s", ignoring', f)
+                    continue
+            files.append(f)
+        return files
+
+    # scan of a subdirectory, as if it was scanned with the exclude_dirs
+    #   (dir names, anywhere in the tree), without the exclude_paths (dir
+    #   paths relative to the subdirectory); scans it again only if it wasn't
+    #   walked in this scan
+    def get_subtree(self, dir_name: str,
+                    exclude_dirs: list[str] = [],
+                    exclude_paths: list[str] = []) -> 'DirScan':
+        if dir_name in ('', '.'):
+            dir_name = ''
+        elif dir_name not in self.dirs or dir_name in self.links:
+            log.debug('"%s" wasn\'t walked in scan of "%s", scanning it',
+                      dir_name, self.path)
+            return scan_dir(os.path.join(self.path, dir_name),
+                            exclude_dirs).get_subtree('', [], exclude_paths)
+
+        prefix: str = f'{dir_name}/' if dir_name else ''
+        exclude: set[str] = set(exclude_dirs)
+        scan: DirScan = DirScan(os.path.join(self.path, dir_name)
+                                if dir_name else self.path)
+
+        def _is_excluded(rel_dir: str) -> bool:
+            if rel_dir == '':
+                return False
+            if not exclude.isdisjoint(rel_dir.split('/')):
+                return True
+            return any(rel_dir == p or rel_dir.startswith(f'{p}/')
+                       for p in exclude_paths)
+
+        for d in self.dirs:
+            if d.startswith(prefix):
+                rel: str = d[len(prefix):]
+                if not _is_excluded(rel):
+                    scan.dirs.append(rel)
+                    if d in self.links:
+                        scan.links.add(rel)
+        for f, entry in self.files.items():
+            if f.startswith(prefix):
+                rel = f[len(prefix):]
+                if not _is_excluded(os.path.dirname(rel)):
+                    scan.files[rel] = entry
+                    if f in self.stats:
+                        scan.stats[rel] = self.stats[f]
+        return scan
+
+
+def scan_dir(path: str,
+             exclude_dirs: list[str] = []) -> DirScan:
+    log.debug('scanning path "%s" except directories (%s)',
+              path, ', '.join(exclude_dirs))
+    scan: DirScan = DirScan(path)
+    # relative dir names, '' is path itself
+    pending: list[str] = ['']
+    while pending:
+        rel_root: str = pending.pop()
+        subdirs: list[str] = []
+        try:
+            with os.scandir(os.path.join(path, rel_root)) as it:
+                for entry in it:
+                    rel: str = os.path.join(rel_root, entry.name)
+                    try:
+                        is_dir: bool = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        if entry.name in exclude_dirs:
+                            log.debug('excluding dir "%s"', rel)
+                            continue
+                        scan.dirs.append(rel)
+                        if entry.is_symlink():
+                            scan.links.add(rel)
+                        else:
+                            subdirs.append(rel)
+                        continue
+                    scan.files[rel] = entry
+        except OSError:
+            # same as os.walk, unreadable or non existent dirs are ignored
+            log.debug('couldn\'t scan "%s", ignoring', rel_root)
+            continue
+        # walk them in order, same as os.walk
+        pending.extend(reversed(subdirs))
+    log.debug('found %d dirs and %d files in "%s"',
+              len(scan.dirs), len(scan.files), path)
+    return scan
@@ -0,0 +1,162 @@
+from __future__ import annotations
+import os
+import asyncio
+import mimetypes
+from logging import Logger, getLogger
+from urllib.parse import unquote, urlsplit
+
+log: Logger = getLogger(__name__)
+
+# path used by the pages to listen for reload events
+EVENTS_PATH: str = '/__pyssg__/events'
+
+# injected at the end of every html page served
+RELOAD_SCRIPT: bytes = (b'<script>new EventSource("' + EVENTS_PATH.encode()
+                        + b'").onmessage = () => location.reload();</script>')
+
+_REASONS: dict[int, str] = {200: 'OK',
+                            400: 'Bad Request',
+                            404: 'Not Found',
+                            405: 'Method Not Allowed'}
+
+
+def inject_reload_script(content: bytes) -> bytes:
+    i: int = content.rfind(b'</body>')
+    if i == -1:
+        return content + RELOAD_SCRIPT
+    return content[:i] + RELOAD_SCRIPT + content[i:]
+
+
+# serves path.dst over http and notifies the open pages (through server sent
+#   events) when they need to reload; rendered files in outputs (file name
+#   relative to path.dst to content) are served from memory, so they don't
+#   have to wait for (or be read back from) the disk
+class Server:
+    def __init__(self, dst_path: str,
+                 outputs: dict[str, bytes] | None = None,
+                 host: str = 'localhost',
+                 port: int = 8000) -> None:
+        log.debug('initializing server for "%s"', dst_path)
+        self.dst_path: str = os.path.realpath(dst_path)
+        self.outputs: dict[str, bytes] = outputs if outputs is not None \
+            else dict()
+        self.host: str = host
+        self.port: int = port
+        self.clients: set[asyncio.Queue[str | None]] = set()
+        self.server: asyncio.Server | None = None
+
+    async def start(self) -> None:
+        self.server = await asyncio.start_server(self.__handle,
+                                                 self.host,
+                                                 self.port)
+        # in case port 0 was used
+        self.port = self.server.sockets[0].getsockname()[1]
+        log.info('serving "%s" on http://%s:%d',
+                 self.dst_path, self.host, self.port)
+
+    async def stop(self) -> None:
+        if self.server is not None:
+            # let the event streams finish, else closing waits for them
+            for queue in self.clients:
+                queue.put_nowait(None)
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+    def reload(self) -> None:
+        log.debug('sending reload to %d client(s)', len(self.clients))
+        for queue in self.clients:
+            queue.put_nowait('reload')
+
+    # file name relative to path.dst, or None if it is outside of it
+    def get_file_name(self, url_path: str) -> str | None:
+        path: str = unquote(urlsplit(url_path).path)
+        full_path: str = os.path.realpath(os.path.join(self.dst_path,
+                                                       path.lstrip('/')))
+        if full_path != self.dst_path and \
+                not full_path.startswith(self.dst_path + os.sep):
+            return None
+        if path.endswith('/') or os.path.isdir(full_path):
+            full_path = os.path.join(full_path, 'index.html')
+        return os.path.relpath(full_path, self.dst_path)
+
+    def get_content(self, file_name: str) -> bytes | None:
+        content: bytes | None = self.outputs.get(file_name)
+        if content is not None:
+            log.debug('serving "%s" from memory', file_name)
+            return content
+        try:
+            with open(os.path.join(self.dst_path, file_name), 'rb') as f:
+                return f.read()
+        except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+            return None
+
+    async def __handle(self, reader: asyncio.StreamReader,
+                       writer: asyncio.StreamWriter) -> None:
+        try:
+            request: list[str] = (await reader.readline()).decode('latin-1') \
+                .split()
+            # the headers are not needed, just consume them
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+            if len(request) != 3:
+                await self.__respond(writer, 400, 'GET', b'')
+                return
+            method, url_path, _ = request
+            if method not in ('GET', 'HEAD'):
+                await self.__respond(writer, 405, method, b'')
+                return
+            if url_path == EVENTS_PATH:
+                await self.__events(writer)
+                return
+
+            file_name: str | None = self.get_file_name(url_path)
+            content: bytes | None = None
+            if file_name is not None:
+                content = self.get_content(file_name)
+            if file_name is None or content is None:
+                log.debug('"%s" not found', url_path)
+                await self.__respond(writer, 404, method, b'not found')
+                return
+
+            content_type: str = mimetypes.guess_type(file_name)[0] \
+                or 'application/octet-stream'
+            if content_type == 'text/html':
+                content = inject_reload_script(content)
+            await self.__respond(writer, 200, method, content, content_type)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def __respond(self, writer: asyncio.StreamWriter,
+                        status: int,
+                        method: str,
+                        content: bytes,
+                        content_type: str = 'text/plain') -> None:
+        writer.write((f'HTTP/1.1 {status} {_REASONS[status]}\r\n'
+                      f'Content-Type: {content_type}\r\n'
+                      f'Content-Length: {len(content)}\r\n'
+                      'Cache-Control: no-cache\r\n'
+                      'Connection: close\r\n\r\n').encode('latin-1'))
+        if method != 'HEAD':
+            writer.write(content)
+        await writer.drain()
+
+    async def __events(self, writer: asyncio.StreamWriter) -> None:
+        writer.write(b'HTTP/1.1 200 OK\r\n'
+                     b'Content-Type: text/event-stream\r\n'
+                     b'Cache-Control: no-cache\r\n'
+                     b'Connection: keep-alive\r\n\r\n')
+        await writer.drain()
+        queue: asyncio.Queue[str | None] = asyncio.Queue()
+        self.clients.add(queue)
+        try:
+            while True:
+                event: str | None = await queue.get()
+                if event is None:
+                    break
+                writer.write(f'data: {event}\n\n'.encode('utf-8'))
+                await writer.drain()
+        finally:
+            self.clients.discard(queue)
@@ -0,0 +1,148 @@
+from __future__ import annotations
+import os
+from logging import Logger, getLogger
+from typing import Any
+
+from jinja2 import Environment
+
+from .database import Database
+from .sqlite_database import SQLiteDatabase, is_sqlite_path
+from .cache import RenderCache, get_cache_path, DEFAULT_CACHE_SIZE
+from .manifest import Manifest
+from .deps import DepGraph
+from .builder import Builder, get_jinja_env
+from .scanner import DirScan, scan_dir
+from .utils import fsync_files
+from .profiler import profiler
+
+log: Logger = getLogger(__name__)
+
+
+# builds all the dir_paths of a config document, holding everything that is
+#   shared between them (db, cache, manifest, dependency graph and the
+#   builders themselves), so it can be kept alive between builds
+class SiteBuilder:
+    def __init__(self, config: dict[str, Any],
+                 jobs: int = 1,
+                 incremental: bool = False,
+                 cache_size: int = DEFAULT_CACHE_SIZE,
+                 outputs: dict[str, bytes] | None = None,
+                 paranoid: bool = False,
+                 checksum: str = 'md5',
+                 fsync: bool = False,
+                 gc_dry_run: bool = False,
+                 md_ext_stats: bool = False) -> None:
+        log.debug('initializing site builder for "%s"', config['title'])
+        self.config: dict[str, Any] = config
+        # flush everything written to disk at the end of the build
+        self.fsync: bool = fsync
+        # only list what would be garbage collected
+        self.gc_dry_run: bool = gc_dry_run
+        # only holds the files rendered in the last build, given to the
+        #   builders after the first one (which renders the whole site)
+        self.outputs: dict[str, bytes] | None = outputs
+        cache_path: str = get_cache_path(config)
+
+        db_class: type[Database] = SQLiteDatabase \
+            if is_sqlite_path(config['path']['db']) else Database
+        self.db: Database = db_class(config['path']['db'], paranoid, checksum)
+        self.db.read()
+
+        self.cache: RenderCache | None = None
+        if incremental:
+            self.cache = RenderCache(cache_path, cache_size)
+
+        self.manifest: Manifest = Manifest(os.path.join(cache_path,
+                                                        'manifest'),
+                                           config['path']['dst'])
+        self.manifest.read()
+        self.deps: DepGraph = DepGraph(os.path.join(cache_path, 'deps'))
+        self.deps.read()
+
+        # compiled templates are kept in the cache dir between runs
+        self.env: Environment = get_jinja_env(config,
+                                              os.path.join(cache_path,
+                                                           'jinja'))
+
+        log.debug('initializing builders for all dir_paths found in config')
+        self.builders: list[Builder] = [Builder(config,
+                                                self.db,
+                                                dir_path,
+                                                self.cache,
+                                                jobs,
+                                                self.manifest,
+                                                self.deps,
+                                                None,
+                                                self.env,
+                                                md_ext_stats)
+                                        for dir_path in config['dirs'].keys()]
+
+    def build(self) -> None:
+        log.info('building html for "%s"', self.config['title'])
+        self.manifest.reset()
+        if self.cache is not None:
+            self.cache.hits = 0
+            self.cache.misses = 0
+        if self.outputs is not None:
+            self.outputs.clear()
+
+        # scanned once for all dir_paths, without the dirs all of them exclude
+        with profiler.span('scan', self.config['path']['src']):
+            src_scan: DirScan = scan_dir(self.config['path']['src'],
+                                         self.__get_exclude_dirs())
+        for builder in self.builders:
+            log.debug('building for "%s"', builder.dir_path)
+            with profiler.span('build', builder.dir_path):
+                builder.build(src_scan)
+        with profiler.span('gc'):
+            self.__collect_garbage()
+        for builder in self.builders:
+            builder.outputs = self.outputs
+
+        with profiler.span('write', self.db.db_path):
+            self.db.write()
+        with profiler.span('write', self.manifest.manifest_path):
+            self.manifest.write()
+        with profiler.span('write', self.deps.deps_path):
+            self.deps.write()
+        if self.fsync:
+            with profiler.span('fsync'):
+                fsync_files([os.path.join(self.config['path']['dst'], f)
+                             for f in self.manifest.written_files]
+                            + [self.db.db_path,
+                               self.manifest.manifest_path,
+                               self.deps.deps_path])
+        log.info('wrote %d file(s), skipped %d unchanged file(s)',
+                 self.manifest.written, self.manifest.skipped)
+        if self.cache is not None:
+            log.info('reused %d cached file(s), parsed %d file(s)',
+                     self.cache.hits, self.cache.misses)
+            self.cache.evict()
+        for builder in self.builders:
+            if builder.parser is not None and builder.parser.timer is not None:
+                builder.parser.timer.report(builder.dir_path)
+
+    # the exclude_dirs shared by all dir_paths, each builder checks its own
+    def __get_exclude_dirs(self) -> list[str]:
+        excludes: list[set[str]] = [
+            set(b.dir_cfg.get('exclude_dirs', []))
+            if isinstance(b.dir_cfg.get('exclude_dirs', []), list) else set()
+            for b in self.builders]
+        return sorted(set.intersection(*excludes)) if excludes else []
+
+    # removes the db entries without source file and the files produced
+    #   by previous builds that weren't produced by this one
+    def __collect_garbage(self) -> None:
+        stale: list[str] = self.db.prune([b.dir_cfg['src']
+                                          for b in self.builders],
+                                         self.gc_dry_run)
+        orphans: list[str] = self.manifest.prune(self.gc_dry_run)
+        if self.gc_dry_run:
+            log.info('would remove %d stale db entries and %d orphaned'
+                     ' file(s)', len(stale), len(orphans))
+            return
+        for f in orphans:
+            self.deps.remove(f)
+        if stale or orphans:
+            log.info('removed %d stale db entries and %d orphaned file(s)',
+                     len(stale), len(orphans))
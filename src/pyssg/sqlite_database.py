@@ -0,0 +1,106 @@
+import os
+import sys
+import sqlite3
+from contextlib import closing
+from logging import Logger, getLogger
+
+from .database import Database
+from .database_entry import DatabaseEntry
+
+log: Logger = getLogger(__name__)
+
+# db paths with these extensions use the sqlite db
+SQLITE_EXTS: tuple[str, ...] = ('.sqlite', '.sqlite3')
+
+
+def is_sqlite_path(db_path: str) -> bool:
+    return db_path.endswith(SQLITE_EXTS)
+
+
+# same as Database, but stored in sqlite (WAL mode), only the entries that
+#   changed are written, in a single transaction; the first time it is read,
+#   the csv db at the same path without the sqlite extension (if any) is
+#   migrated into it
+class SQLiteDatabase(Database):
+    __SCHEMA_VERSION: int = 1
+
+    def __init__(self, db_path: str,
+                 paranoid: bool = False,
+                 checksum: str = 'md5') -> None:
+        super().__init__(db_path, paranoid, checksum)
+        self.csv_path: str = os.path.splitext(db_path)[0]
+
+    def __connect(self) -> sqlite3.Connection:
+        conn: sqlite3.Connection = sqlite3.connect(self.db_path)
+        conn.execute('PRAGMA journal_mode=WAL')
+        # WAL is still consistent after a crash with this,
+        #   only the last transaction could be lost
+        conn.execute('PRAGMA synchronous=NORMAL')
+        version: int = conn.execute('PRAGMA user_version').fetchone()[0]
+        if version > self.__SCHEMA_VERSION:
+            log.error('"%s" was created by a newer version of pyssg'
+                      ' (schema version %d)', self.db_path, version)
+            sys.exit(1)
+        if version < self.__SCHEMA_VERSION:
+            log.debug('creating db schema in "%s"', self.db_path)
+            with conn:
+                conn.execute('CREATE TABLE IF NOT EXISTS entries ('
+                             'fname TEXT PRIMARY KEY, '
+                             'ctimestamp REAL NOT NULL, '
+                             'mtimestamp REAL NOT NULL, '
+                             'checksum TEXT NOT NULL, '
+                             'tags TEXT NOT NULL, '
+                             'size INTEGER NOT NULL, '
+                             'mtime_ns INTEGER NOT NULL, '
+                             'inode INTEGER NOT NULL)')
+                conn.execute(f'PRAGMA user_version={self.__SCHEMA_VERSION}')
+        return conn
+
+    def write(self) -> None:
+        log.debug('writing %d changed and %d removed entries to db',
+                  len(self.dirty), len(self.removed))
+        rows: list[tuple[str, float, float, str, str, int, int, int]] = []
+        for f in self.dirty:
+            v: DatabaseEntry = self.e[f]
+            raw: list[str] = v.get_raw_entry()
+            rows.append((v.fname, v.ctimestamp, v.mtimestamp, v.checksum,
+                         raw[4], *v.stat))
+        with closing(self.__connect()) as conn, conn:
+            conn.executemany('DELETE FROM entries WHERE fname = ?',
+                             [(f,) for f in self.removed])
+            conn.executemany('INSERT OR REPLACE INTO entries'
+                             ' VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+        self.dirty.clear()
+        self.removed.clear()
+
+    def read(self) -> None:
+        log.debug('reading db')
+        if not os.path.exists(self.db_path):
+            self.__migrate()
+            return
+        if not os.path.isfile(self.db_path):
+            log.error('"%s" is not a file', self.db_path)
+            sys.exit(1)
+
+        with closing(self.__connect()) as conn:
+            for row in conn.execute('SELECT * FROM entries'):
+                entry: DatabaseEntry = DatabaseEntry((row[0],
+                                                      row[1],
+                                                      row[2],
+                                                      row[3],
+                                                      row[4]))
+                entry.stat = (row[5], row[6], row[7])
+                self.e[entry.fname] = entry
+        log.debug('db contains %d entries', len(self.e))
+
+    def __migrate(self) -> None:
+        if not os.path.isfile(self.csv_path):
+            log.warning('"%s" doesn\'t exist, will be'
+                        ' created once process finishes,'
+                        ' ignore if it\'s the first run', self.db_path)
+            return
+        log.info('migrating db "%s" to "%s"', self.csv_path, self.db_path)
+        csv_db: Database = Database(self.csv_path)
+        csv_db.read()
+        self.e = csv_db.e
+        self.dirty = set(self.e.keys())
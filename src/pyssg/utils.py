@@ -1,8 +1,14 @@
+from __future__ import annotations
 import os
 import sys
+import stat
 import shutil
-from hashlib import md5
+from hashlib import md5, blake2b
 from logging import Logger, getLogger
+from contextlib import contextmanager
+from typing import IO, Any, Iterator
+
+from .scanner import scan_dir
 
 log: Logger = getLogger(__name__)
 
@@ -13,46 +19,66 @@ def get_file_list(path: str,
                   exclude_dirs: list[str] = []) -> list[str]:
     log.debug('retrieving file list in path "%s" that contain file'
               ' extensions %s except directories %s', path, exts, exclude_dirs)
-    file_list: list[str] = []
-    for root, dirs, files in os.walk(path):
-        if exclude_dirs != []:
-            log.debug('removing excludes from list')
-            dirs[:] = [d for d in dirs if d not in exclude_dirs]
-        for file in files:
-            if file.endswith(exts):
-                # [1:] is required to remove the '/'
-                #   at the beginning after replacing
-                file_name: str = os.path.join(root, file).replace(path, '')[1:]
-                file_list.append(file_name)
-                log.debug('added file "%s" without "%s" part: "%s"',
-                          file, path, file_name)
-            else:
-                log.debug('ignoring file "%s" as it doesn\'t contain'
-                          ' any of the extensions %s', file, exts)
-    return file_list
+    return scan_dir(path, exclude_dirs).get_files(exts)
+
+
+# temporary file next to path, to be moved over it once written
+def get_tmp_path(path: str) -> str:
+    head, tail = os.path.split(path)
+    # pid as the render workers could write the same dirs at the same time
+    return os.path.join(head, f'.{tail}.{os.getpid()}.tmp')
+
+
+# writes to a temporary file next to path and replaces path with it once
+#   done, so readers never see a half written file and an interrupted
+#   write leaves the previous file untouched
+@contextmanager
+def atomic_open(path: str, mode: str = 'w') -> Iterator[IO[Any]]:
+    tmp_path: str = get_tmp_path(path)
+    try:
+        with open(tmp_path, mode) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
 
+# flushes the files (and their dirs, so the renames are kept too) to disk,
+#   done once at the end instead of after every write
+def fsync_files(paths: list[str]) -> None:
+    log.debug('syncing %d files to disk', len(paths))
+    dirs: set[str] = set()
+    for path in paths:
+        try:
+            fd: int = os.open(path, os.O_RDONLY)
+        except FileNotFoundError:
+            continue
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        dirs.add(os.path.dirname(path) or '.')
+    for d in dirs:
+        fd = os.open(d, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
 
+
+# only the leaf dirs, creating them creates the whole structure
 def get_dir_structure(path: str,
                       exclude: list[str] = []) -> list[str]:
     log.debug('retrieving dir structure in path "%s" except directories (%s)',
               path, ', '.join(exclude))
-    dir_list: list[str] = []
-    for root, dirs, files in os.walk(path):
-        if exclude != []:
-            log.debug('removing excludes from list')
-            dirs[:] = [d for d in dirs if d not in exclude]
-        for d in dirs:
-            if root in dir_list:
-                dir_list.remove(root)
-                log.debug('removed dir "%s" as it already is in the list', root)
-            # not removing the 'path' part here,
-            #   as comparisons with 'root' would fail
-            joined_dir: str = os.path.join(root, d)
-            dir_list.append(joined_dir)
-            log.debug('added dir "%s" to the list', joined_dir)
-    log.debug('removing "%s" from all dirs in list', path)
-    # [1:] is required to remove the '/' at the beginning after replacing
-    return [d.replace(path, '')[1:] for d in dir_list]
+    dirs: list[str] = scan_dir(path, exclude).dirs
+    # dirs are in the order they're found, same order as before
+    parents: set[str] = {os.path.dirname(d) for d in dirs}
+    return [d for d in dirs if d not in parents]
 
 
 # TODO: probably change it so it returns a bool, easier to check
@@ -78,23 +104,69 @@ def create_dir(path: str, p: bool = False, silent=False) -> None:
 #   a file can be copied into a directory, need to get the filename
 #   and use it when copying
 # TODO: probably change it so it returns a bool, easier to check
-def copy_file(src: str, dst: str) -> None:
-    if not os.path.exists(dst):
-        shutil.copy2(src, dst)
-        log.info('copied file "%s" to "%s"', src, dst)
-    else:
-        log.info('file "%s" already exists, ignoring', dst)
+# st is the stat result of src, if already known; an existing dst is only
+#   replaced if overwrite is set and it differs from src (the mtime is
+#   copied over too, so comparing it and the size is enough)
+def copy_file(src: str, dst: str,
+              st: os.stat_result | None = None,
+              overwrite: bool = False) -> None:
+    if os.path.exists(dst):
+        if not overwrite:
+            log.info('file "%s" already exists, ignoring', dst)
+            return
+        if st is None:
+            st = os.stat(src)
+        dst_st: os.stat_result = os.stat(dst)
+        if (dst_st.st_size, dst_st.st_mtime_ns) == \
+                (st.st_size, st.st_mtime_ns):
+            log.info('file "%s" already exists, ignoring', dst)
+            return
+    if st is None:
+        st = os.stat(src)
+    # same as copy2 but atomic, an interrupted copy doesn't leave
+    #   a truncated dst behind
+    tmp_path: str = get_tmp_path(dst)
+    try:
+        shutil.copyfile(src, tmp_path)
+        os.chmod(tmp_path, stat.S_IMODE(st.st_mode))
+        os.utime(tmp_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        os.replace(tmp_path, dst)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    log.info('copied file "%s" to "%s"', src, dst)
+
+
+# md5 is the default (and what older dbs use), blake2b is faster on 64 bit
+#   platforms, stored with an "algorithm:" prefix so they're not mixed up
+CHECKSUM_ALGORITHMS: tuple[str, ...] = ('md5', 'blake2b')
+# big enough to read most md files in one go
+CHECKSUM_BUFFER_SIZE: int = 1024 * 1024
 
 
 # only used for database, but keeping it here as it is an independent function
 # as seen in SO: https://stackoverflow.com/a/1131238
-def get_checksum(path: str) -> str:
-    log.debug('calculating md5 checksum for "%s"', path)
-    file_hash = md5()
+def get_checksum(path: str, algorithm: str = 'md5') -> str:
+    log.debug('calculating %s checksum for "%s"', algorithm, path)
+    if algorithm not in CHECKSUM_ALGORITHMS:
+        log.error('checksum algorithm "%s" not supported, use one of (%s)',
+                  algorithm, ', '.join(CHECKSUM_ALGORITHMS))
+        sys.exit(1)
+    file_hash = md5() if algorithm == 'md5' else blake2b(digest_size=32)
     with open(path, "rb") as f:
-        while chunk := f.read(4096):
+        while chunk := f.read(CHECKSUM_BUFFER_SIZE):
             file_hash.update(chunk)
-    return file_hash.hexdigest()
+    if algorithm == 'md5':
+        return file_hash.hexdigest()
+    return f'{algorithm}:{file_hash.hexdigest()}'
+
+
+def get_checksum_algorithm(checksum: str) -> str:
+    algorithm, sep, _ = checksum.partition(':')
+    return algorithm if sep else 'md5'
 
 
 def get_expanded_path(path: str) -> str:
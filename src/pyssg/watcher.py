@@ -0,0 +1,100 @@
+import os
+import time
+from logging import Logger, getLogger
+from typing import Any, Callable
+
+log: Logger = getLogger(__name__)
+
+# path to (mtime_ns, size)
+Snapshot = dict[str, tuple[int, int]]
+
+
+def get_snapshot(paths: list[str],
+                 exclude: list[str] = []) -> Snapshot:
+    snapshot: Snapshot = dict()
+    # (st_dev, st_ino) of the dirs already scanned, symlinks to dirs are
+    #   followed so a link back to a parent would recurse forever otherwise
+    visited: set[tuple[int, int]] = set()
+    pending: list[str] = list(paths)
+    while pending:
+        path: str = pending.pop()
+        try:
+            st: os.stat_result = os.stat(path)
+            if (st.st_dev, st.st_ino) in visited:
+                log.debug('"%s" was already scanned, ignoring', path)
+                continue
+            visited.add((st.st_dev, st.st_ino))
+            with os.scandir(path) as it:
+                entries: list[os.DirEntry[str]] = list(it)
+        except OSError as e:
+            # removed while scanning (will show up in the next snapshot)
+            #   or not readable, only this dir is left out
+            log.debug('can\'t scan "%s", ignoring: %s', path, e)
+            continue
+        for entry in entries:
+            if entry.path in exclude:
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=True):
+                    pending.append(entry.path)
+                    continue
+                st = entry.stat(follow_symlinks=True)
+            except OSError as e:
+                # broken symlinks, removed or not readable files
+                log.debug('can\'t stat "%s", ignoring: %s', entry.path, e)
+                continue
+            snapshot[entry.path] = (st.st_mtime_ns, st.st_size)
+    return snapshot
+
+
+def get_changes(old: Snapshot, new: Snapshot) -> set[str]:
+    changes: set[str] = set(old.keys() ^ new.keys())
+    for path in old.keys() & new.keys():
+        if old[path] != new[path]:
+            changes.add(path)
+    return changes
+
+
+# polls the paths for changes, it is pure python (no inotify or similar)
+#   so it works everywhere; changes are debounced so saving multiple files
+#   (or an editor writing a file in multiple steps) triggers a single call
+class Watcher:
+    def __init__(self, paths: list[str],
+                 exclude: list[str] = [],
+                 interval: float = 0.5,
+                 debounce: float = 0.3) -> None:
+        log.debug('initializing watcher for paths (%s)', ', '.join(paths))
+        self.paths: list[str] = paths
+        self.exclude: list[str] = exclude
+        self.interval: float = interval
+        self.debounce: float = debounce
+        self.snapshot: Snapshot = get_snapshot(self.paths, self.exclude)
+
+    # returns the changed files once no more changes happened for
+    #   the debounce time, or an empty set if nothing changed
+    def poll(self) -> set[str]:
+        new: Snapshot = get_snapshot(self.paths, self.exclude)
+        changes: set[str] = get_changes(self.snapshot, new)
+        self.snapshot = new
+        if not changes:
+            return changes
+
+        while True:
+            time.sleep(self.debounce)
+            new = get_snapshot(self.paths, self.exclude)
+            more_changes: set[str] = get_changes(self.snapshot, new)
+            self.snapshot = new
+            if not more_changes:
+                break
+            changes.update(more_changes)
+        log.debug('changed files: (%s)', ', '.join(sorted(changes)))
+        return changes
+
+    def watch(self, callback: Callable[[set[str]], Any]) -> None:
+        log.info('watching for changes in (%s), press Ctrl+C to stop',
+                 ', '.join(self.paths))
+        while True:
+            changes: set[str] = self.poll()
+            if changes:
+                callback(changes)
+            time.sleep(self.interval)
@@ -1,24 +1,29 @@
-import yaml
-from yaml import SafeLoader
-from yaml.nodes import SequenceNode
-from importlib.resources import path as rpath
 from logging import Logger, getLogger
-from typing import Any
+from typing import TYPE_CHECKING, Any
+
+# yaml is imported when the first file is parsed,
+#   commands that don't read the config don't need it
+if TYPE_CHECKING:
+    from yaml import SafeLoader
+    from yaml.nodes import SequenceNode
 
 log: Logger = getLogger(__name__)
 
 
 # required to concat values in yaml using !join [value, value, ...]
-def __join_constructor(loader: SafeLoader, node: SequenceNode) -> str:
+def __join_constructor(loader: 'SafeLoader', node: 'SequenceNode') -> str:
     seq = loader.construct_sequence(node)
     return ''.join([str(i) for i in seq])
 
 
 def setup_custom_yaml() -> None:
+    from yaml import SafeLoader
     SafeLoader.add_constructor('!join', __join_constructor)
 
 
 def __read_raw_yaml(path: str) -> list[dict[str, Any]]:
+    import yaml
+    setup_custom_yaml()
     all_docs: list[dict[str, Any]] = []
     with open(path, 'r') as f:
         for doc in yaml.safe_load_all(f):
@@ -30,6 +35,7 @@ def get_parsed_yaml(resource: str, package: str = '') -> list[dict[str, Any]]:
     if package == '':
         log.debug('parsing yaml; reading "%s"', resource)
         return __read_raw_yaml(resource)
+    from importlib.resources import path as rpath
     log.debug('parsing yaml; reading "%s.%s"', package, resource)
     with rpath(package, resource) as p:
         return __read_raw_yaml(str(p))
@@ -1,3 +1,4 @@
+from __future__ import annotations
 import os
 import sys
 import pytest
@@ -8,6 +9,7 @@ from pytest import MonkeyPatch
 from argparse import ArgumentParser
 from datetime import datetime, timezone
 from importlib.metadata import version as v
+from importlib.resources import path as rpath
 from logging import Logger, getLogger, DEBUG
 from copy import deepcopy
 
@@ -15,6 +17,7 @@ from pyssg.arg_parser import get_parser
 from pyssg.custom_logger import setup_logger
 from pyssg.database_entry import DatabaseEntry
 from pyssg.page import Page
+from pyssg.utils import copy_file
 
 
 @pytest.fixture(scope='session')
@@ -243,3 +246,65 @@ def page_simple_modified(default_config: dict[str, Any],
         config=config,
         dir_config=dir_config
     )
+
+
+# a small site with every feature enabled (tags, index, rss, sitemap and
+#   pagination); returns a function that gives the config for a build
+#   with its own dst and db (and cache), all of them sharing src and plt
+@pytest.fixture(scope='function')
+def tmp_site(tmp_path: Path,
+             rss_date_fmt: str,
+             sitemap_date_fmt: str) -> Callable[[str], dict[str, Any]]:
+    src: Path = tmp_path/'src'
+    plt: Path = tmp_path/'plt'
+    (src/'posts').mkdir(parents=True)
+    plt.mkdir()
+    for t in ['index.html', 'page.html', 'tag.html', 'rss.xml',
+              'sitemap.xml']:
+        with rpath('pyssg.plt', t) as p:
+            copy_file(str(p), str(plt/t))
+    for i in range(6):
+        md: Path = src/('posts' if i % 2 else '')/f'page{i}.md'
+        md.write_text(f'title: Page {i}\n'
+                      'author: Someone\n'
+                      f'summary: Summary {i}.\n'
+                      f'tags: t{i % 3}\n'
+                      '    all\n'
+                      '\n'
+                      f'Content of page {i}.\n')
+        # so the pages are always in the same order
+        os.utime(md, (1682418172 + i * 3600, 1682418172 + i * 3600))
+    (src/'static.html').write_text('<p>static</p>\n')
+
+    def get_config(name: str) -> dict[str, Any]:
+        return {'title': 'Example site',
+                'path': {
+                    'src': str(src),
+                    'dst': str(tmp_path/name/'dst'),
+                    'plt': str(plt),
+                    'db': str(tmp_path/name/'.files')},
+                'url': {
+                    'main': 'https://example.com',
+                    'static': 'https://static.example.com'},
+                'fmt': {
+                    'date': '%a, %b %d, %Y @ %H:%M %Z',
+                    'list_date': '%b %d',
+                    'list_sep_date': '%B %Y',
+                    'rss_date': rss_date_fmt,
+                    'sitemap_date': sitemap_date_fmt},
+                'info': {
+                    'version': '0.0.0',
+                    'debug': 'False',
+                    'rss_run_date': 'Mon, 01 May 2023 00:00:00 GMT',
+                    'sitemap_run_date': '2023-05-01'},
+                'dirs': {
+                    '/': {
+                        'cfg': {
+                            'plt': 'page.html',
+                            'tags': True,
+                            'index': True,
+                            'rss': True,
+                            'sitemap': True,
+                            'index_page_size': 4,
+                            'tag_page_size': 2}}}}
+    return get_config
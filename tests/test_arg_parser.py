@@ -17,6 +17,25 @@ from argparse import ArgumentParser
     (['-i'], 'init', True),
     (['--build'], 'build', True),
     (['-b'], 'build', True),
+    (['--watch'], 'watch', True),
+    (['-w'], 'watch', True),
+    (['--serve'], 'serve', True),
+    (['-s'], 'serve', True),
+    (['--host', '0.0.0.0'], 'host', '0.0.0.0'),
+    (['--port', '8080'], 'port', 8080),
+    (['--jobs', '4'], 'jobs', 4),
+    (['-j', '0'], 'jobs', 0),
+    (['--incremental'], 'incremental', True),
+    (['--clear-cache'], 'clear_cache', True),
+    (['--cache-size', '64'], 'cache_size', 64),
+    (['--paranoid'], 'paranoid', True),
+    (['--checksum', 'blake2b'], 'checksum', 'blake2b'),
+    (['--fsync'], 'fsync', True),
+    (['--gc-dry-run'], 'gc_dry_run', True),
+    (['--profile'], 'profile', True),
+    (['--profile-top', '5'], 'profile_top', 5),
+    (['--profile-output', 'trace.json'], 'profile_output', 'trace.json'),
+    (['--md-ext-stats'], 'md_ext_stats', True),
     (['--debug'], 'debug', True)
 ])
 def test_valid_args(args: list[str],
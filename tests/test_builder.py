@@ -0,0 +1,220 @@
+import os
+import pytest
+from collections import ChainMap
+from pathlib import Path
+from typing import Any, Callable, Mapping
+from pytest import MonkeyPatch
+from jinja2 import Environment, FileSystemBytecodeCache, UndefinedError
+from pyssg import builder as builder_module
+from pyssg.builder import Builder, RenderJob, RenderResult, get_jinja_env
+from pyssg.database import Database
+from pyssg.site_builder import SiteBuilder
+
+
+def test_jinja_env(default_config: dict[str, Any], tmp_path: Path) -> None:
+    default_config['path']['plt'] = str(tmp_path)
+    env: Environment = get_jinja_env(default_config)
+    assert env.bytecode_cache is None
+    assert env.trim_blocks is True
+    assert env.lstrip_blocks is True
+
+
+def test_jinja_env_bytecode_cache(default_config: dict[str, Any],
+                                  tmp_path: Path) -> None:
+    plt_path: Path = tmp_path/'plt'
+    cache_path: Path = tmp_path/'cache'/'jinja'
+    plt_path.mkdir()
+    (plt_path/'index.html').write_text('{{ config.title }}')
+    default_config['path']['plt'] = str(plt_path)
+    env: Environment = get_jinja_env(default_config, str(cache_path))
+    assert isinstance(env.bytecode_cache, FileSystemBytecodeCache)
+    env.get_template('index.html')
+    assert len(list(cache_path.iterdir())) == 1
+    # a new env (next run) loads it from the cache
+    env = get_jinja_env(default_config, str(cache_path))
+    assert env.get_template('index.html').render(config={'title': 'a'}) == 'a'
+
+
+def test_template_vars(tmp_site: Callable[[str], dict[str, Any]],
+                       monkeypatch: MonkeyPatch) -> None:
+    config: dict[str, Any] = tmp_site('site')
+    builder: Builder = Builder(config, Database(config['path']['db']), '/')
+    builder.build()
+    common_vars: dict[str, Any] = builder.common_vars
+    common_keys: set[str] = set(common_vars.keys())
+    # a site value with the same name as the per page ones
+    common_vars['page'] = 'site'
+    common_vars['tag'] = 'site'
+
+    template_vars: dict[str, Mapping[str, Any]] = dict()
+
+    def render_template(template_name: str,
+                        file_name: str,
+                        variables: Mapping[str, Any]) -> RenderResult:
+        template_vars[file_name] = variables
+        return (file_name, '', False)
+
+    monkeypatch.setattr(builder, '_Builder__render_template',
+                        render_template)
+    jobs: list[RenderJob] = [('page', 'page.html', 'page0.html', 0, 0),
+                             ('tag', 'tag.html', 'tag/@all.html', 0, 0),
+                             ('index', 'index.html', 'index.html', 0, 0),
+                             ('feed', 'rss.xml', 'rss.xml', -1, 0),
+                             ('common', 'sitemap.xml', 'sitemap.xml', 0, 0)]
+    for job in jobs:
+        builder.render_job(job)
+
+    page_vars: Mapping[str, Any] = template_vars['page0.html']
+    assert isinstance(page_vars, ChainMap)
+    assert page_vars['page'] is builder.all_files[0]
+    assert page_vars['config'] is config
+    # layered over the same common_vars, not a copy
+    assert page_vars.maps[-1] is common_vars
+    tag_vars: Mapping[str, Any] = template_vars['tag/@all.html']
+    assert tag_vars['tag'] == builder.all_tags[0]
+    assert tag_vars['page'] == 'site'
+    assert [p.name for p in tag_vars['tag_pages']] == \
+        [p.name for p in builder.tag_index['all']]
+    assert tag_vars['pagination'].number == 1
+    assert template_vars['index.html']['pagination'].count == 2
+    assert template_vars['rss.xml']['feed'].tag is None
+    assert template_vars['sitemap.xml'] is common_vars
+
+    # the shared vars weren't touched by any of them
+    assert set(common_vars.keys()) == common_keys | {'page', 'tag'}
+    assert common_vars['page'] == 'site'
+    assert common_vars['tag'] == 'site'
+
+
+# file names rendered by each build of the site_builder
+def get_rendered(site_builder: SiteBuilder,
+                 monkeypatch: MonkeyPatch) -> Callable[[], set[str]]:
+    rendered: set[str] = set()
+    render_job: Callable[[Builder, RenderJob], RenderResult] = \
+        Builder.render_job
+
+    def spy(self: Builder, job: RenderJob) -> RenderResult:
+        rendered.add(job[2])
+        return render_job(self, job)
+
+    monkeypatch.setattr(Builder, 'render_job', spy)
+
+    def build() -> set[str]:
+        rendered.clear()
+        site_builder.build()
+        return set(rendered)
+    return build
+
+
+def test_incremental_deps(tmp_site: Callable[[str], dict[str, Any]],
+                          monkeypatch: MonkeyPatch) -> None:
+    config: dict[str, Any] = tmp_site('site')
+    src: Path = Path(config['path']['src'])
+    plt: Path = Path(config['path']['plt'])
+    build: Callable[[], set[str]] = get_rendered(
+        SiteBuilder(config, incremental=True), monkeypatch)
+    assert len(build()) == 16
+    assert build() == set()
+    # only a runtime option
+    config['info']['debug'] = 'True'
+    assert build() == set()
+
+    # the page, its only neighbour and the listings it is in
+    page0: str = (src/'page0.md').read_text()
+    (src/'page0.md').write_text(page0.replace('Content', 'New content'))
+    assert build() == {'page0.html', 'posts/page1.html', 'index/2.html',
+                       'tag/@t0.html', 'tag/@all/3.html', 'rss.xml',
+                       'sitemap.xml'}
+
+    # only the ones that use the template
+    tag_plt: str = (plt/'tag.html').read_text()
+    (plt/'tag.html').write_text(tag_plt.replace('Some text', 'Other text'))
+    assert build() == {'tag/@all.html', 'tag/@all/2.html', 'tag/@all/3.html',
+                       'tag/@t0.html', 'tag/@t1.html', 'tag/@t2.html'}
+
+    # the tag counts changed, so the index (all_tags) has to be rendered
+    #   again, even the page without page0
+    (src/'page0.md').write_text(page0.replace('t0', 't1'))
+    assert build() == {'page0.html', 'posts/page1.html', 'index.html',
+                       'index/2.html', 'tag/@t0.html', 'tag/@t1.html',
+                       'tag/@t1/2.html', 'tag/@all/3.html', 'rss.xml',
+                       'sitemap.xml'}
+    assert build() == set()
+
+
+# file name to (content, inode and mtime), and the tmp files
+def get_dst_files(dst: str) -> tuple[dict[str, tuple[bytes, int, int]],
+                                     list[str]]:
+    files: dict[str, tuple[bytes, int, int]] = dict()
+    tmp_files: list[str] = []
+    for root, _, names in os.walk(dst):
+        for name in names:
+            path: Path = Path(root)/name
+            if name.endswith('.tmp'):
+                tmp_files.append(str(path))
+                continue
+            st: os.stat_result = path.stat()
+            files[os.path.relpath(path, dst)] = (path.read_bytes(),
+                                                 st.st_ino,
+                                                 st.st_mtime_ns)
+    return files, tmp_files
+
+
+def test_stream_template(tmp_site: Callable[[str], dict[str, Any]],
+                         monkeypatch: MonkeyPatch) -> None:
+    plain_config: dict[str, Any] = tmp_site('plain')
+    SiteBuilder(plain_config).build()
+    plain, _ = get_dst_files(plain_config['path']['dst'])
+
+    # every rendered file gets streamed
+    monkeypatch.setattr(builder_module, 'STREAM_THRESHOLD', 64)
+    monkeypatch.setattr(builder_module, 'STREAM_BUFFER_ITEMS', 2)
+    config: dict[str, Any] = tmp_site('streamed')
+    SiteBuilder(config).build()
+    streamed, tmp_files = get_dst_files(config['path']['dst'])
+    assert tmp_files == []
+    assert {f: c for f, (c, _, _) in streamed.items()} == \
+        {f: c for f, (c, _, _) in plain.items()}
+
+    # rendered again, but nothing is written
+    site_builder: SiteBuilder = SiteBuilder(config)
+    site_builder.build()
+    assert site_builder.manifest.written == 0
+    assert site_builder.manifest.skipped == 16
+    assert get_dst_files(config['path']['dst']) == (streamed, [])
+
+
+def test_stream_template_error(tmp_site: Callable[[str], dict[str, Any]],
+                               monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr(builder_module, 'STREAM_THRESHOLD', 64)
+    monkeypatch.setattr(builder_module, 'STREAM_BUFFER_ITEMS', 2)
+    config: dict[str, Any] = tmp_site('site')
+    builder: Builder = Builder(config, Database(config['path']['db']), '/')
+    builder.build()
+    # fails once it has been streaming for a while
+    (Path(config['path']['plt'])/'error.html').write_text(
+        '{%for p in all_pages%}{{p.content}}{%endfor%}{{not_defined()}}')
+    with pytest.raises(UndefinedError):
+        builder.render_job(('common', 'error.html', 'error.html', 0, 0))
+    files, tmp_files = get_dst_files(config['path']['dst'])
+    assert tmp_files == []
+    assert 'error.html' not in files
+
+
+def test_incremental_deps_env(tmp_site: Callable[[str], dict[str, Any]],
+                              monkeypatch: MonkeyPatch) -> None:
+    config: dict[str, Any] = tmp_site('site')
+    config['exts'] = {'pymdvar': {'enable_env': True}}
+    page: Path = Path(config['path']['src'])/'page0.md'
+    page.write_text(page.read_text() + '${PYSSG_VAR}\n')
+    os.utime(page, (1682418172, 1682418172))
+    monkeypatch.setenv('PYSSG_VAR', 'value')
+    build: Callable[[], set[str]] = get_rendered(
+        SiteBuilder(config, incremental=True), monkeypatch)
+    assert len(build()) == 16
+    monkeypatch.setenv('PYSSG_OTHER', 'value')
+    assert build() == set()
+    monkeypatch.setenv('PYSSG_VAR', 'other value')
+    assert 'page0.html' in build()
+    dst: Path = Path(config['path']['dst'])/'page0.html'
+    assert '<p>Content of page 0.\nother value</p>' in dst.read_text()
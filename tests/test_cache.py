@@ -0,0 +1,98 @@
+import pytest
+from pathlib import Path
+from typing import Any
+from logging import INFO, WARNING
+from pytest import LogCaptureFixture
+from pyssg.cache import MDResult, RenderCache, get_cache_path
+
+
+def test_cache_path_default(default_config: dict[str, Any]) -> None:
+    cache_path: str = get_cache_path(default_config)
+    assert cache_path == '/tmp/pyssg/pyssg/site_example/.files.cache'
+
+
+def test_cache_path_config(default_config: dict[str, Any]) -> None:
+    default_config['path']['cache'] = '/tmp/pyssg/cache'
+    cache_path: str = get_cache_path(default_config)
+    assert cache_path == '/tmp/pyssg/cache'
+
+
+def test_cache_miss(tmp_path: Path) -> None:
+    cache: RenderCache = RenderCache(str(tmp_path/'cache'))
+    assert cache.get('778bce781d95730cd1e872a10130e20d') is None
+    assert cache.hits == 0
+    assert cache.misses == 1
+
+
+@pytest.fixture(scope='function')
+def md_result() -> MDResult:
+    return ('<p>Some text.</p>',
+            '<div class="toc">\n<ul></ul>\n</div>\n',
+            [{'level': 2, 'id': 'a', 'name': 'A', 'children': []}],
+            {'title': ['Some title'], 'tags': ['a', 'b']})
+
+
+def test_cache_set_get(tmp_path: Path, md_result: MDResult) -> None:
+    checksum: str = '778bce781d95730cd1e872a10130e20d'
+    cache: RenderCache = RenderCache(str(tmp_path/'cache'))
+    cache.set(checksum, md_result)
+    assert cache.get(checksum) == md_result
+    assert cache.hits == 1
+    assert cache.misses == 0
+
+
+def test_cache_fingerprint(tmp_path: Path, md_result: MDResult) -> None:
+    checksum: str = '778bce781d95730cd1e872a10130e20d'
+    cache: RenderCache = RenderCache(str(tmp_path/'cache'))
+    cache.set(checksum, md_result, 'fingerprint')
+    assert cache.get(checksum) is None
+    assert cache.get(checksum, 'other_fingerprint') is None
+    assert cache.get(checksum, 'fingerprint') == md_result
+
+
+def test_cache_evict(tmp_path: Path, md_result: MDResult) -> None:
+    # size 0 means every entry has to be evicted
+    cache: RenderCache = RenderCache(str(tmp_path/'cache'), 0)
+    cache.set('1', md_result)
+    cache.set('2', md_result)
+    assert cache.evict() == 2
+    assert cache.get('1') is None
+    assert cache.get('2') is None
+
+
+def test_cache_evict_under_limit(tmp_path: Path, md_result: MDResult) -> None:
+    cache: RenderCache = RenderCache(str(tmp_path/'cache'))
+    cache.set('1', md_result)
+    assert cache.evict() == 0
+    assert cache.get('1') == md_result
+
+
+def test_cache_clear(tmp_path: Path,
+                     md_result: MDResult,
+                     caplog: LogCaptureFixture) -> None:
+    cache_path: Path = tmp_path/'cache'
+    inf: tuple[str, int, str] = ('pyssg.cache',
+                                 INFO,
+                                 f'cleared cache "{cache_path}"')
+    cache: RenderCache = RenderCache(str(cache_path))
+    cache.set('1', md_result)
+    cache.clear()
+    assert cache_path.exists() is False
+    assert caplog.record_tuples[-1] == inf
+
+
+def test_cache_corrupted(tmp_path: Path,
+                         caplog: LogCaptureFixture) -> None:
+    checksum: str = '778bce781d95730cd1e872a10130e20d'
+    cache_path: Path = tmp_path/'cache'
+    cache_path.mkdir()
+    cache: RenderCache = RenderCache(str(cache_path))
+    cache.set(checksum, ('', '', [], {}))
+    entry_path: Path = next((cache_path/'md').glob('*/*.json'))
+    entry_path.write_text('{"html": "<p>')
+    war: tuple[str, int, str] = ('pyssg.cache',
+                                 WARNING,
+                                 f'cached result "{entry_path}" is corrupted,'
+                                 ' ignoring')
+    assert cache.get(checksum) is None
+    assert caplog.record_tuples[-1] == war
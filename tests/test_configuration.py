@@ -1,4 +1,5 @@
 import pytest
+from pathlib import Path
 from pytest import LogCaptureFixture
 from typing import Any, Callable
 from logging import ERROR
@@ -11,15 +12,17 @@ def test_static_config(rss_date_fmt: str,
                        sitemap_date_fmt: str,
                        get_fmt_time: Callable[..., str],
                        version: str) -> None:
-    rss_run_date: str = get_fmt_time(rss_date_fmt)
-    sitemap_run_date: str = get_fmt_time(sitemap_date_fmt)
-    sc_dict: dict[str, Any] = {'fmt': {'rss_date': rss_date_fmt,
-                                       'sitemap_date': sitemap_date_fmt},
-                               'info': {'rss_run_date': rss_run_date,
-                                        'sitemap_run_date': sitemap_run_date,
-                                        'version': version}}
+    # the version is looked up when getting the static config, which
+    #   could take long enough for the seconds to change
+    def get_sc_dict() -> dict[str, Any]:
+        return {'fmt': {'rss_date': rss_date_fmt,
+                        'sitemap_date': sitemap_date_fmt},
+                'info': {'rss_run_date': get_fmt_time(rss_date_fmt),
+                         'sitemap_run_date': get_fmt_time(sitemap_date_fmt),
+                         'version': version}}
+    sc_dict_before: dict[str, Any] = get_sc_dict()
     static_config: dict[str, Any] = get_static_config()
-    assert static_config == sc_dict
+    assert static_config in (sc_dict_before, get_sc_dict())
 
 
 def test_default_config(sample_files_path: str,
@@ -94,3 +97,47 @@ def test_multiple_default_config_one_doc_error(sample_files_path: str,
     assert system_exit.type == SystemExit
     assert system_exit.value.code == 1
     assert caplog.record_tuples[-1] == err
+
+
+@pytest.mark.parametrize('exts, exp_error', [
+    ('exts: [pymdvar]', '"exts" field isn\'t of type "dict"'),
+    ('exts:\n  toc:\n    permalink: True',
+     '"exts.toc" isn\'t a configurable extension, only (pymdvar) are'),
+    ('exts:\n  pymdvar: True', '"exts.pymdvar" field isn\'t of type "dict"'),
+    ('exts:\n  pymdvar:\n    enable: True',
+     '"exts.pymdvar.enable" isn\'t an option of "pymdvar",'
+     ' only (variables, enable_env) are'),
+    ('exts:\n  pymdvar:\n    enable_env: "yes"',
+     '"exts.pymdvar.enable_env" field isn\'t of type "bool"')
+])
+def test_default_config_wrong_exts(sample_files_path: str,
+                                   default_yaml: str,
+                                   tmp_path: Path,
+                                   exts: str,
+                                   exp_error: str,
+                                   caplog: LogCaptureFixture) -> None:
+    err: tuple[str, int, str] = ('pyssg.configuration', ERROR, exp_error)
+    yaml: str = Path(f'{sample_files_path}/config/{default_yaml}').read_text()
+    yaml_path: Path = tmp_path/default_yaml
+    yaml_path.write_text(yaml.replace('\n...', f'\n{exts}\n...'))
+    with pytest.raises(SystemExit) as system_exit:
+        get_parsed_config(str(yaml_path))
+    assert system_exit.type == SystemExit
+    assert system_exit.value.code == 1
+    assert caplog.record_tuples[-1] == err
+
+
+def test_default_config_exts(sample_files_path: str,
+                             default_yaml: str,
+                             tmp_path: Path) -> None:
+    exts: str = ('exts:\n'
+                 '  pymdvar:\n'
+                 '    variables:\n'
+                 '      SOME_VAR: "some value"\n'
+                 '      some_other_variable: 123\n'
+                 '    enable_env: True')
+    yaml: str = Path(f'{sample_files_path}/config/{default_yaml}').read_text()
+    yaml_path: Path = tmp_path/default_yaml
+    yaml_path.write_text(yaml.replace('\n...', f'\n{exts}\n...'))
+    config: dict[str, Any] = get_parsed_config(str(yaml_path))[0]
+    assert config['exts']['pymdvar']['enable_env'] is True
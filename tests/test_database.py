@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 import pytest
 from logging import DEBUG, WARNING, ERROR, CRITICAL
@@ -48,7 +49,7 @@ def test_read_database_wrong_col_num(tmp_db_wrong_col_num: Path,
                                      caplog: LogCaptureFixture) -> None:
     cri: tuple[str, int, str] = ('pyssg.database',
                                  CRITICAL,
-                                 'row 1 doesn\'t contain 5 columns, '
+                                 'row 1 doesn\'t contain 5 or 8 columns, '
                                  'contains 4 columns: '
                                  '"[\'name\', \'0.0\', \'0.0\', \'cksm\']"')
     db: Database = Database(str(tmp_db_wrong_col_num))
@@ -187,3 +188,92 @@ def test_write_database_new_entry(tmp_db: Path,
     db2.read()
     for fname in db2.e.keys():
         assert str(db2.e[fname]) == str(exp_db_e[fname])
+
+
+def test_update_entry_same_stat(tmp_db: Path,
+                                tmp_src_dir: Path,
+                                caplog: LogCaptureFixture) -> None:
+    caplog.set_level(DEBUG, logger='pyssg.database')
+    fname: str = f'{tmp_src_dir}/first.md'
+    deb: tuple[str, int, str] = ('pyssg.database',
+                                 DEBUG,
+                                 'entry "first.md" hasn\'t been modified'
+                                 ' (same stat)')
+    db: Database = Database(str(tmp_db))
+    db.read()
+    # the stat is stored the first time, then it isn't hashed again
+    db.update(fname, f'{tmp_src_dir}/')
+    db.update(fname, f'{tmp_src_dir}/')
+    assert caplog.record_tuples[-1] == deb
+
+
+def test_update_entry_paranoid(tmp_db: Path,
+                               tmp_src_dir: Path,
+                               caplog: LogCaptureFixture) -> None:
+    caplog.set_level(DEBUG, logger='pyssg.database')
+    fname: str = f'{tmp_src_dir}/first.md'
+    deb: tuple[str, int, str] = ('pyssg.database',
+                                 DEBUG,
+                                 'entry "first.md" hasn\'t been modified')
+    db: Database = Database(str(tmp_db), paranoid=True)
+    db.read()
+    db.update(fname, f'{tmp_src_dir}/')
+    db.update(fname, f'{tmp_src_dir}/')
+    assert caplog.record_tuples[-1] == deb
+
+
+def test_update_entry_other_checksum(tmp_db: Path,
+                                     tmp_src_dir: Path,
+                                     tmp_db_e1: DatabaseEntry) -> None:
+    fname: str = f'{tmp_src_dir}/first.md'
+    db: Database = Database(str(tmp_db), checksum='blake2b')
+    db.read()
+    db.update(fname, f'{tmp_src_dir}/')
+    # not modified, only the checksum is changed to the new algorithm
+    assert db.e['first.md'].mtimestamp == tmp_db_e1.mtimestamp
+    assert db.e['first.md'].checksum.startswith('blake2b:')
+
+
+def test_write_database_stat(tmp_db: Path,
+                             tmp_src_dir: Path) -> None:
+    fname: str = f'{tmp_src_dir}/first.md'
+    db: Database = Database(str(tmp_db))
+    db.read()
+    db.update(fname, f'{tmp_src_dir}/')
+    db.write()
+    db2: Database = Database(str(tmp_db))
+    db2.read()
+    st: os.stat_result = os.stat(fname)
+    assert db2.e['first.md'].stat == (st.st_size, st.st_mtime_ns, st.st_ino)
+    # not updated yet, so unknown and not written
+    assert db2.e['a/second.md'].stat == (0, 0, 0)
+    assert [len(line.split('|'))
+            for line in tmp_db.read_text().splitlines()] == [8, 5]
+
+
+def test_write_database_paranoid(tmp_db: Path,
+                                 tmp_src_dir: Path) -> None:
+    db: Database = Database(str(tmp_db), paranoid=True)
+    db.read()
+    db.update(f'{tmp_src_dir}/first.md', f'{tmp_src_dir}/')
+    db.write()
+    # readable by the versions without the stat columns
+    assert all(len(line.split('|')) == 5
+               for line in tmp_db.read_text().splitlines())
+
+
+def test_prune_database(tmp_db: Path,
+                        tmp_src_dir: Path) -> None:
+    db: Database = Database(str(tmp_db))
+    db.read()
+    db.update(f'{tmp_src_dir}/first.md', f'{tmp_src_dir}/')
+    # not updated, but the source file still exists (excluded)
+    assert db.prune([str(tmp_src_dir)]) == []
+    (tmp_src_dir/'a/second.md').unlink()
+    db.update(f'{tmp_src_dir}/first.md', f'{tmp_src_dir}/')
+    assert db.prune([str(tmp_src_dir)], dry_run=True) == ['a/second.md']
+    assert 'a/second.md' in db.e
+    db.update(f'{tmp_src_dir}/first.md', f'{tmp_src_dir}/')
+    assert db.prune([str(tmp_src_dir)]) == ['a/second.md']
+    assert list(db.e.keys()) == ['first.md']
+    assert db.removed == {'a/second.md'}
@@ -0,0 +1,100 @@
+import pytest
+from pathlib import Path
+from logging import WARNING
+from pytest import LogCaptureFixture
+from jinja2 import Environment, FileSystemLoader as FSLoader
+from pyssg.deps import DepGraph, get_digest, get_template_deps
+
+
+@pytest.fixture(scope='function')
+def tmp_plt(tmp_path: Path) -> Path:
+    plt: Path = tmp_path/'plt'
+    (plt/'body').mkdir(parents=True)
+    (plt/'base.html').write_text('{{config["title"]}}'
+                                 '{%block content%}{%endblock content%}')
+    (plt/'body/footer.html').write_text('{%macro f(c)%}{{c}}{%endmacro%}')
+    (plt/'body/tags.html').write_text('{%for t in all_tags%}{{t}}{%endfor%}')
+    (plt/'page.html').write_text('{%extends "base.html"%}'
+                                 '{%block content%}{{page.content}}'
+                                 '{%include "body/tags.html"%}'
+                                 '{%import "body/footer.html" as footer%}'
+                                 '{{footer.f(config)}}'
+                                 '{%endblock content%}')
+    (plt/'dynamic.html').write_text('{%include some_template%}')
+    return plt
+
+
+def test_digest() -> None:
+    assert get_digest({'a': 1, 'b': [1, 2]}) == \
+        get_digest({'b': [1, 2], 'a': 1})
+    assert get_digest({'a': 1}) != get_digest({'a': 2})
+
+
+def test_template_deps(tmp_plt: Path) -> None:
+    env: Environment = Environment(loader=FSLoader(str(tmp_plt)))
+    templates, variables, digest = get_template_deps(env, 'page.html')
+    assert templates == ['base.html', 'body/footer.html',
+                         'body/tags.html', 'page.html']
+    assert variables == {'config', 'page', 'all_tags'}
+
+    (tmp_plt/'body/footer.html').write_text('{%macro f(c)%}{%endmacro%}')
+    _, _, new_digest = get_template_deps(env, 'page.html')
+    assert new_digest != digest
+
+
+def test_template_deps_dynamic(tmp_plt: Path) -> None:
+    env: Environment = Environment(loader=FSLoader(str(tmp_plt)))
+    templates, variables, _ = get_template_deps(env, 'dynamic.html')
+    # depends on all templates
+    assert templates == ['base.html', 'body/footer.html', 'body/tags.html',
+                         'dynamic.html', 'page.html']
+    assert 'some_template' in variables
+
+
+def test_dep_graph_fresh(tmp_path: Path) -> None:
+    deps: DepGraph = DepGraph(str(tmp_path/'deps'))
+    assert not deps.is_fresh('index.html', '1')
+    deps.update('index.html', '1', ['index.html'], ['*'], ['all_pages'])
+    assert deps.is_fresh('index.html', '1')
+    assert not deps.is_fresh('index.html', '2')
+
+
+def test_dep_graph_remove(tmp_path: Path) -> None:
+    deps: DepGraph = DepGraph(str(tmp_path/'deps'))
+    deps.update('index.html', '1', ['index.html'], ['*'], ['all_pages'])
+    deps.remove('index.html')
+    assert deps.is_fresh('index.html', '1') is False
+    assert deps.templates == dict()
+    # removing it again is fine
+    deps.remove('index.html')
+
+
+def test_dep_graph_write_read(tmp_path: Path) -> None:
+    path: Path = tmp_path/'cache/deps'
+    deps: DepGraph = DepGraph(str(path))
+    deps.update('index.html', '1', ['base.html', 'index.html'],
+                ['*'], ['all_pages', 'config'])
+    deps.update('first.html', '2', ['page.html'],
+                ['first.md', 'a/second.md'], ['page'])
+    deps.update('static.html', '3', [], [], [])
+    deps.write()
+    deps2: DepGraph = DepGraph(str(path))
+    deps2.read()
+    assert deps2.e == deps.e
+    assert deps2.templates == deps.templates
+    assert deps2.sources == deps.sources
+    assert deps2.variables == deps.variables
+
+
+def test_dep_graph_read_wrong_col_num(tmp_path: Path,
+                                      caplog: LogCaptureFixture) -> None:
+    path: Path = tmp_path/'deps'
+    path.write_text('index.html|1\n')
+    war: tuple[str, int, str] = ('pyssg.deps',
+                                 WARNING,
+                                 'row 1 doesn\'t contain 5 columns, ignoring:'
+                                 ' "[\'index.html\', \'1\']"')
+    deps: DepGraph = DepGraph(str(path))
+    deps.read()
+    assert deps.e == dict()
+    assert caplog.record_tuples[-1] == war
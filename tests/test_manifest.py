@@ -0,0 +1,109 @@
+import pytest
+from pathlib import Path
+from logging import ERROR, WARNING
+from pytest import LogCaptureFixture
+from pyssg.manifest import Manifest
+
+
+def test_manifest_unchanged(tmp_path: Path) -> None:
+    dst_file: Path = tmp_path/'index.html'
+    dst_file.write_text('content')
+    manifest: Manifest = Manifest(str(tmp_path/'manifest'), str(tmp_path))
+    assert not manifest.is_unchanged('index.html', str(dst_file), '1', 7)
+    manifest.update('index.html', '1', True)
+    assert manifest.is_unchanged('index.html', str(dst_file), '1', 7)
+    assert not manifest.is_unchanged('index.html', str(dst_file), '2', 7)
+    # modified outside of pyssg
+    assert not manifest.is_unchanged('index.html', str(dst_file), '1', 8)
+
+
+def test_manifest_unchanged_removed(tmp_path: Path) -> None:
+    dst_file: Path = tmp_path/'index.html'
+    manifest: Manifest = Manifest(str(tmp_path/'manifest'), str(tmp_path))
+    manifest.update('index.html', '1', True)
+    assert not manifest.is_unchanged('index.html', str(dst_file), '1', 7)
+
+
+def test_manifest_counts(tmp_path: Path) -> None:
+    manifest: Manifest = Manifest(str(tmp_path/'manifest'), str(tmp_path))
+    manifest.update('index.html', '1', True)
+    manifest.update('a.html', '2', False)
+    manifest.update('b.html', '3', False)
+    assert manifest.written == 1
+    assert manifest.skipped == 2
+
+
+def test_manifest_write_read(tmp_path: Path) -> None:
+    path: Path = tmp_path/'cache/manifest'
+    manifest: Manifest = Manifest(str(path), str(tmp_path))
+    manifest.update('index.html', '1', True)
+    manifest.update('tag/@a.html', '2', True)
+    manifest.write()
+    manifest2: Manifest = Manifest(str(path), str(tmp_path))
+    manifest2.read()
+    assert manifest2.e == manifest.e
+
+
+def test_manifest_read_wrong_col_num(tmp_path: Path,
+                                     caplog: LogCaptureFixture) -> None:
+    path: Path = tmp_path/'manifest'
+    path.write_text('index.html\na.html|2\n')
+    war: tuple[str, int, str] = ('pyssg.manifest',
+                                 WARNING,
+                                 'row 1 doesn\'t contain 2 or 3 columns,'
+                                 ' ignoring: "[\'index.html\']"')
+    manifest: Manifest = Manifest(str(path), str(tmp_path))
+    manifest.read()
+    assert manifest.e == {'a.html': '2'}
+    assert caplog.record_tuples[-1] == war
+
+
+def test_manifest_read_not_a_file(tmp_path: Path,
+                                  caplog: LogCaptureFixture) -> None:
+    err: tuple[str, int, str] = ('pyssg.manifest',
+                                 ERROR,
+                                 f'"{tmp_path}" is not a file')
+    manifest: Manifest = Manifest(str(tmp_path), str(tmp_path))
+    with pytest.raises(SystemExit) as system_exit:
+        manifest.read()
+    assert system_exit.type == SystemExit
+    assert system_exit.value.code == 1
+    assert caplog.record_tuples[-1] == err
+
+
+def test_manifest_prune(tmp_path: Path) -> None:
+    dst: Path = tmp_path/'dst'
+    dst.mkdir()
+    (dst/'old.html').write_text('old')
+    manifest: Manifest = Manifest(str(tmp_path/'manifest'), str(dst))
+    manifest.update('old.html', '1', True)
+    manifest.reset()
+    manifest.update('index.html', '2', True)
+    manifest.keep('static.html')
+    assert manifest.prune(dry_run=True) == ['old.html']
+    assert (dst/'old.html').exists() is True
+    assert manifest.prune() == ['old.html']
+    assert (dst/'old.html').exists() is False
+    assert manifest.e == {'index.html': '2', 'static.html': '-'}
+
+
+def test_manifest_dst_roots(tmp_path: Path) -> None:
+    path: Path = tmp_path/'manifest'
+    first: Manifest = Manifest(str(path), str(tmp_path/'first'))
+    second: Manifest = Manifest(str(path), str(tmp_path/'second'))
+    first.read()
+    second.read()
+    first.update('index.html', '1', True)
+    first.write()
+    second.update('index.html', '2', True)
+    second.write()
+    first2: Manifest = Manifest(str(path), str(tmp_path/'first'))
+    first2.read()
+    assert first2.e == {'index.html': '1'}
+    # each one only prunes its own files
+    second.reset()
+    assert second.prune() == ['index.html']
+    second.write()
+    first2 = Manifest(str(path), str(tmp_path/'first'))
+    first2.read()
+    assert first2.e == {'index.html': '1'}
@@ -0,0 +1,44 @@
+from logging import INFO
+from pytest import LogCaptureFixture
+from markdown import Markdown
+from pyssg.md_ext_stats import MDExtTimer
+from pyssg.md_parser import get_md_obj
+
+
+def test_md_ext_timer() -> None:
+    timer: MDExtTimer = MDExtTimer()
+    md: Markdown = get_md_obj(dict(), False, ['meta', 'smarty'], timer)
+    assert set(timer.times.keys()) == {'core', 'meta', 'smarty'}
+    html: str = md.convert('title: a\n\n"quoted" *text*\n')
+    assert html == '<p>&ldquo;quoted&rdquo; <em>text</em></p>'
+    assert timer.times['meta']['pre'] > 0
+    assert timer.times['smarty']['tree'] > 0
+    assert timer.get_total('core') > 0
+
+
+def test_md_ext_timer_same_output() -> None:
+    text: str = '# title\n\n- [x] done\n- item ==mark==\n\n"q" [[link]]\n'
+    md: Markdown = get_md_obj(dict(), False)
+    timed_md: Markdown = get_md_obj(dict(), False, timer=MDExtTimer())
+    assert timed_md.convert(text) == md.convert(text)
+
+
+def test_md_ext_timer_nested() -> None:
+    timer: MDExtTimer = MDExtTimer()
+    md: Markdown = get_md_obj(dict(), False, ['meta'], timer)
+    # blockquotes and lists parse their content with the other
+    #   block processors, which is only counted once
+    md.convert('> - a\n> - b\n>\n> > c\n')
+    assert timer.nested == []
+    assert all(t >= 0 for t in timer.times['core'].values())
+
+
+def test_md_ext_timer_report(caplog: LogCaptureFixture) -> None:
+    timer: MDExtTimer = MDExtTimer()
+    get_md_obj(dict(), False, ['meta'], timer).convert('text')
+    caplog.set_level(INFO)
+    timer.report('/')
+    assert caplog.record_tuples[0] == ('pyssg.md_ext_stats',
+                                       INFO,
+                                       'time per md extension for "/":')
+    assert len(caplog.record_tuples) == 4
@@ -0,0 +1,131 @@
+import os
+import pytest
+from pathlib import Path
+from typing import Any, Callable
+from importlib.metadata import version
+from markdown import Markdown
+from pyssg import md_parser
+from pyssg.database import Database
+from pyssg.page import Page
+from pyssg.md_parser import (get_md_obj, get_md_fingerprint,
+                             DEFAULT_MD_EXTS, MDParser)
+
+
+def test_md_obj_exts() -> None:
+    md: Markdown = get_md_obj(dict(), False, ['meta'])
+    assert md.convert('"a" ==b==') == '<p>"a" ==b==</p>'
+    md = get_md_obj(dict(), False, ['meta', 'smarty', 'pymdownx.mark'])
+    assert md.convert('"a" ==b==') == '<p>&ldquo;a&rdquo; <mark>b</mark></p>'
+
+
+def test_md_obj_wrong_ext() -> None:
+    with pytest.raises(SystemExit) as system_exit:
+        get_md_obj(dict(), False, ['meta', 'not_an_extension'])
+    assert system_exit.type == SystemExit
+    assert system_exit.value.code == 1
+
+
+def test_md_fingerprint_exts() -> None:
+    default: str = get_md_fingerprint(dict(), False)
+    assert default == get_md_fingerprint(dict(), False, DEFAULT_MD_EXTS)
+    assert default != get_md_fingerprint(dict(), False, ['meta'])
+
+
+def test_md_fingerprint_ext_versions(monkeypatch: pytest.MonkeyPatch) -> None:
+    default: str = get_md_fingerprint(dict(), False)
+    meta: str = get_md_fingerprint(dict(), False, ['meta'])
+    # as if pymdown-extensions was upgraded
+    monkeypatch.setattr(md_parser, 'version',
+                        lambda dist: '999' if dist == 'pymdown-extensions'
+                        else version(dist))
+    md_parser._get_module_version.cache_clear()
+    try:
+        assert default != get_md_fingerprint(dict(), False)
+        # pymdownx isn't used by this one
+        assert meta == get_md_fingerprint(dict(), False, ['meta'])
+    finally:
+        md_parser._get_module_version.cache_clear()
+
+
+def test_tag_index(tmp_site: Callable[[str], dict[str, Any]]) -> None:
+    config: dict[str, Any] = tmp_site('site')
+    src: Path = Path(config['path']['src'])
+    # repeated tag, the newest page
+    (src/'posts/page6.md').write_text('title: Page 6\n'
+                                      'tags: t0\n'
+                                      '    t0\n'
+                                      '\n'
+                                      'Content of page 6.\n')
+    os.utime(src/'posts/page6.md', (1682518172, 1682518172))
+    dir_config: dict[str, Any] = dict(config['dirs']['/']['cfg'],
+                                      src=str(src),
+                                      dst=config['path']['dst'],
+                                      url=config['url']['main'])
+    files: list[str] = [f'page{i}.md' for i in range(0, 6, 2)] + \
+        [f'posts/page{i}.md' for i in range(1, 6, 2)] + ['posts/page6.md']
+    parser: MDParser = MDParser(files, config, dir_config,
+                                Database(config['path']['db']))
+    parser.parse_files()
+
+    assert [p.name for p in parser.all_files] == \
+        ['posts/page6.md', 'posts/page5.md', 'page4.md', 'posts/page3.md',
+         'page2.md', 'posts/page1.md', 'page0.md']
+    assert [t[0] for t in parser.all_tags] == ['all', 't0', 't1', 't2']
+    assert parser.all_tags[1] == ('t0', 'https://example.com/tag/@t0.html')
+    tag_index: dict[str, list[str]] = {t: [p.name for p in pages]
+                                       for t, pages
+                                       in parser.tag_index.items()}
+    # same order as all_files
+    assert tag_index == {'all': ['posts/page5.md', 'page4.md',
+                                 'posts/page3.md', 'page2.md',
+                                 'posts/page1.md', 'page0.md'],
+                         't0': ['posts/page6.md', 'posts/page3.md',
+                                'page0.md'],
+                         't1': ['page4.md', 'posts/page1.md'],
+                         't2': ['posts/page5.md', 'page2.md']}
+    assert parser.tag_counts == {'all': 6, 't0': 3, 't1': 2, 't2': 2}
+
+    # nothing is left from the previous parse
+    parser.files = files[:1]
+    parser.parse_files()
+    assert [t[0] for t in parser.all_tags] == ['all', 't0']
+    assert parser.tag_counts == {'all': 1, 't0': 1}
+
+
+def test_env_digests(tmp_site: Callable[[str], dict[str, Any]],
+                     monkeypatch: pytest.MonkeyPatch) -> None:
+    config: dict[str, Any] = tmp_site('site')
+    config['exts'] = {'pymdvar': {'variables': {'DEFINED': 'a'},
+                                  'enable_env': True}}
+    src: Path = Path(config['path']['src'])
+    (src/'page0.md').write_text('title: Page 0\n\n${PYSSG_VAR} ${DEFINED}\n')
+    dir_config: dict[str, Any] = dict(config['dirs']['/']['cfg'],
+                                      src=str(src),
+                                      dst=config['path']['dst'],
+                                      url=config['url']['main'])
+    monkeypatch.setenv('PYSSG_VAR', 'value')
+    monkeypatch.setenv('PYSSG_OTHER', 'value')
+
+    def parse() -> tuple[str, dict[str, str], str]:
+        parser: MDParser = MDParser(['page0.md', 'page2.md'], config,
+                                    dir_config,
+                                    Database(config['path']['db']))
+        parser.parse_files()
+        page0: Page = next(p for p in parser.all_files
+                           if p.name == 'page0.md')
+        return parser.md_fingerprint, parser.env_digests, page0.content
+
+    fingerprint, env_digests, content = parse()
+    assert content == '<p>value a</p>'
+    assert env_digests['page0.md'] != ''
+    # doesn't reference any
+    assert env_digests['page2.md'] == ''
+    # unrelated env vars don't change anything
+    monkeypatch.setenv('PYSSG_OTHER', 'other value')
+    assert parse() == (fingerprint, env_digests, content)
+    # only the file that uses it
+    monkeypatch.setenv('PYSSG_VAR', 'other value')
+    new_fingerprint, new_env_digests, _ = parse()
+    assert new_fingerprint == fingerprint
+    assert new_env_digests['page0.md'] != env_digests['page0.md']
+    assert new_env_digests['page2.md'] == ''
@@ -0,0 +1,65 @@
+import pytest
+from pyssg.pagination import Pagination, Feed, paginate, get_page_file_name
+
+
+@pytest.mark.parametrize('items, size, expected', [
+    ([1, 2, 3, 4, 5], 2, [[1, 2], [3, 4], [5]]),
+    ([1, 2, 3, 4], 2, [[1, 2], [3, 4]]),
+    ([1, 2, 3], 5, [[1, 2, 3]]),
+    ([1, 2, 3], 0, [[1, 2, 3]]),
+    ([], 2, [[]])
+])
+def test_paginate(items: list[int],
+                  size: int,
+                  expected: list[list[int]]) -> None:
+    assert paginate(items, size) == expected
+
+
+@pytest.mark.parametrize('base, ext, number, expected', [
+    ('index', '.html', 1, 'index.html'),
+    ('index', '.html', 2, 'index/2.html'),
+    ('rss', '.xml', 3, 'rss/3.xml'),
+    ('tag/@x', '.xml', 2, 'tag/@x/2.xml')
+])
+def test_get_page_file_name(base: str,
+                            ext: str,
+                            number: int,
+                            expected: str) -> None:
+    assert get_page_file_name(base, ext, number) == expected
+
+
+def test_pagination() -> None:
+    urls: list[str] = ['/index.html', '/index/2.html', '/index/3.html']
+    first: Pagination = Pagination([1, 2], 1, urls)
+    assert first.count == 3
+    assert first.url == '/index.html'
+    assert first.previous_url is None
+    assert first.next_url == '/index/2.html'
+    middle: Pagination = Pagination([3, 4], 2, urls)
+    assert middle.previous_url == '/index.html'
+    assert middle.next_url == '/index/3.html'
+    last: Pagination = Pagination([5], 3, urls)
+    assert last.previous_url == '/index/2.html'
+    assert last.next_url is None
+    assert last.first_url == '/index.html'
+    assert last.last_url == '/index/3.html'
+
+
+def test_pagination_single_page() -> None:
+    p: Pagination = Pagination([1], 1, ['/index.html'])
+    assert p.count == 1
+    assert p.previous_url is None
+    assert p.next_url is None
+
+
+def test_feed() -> None:
+    feed: Feed = Feed([1], 1, ['/tag/@x.xml'], True, ('x', '/tag/@x.html'))
+    assert feed.summary_only is True
+    assert feed.tag == ('x', '/tag/@x.html')
+    assert feed.url == '/tag/@x.xml'
+    assert Feed([1], 1, ['/rss.xml']).tag is None
+
+
+def test_pagination_str() -> None:
+    p: Pagination = Pagination([3], 2, ['/index.html', '/index/2.html'])
+    assert str(p) == '2/2 (/index/2.html)'
@@ -0,0 +1,101 @@
+import json
+from pathlib import Path
+from logging import INFO
+from pytest import LogCaptureFixture
+from pyssg.profiler import Profiler
+
+
+def test_profiler_disabled() -> None:
+    profiler: Profiler = Profiler()
+    with profiler.span('render', 'index.html'):
+        pass
+    assert profiler.events == []
+
+
+def test_profiler_span() -> None:
+    profiler: Profiler = Profiler()
+    profiler.enable()
+    with profiler.span('render', 'index.html', template='index.html'):
+        pass
+    with profiler.span('render', 'page.html', template='page.html'):
+        pass
+    with profiler.span('scan'):
+        pass
+    assert [e[:2] for e in profiler.events] == [('render', 'index.html'),
+                                                ('render', 'page.html'),
+                                                ('scan', '')]
+    assert profiler.events[0][6] == {'template': 'index.html'}
+    totals: dict[str, tuple[int, float]] = profiler.get_totals()
+    assert totals['render'][0] == 2
+    assert totals['scan'][0] == 1
+
+
+def test_profiler_span_exception() -> None:
+    profiler: Profiler = Profiler()
+    profiler.enable()
+    try:
+        with profiler.span('render', 'index.html'):
+            raise ValueError
+    except ValueError:
+        pass
+    assert len(profiler.events) == 1
+
+
+def test_profiler_get_top() -> None:
+    profiler: Profiler = Profiler()
+    profiler.extend([('render', 'a.html', 0.0, 1.0, 1, 1, {'template': 'p'}),
+                     ('render', 'b.html', 0.0, 3.0, 1, 1, {'template': 'p'}),
+                     ('render', 'c.html', 0.0, 2.0, 1, 1, {'template': 'i'}),
+                     ('md', 'a.md', 0.0, 5.0, 1, 1, {})])
+    assert profiler.get_top('render', 2) == [('b.html', 3.0),
+                                             ('c.html', 2.0)]
+    assert profiler.get_top('render', 10, 'template') == [('p', 4.0),
+                                                          ('i', 2.0)]
+    assert profiler.get_top('write') == []
+
+
+def test_profiler_pop_events() -> None:
+    profiler: Profiler = Profiler()
+    profiler.enable()
+    with profiler.span('md', 'a.md'):
+        pass
+    assert len(profiler.pop_events()) == 1
+    assert profiler.events == []
+
+
+def test_profiler_report(caplog: LogCaptureFixture) -> None:
+    profiler: Profiler = Profiler()
+    profiler.extend([('render', 'a.html', 0.0, 1.0, 1, 1, {'template': 'p'}),
+                     ('gc', '', 0.0, 0.5, 1, 1, {})])
+    caplog.set_level(INFO)
+    profiler.report(5)
+    messages: list[str] = [r[2] for r in caplog.record_tuples]
+    assert 'slowest 1 in "render":' in messages
+    assert 'slowest 1 templates:' in messages
+    # no per file events
+    assert 'slowest 1 in "gc":' not in messages
+
+
+def test_profiler_report_empty(caplog: LogCaptureFixture) -> None:
+    caplog.set_level(INFO)
+    Profiler().report()
+    assert caplog.record_tuples[-1] == ('pyssg.profiler',
+                                        INFO,
+                                        'no profiling data recorded')
+
+
+def test_profiler_write(tmp_path: Path) -> None:
+    profiler: Profiler = Profiler()
+    profiler.enable()
+    with profiler.span('render', 'index.html', template='index.html'):
+        pass
+    trace_path: Path = tmp_path/'trace.json'
+    profiler.write(str(trace_path))
+    trace: dict = json.loads(trace_path.read_text())
+    assert len(trace['traceEvents']) == 1
+    event: dict = trace['traceEvents'][0]
+    assert event['name'] == 'render index.html'
+    assert event['cat'] == 'render'
+    assert event['ph'] == 'X'
+    assert event['args'] == {'template': 'index.html'}
+    assert trace['otherData']['totals']['render']['count'] == 1
@@ -0,0 +1,34 @@
+from __future__ import annotations
+from typing import Any
+from logging import ERROR, INFO
+from pytest import LogCaptureFixture
+from pyssg.pyssg import _try_rebuild
+
+
+class FakeSiteBuilder:
+    def __init__(self, error: BaseException | None) -> None:
+        self.error: BaseException | None = error
+        self.builds: int = 0
+
+    def build(self) -> None:
+        self.builds += 1
+        if self.error is not None:
+            raise self.error
+
+
+def test_try_rebuild(caplog: LogCaptureFixture) -> None:
+    sb: Any = FakeSiteBuilder(None)
+    assert _try_rebuild([sb], {'a.md'}) is True
+    assert sb.builds == 1
+    assert caplog.record_tuples[-1] == ('pyssg.pyssg', INFO,
+                                        'finished rebuilding the html files')
+
+
+def test_try_rebuild_error(caplog: LogCaptureFixture) -> None:
+    err: tuple[str, int, str] = ('pyssg.pyssg', ERROR,
+                                 'couldn\'t rebuild the html files,'
+                                 ' waiting for changes')
+    for error in [ValueError('template typo'), SystemExit(1)]:
+        sb: Any = FakeSiteBuilder(error)
+        assert _try_rebuild([sb], {'a.md'}) is False
+        assert caplog.record_tuples[-1] == err
@@ -0,0 +1,95 @@
+import os
+from pathlib import Path
+from pyssg.scanner import DirScan, scan_dir
+
+
+def test_scan_dir(tmp_dir_structure: Path) -> None:
+    scan: DirScan = scan_dir(str(tmp_dir_structure))
+    assert sorted(scan.dirs) == ['first', 'first/f1', 'first/f1/f2',
+                                 'second', 'second/s1']
+    assert sorted(scan.get_files(('.md',))) == ['f0.md', 'first/f1.md',
+                                                'first/f1/f2.md',
+                                                'first/f1/f2/f3.md',
+                                                'second/f4.md',
+                                                'second/s1/f5.md']
+    st: os.stat_result = os.stat(tmp_dir_structure/'second/f4.md')
+    assert scan.stats['second/f4.md'].st_mtime_ns == st.st_mtime_ns
+
+
+def test_scan_dir_stats(tmp_dir_structure: Path) -> None:
+    (tmp_dir_structure/'image.png').write_bytes(b'')
+    (tmp_dir_structure/'broken.md').symlink_to(tmp_dir_structure/'missing')
+    scan: DirScan = scan_dir(str(tmp_dir_structure))
+    assert 'image.png' in scan.files
+    assert scan.stats == dict()
+    # only the files asked for are stat'd, the broken ones are left out
+    md_files: list[str] = scan.get_files(('.md',))
+    assert 'broken.md' not in md_files
+    assert sorted(scan.stats.keys()) == sorted(md_files)
+
+
+def test_scan_dir_walk_order(tmp_dir_structure: Path) -> None:
+    scan: DirScan = scan_dir(str(tmp_dir_structure))
+    walked: list[str] = []
+    for root, _, files in os.walk(tmp_dir_structure):
+        rel_root: str = os.path.relpath(root, tmp_dir_structure)
+        walked.extend(os.path.normpath(os.path.join(rel_root, f))
+                      for f in files)
+    assert list(scan.files.keys()) == walked
+
+
+def test_scan_dir_exclude(tmp_dir_structure: Path) -> None:
+    scan: DirScan = scan_dir(str(tmp_dir_structure), ['f1', 's1'])
+    assert sorted(scan.dirs) == ['first', 'second']
+    assert sorted(scan.get_files(('.md',))) == ['f0.md', 'first/f1.md',
+                                                'second/f4.md']
+
+
+def test_scan_dir_symlink(tmp_dir_structure: Path) -> None:
+    (tmp_dir_structure/'link').symlink_to(tmp_dir_structure/'second')
+    scan: DirScan = scan_dir(str(tmp_dir_structure))
+    # listed but not walked, same as os.walk
+    assert 'link' in scan.dirs
+    assert scan.links == {'link'}
+    assert 'link/f4.md' not in scan.files
+
+
+def test_scan_dir_missing(tmp_path: Path) -> None:
+    scan: DirScan = scan_dir(str(tmp_path/'missing'))
+    assert scan.dirs == []
+    assert scan.files == dict()
+
+
+def test_subtree(tmp_dir_structure: Path) -> None:
+    scan: DirScan = scan_dir(str(tmp_dir_structure))
+    subtree: DirScan = scan.get_subtree('first', ['f2'])
+    exp_subtree: DirScan = scan_dir(str(tmp_dir_structure/'first'), ['f2'])
+    assert subtree.path == exp_subtree.path
+    assert subtree.dirs == exp_subtree.dirs == ['f1']
+    assert list(subtree.files.keys()) == list(exp_subtree.files.keys())
+
+
+def test_subtree_root(tmp_dir_structure: Path) -> None:
+    scan: DirScan = scan_dir(str(tmp_dir_structure))
+    subtree: DirScan = scan.get_subtree('.', ['first'])
+    assert subtree.path == str(tmp_dir_structure)
+    assert sorted(subtree.dirs) == ['second', 'second/s1']
+
+
+def test_subtree_not_walked(tmp_dir_structure: Path) -> None:
+    scan: DirScan = scan_dir(str(tmp_dir_structure), ['first'])
+    subtree: DirScan = scan.get_subtree('first')
+    assert sorted(subtree.dirs) == ['f1', 'f1/f2']
+
+
+def test_subtree_exclude_paths(tmp_dir_structure: Path) -> None:
+    scan: DirScan = scan_dir(str(tmp_dir_structure))
+    subtree: DirScan = scan.get_subtree('', [], ['first/f1', 'second'])
+    assert subtree.dirs == ['first']
+    assert sorted(subtree.get_files(('.md',))) == ['f0.md', 'first/f1.md']
+
+
+def test_subtree_exclude_paths_not_walked(tmp_dir_structure: Path) -> None:
+    scan: DirScan = scan_dir(str(tmp_dir_structure), ['first'])
+    subtree: DirScan = scan.get_subtree('first', [], ['f1/f2'])
+    assert subtree.dirs == ['f1']
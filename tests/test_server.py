@@ -0,0 +1,88 @@
+import asyncio
+from pathlib import Path
+from pyssg.server import EVENTS_PATH, RELOAD_SCRIPT, Server, \
+    inject_reload_script
+
+
+def test_inject_reload_script() -> None:
+    content: bytes = b'<html><body><p>a</p></body></html>'
+    exp_content: bytes = b'<html><body><p>a</p>' + RELOAD_SCRIPT \
+        + b'</body></html>'
+    assert inject_reload_script(content) == exp_content
+
+
+def test_inject_reload_script_no_body() -> None:
+    assert inject_reload_script(b'<p>a</p>') == b'<p>a</p>' + RELOAD_SCRIPT
+
+
+def test_file_name(tmp_path: Path) -> None:
+    (tmp_path/'blog').mkdir()
+    server: Server = Server(str(tmp_path))
+    assert server.get_file_name('/') == 'index.html'
+    assert server.get_file_name('/blog') == 'blog/index.html'
+    assert server.get_file_name('/a%20b.html?q=1') == 'a b.html'
+    assert server.get_file_name('/../etc/passwd') is None
+
+
+def test_content_from_memory(tmp_path: Path) -> None:
+    (tmp_path/'a.html').write_bytes(b'disk')
+    server: Server = Server(str(tmp_path), {'a.html': b'memory'})
+    assert server.get_content('a.html') == b'memory'
+    server.outputs.clear()
+    assert server.get_content('a.html') == b'disk'
+    assert server.get_content('b.html') is None
+
+
+async def _request(port: int, path: str) -> bytes:
+    reader, writer = await asyncio.open_connection('localhost', port)
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode())
+    await writer.drain()
+    response: bytes = await reader.read()
+    writer.close()
+    return response
+
+
+def test_serve(tmp_path: Path) -> None:
+    (tmp_path/'index.html').write_bytes(b'<body>index</body>')
+    (tmp_path/'style.css').write_bytes(b'p {}')
+    server: Server = Server(str(tmp_path), port=0)
+
+    async def run() -> tuple[bytes, bytes, bytes]:
+        await server.start()
+        try:
+            return (await _request(server.port, '/'),
+                    await _request(server.port, '/style.css'),
+                    await _request(server.port, '/missing.html'))
+        finally:
+            await server.stop()
+
+    index, style, missing = asyncio.run(run())
+    assert index.startswith(b'HTTP/1.1 200 OK\r\n')
+    assert b'Content-Type: text/html\r\n' in index
+    assert index.endswith(b'<body>index' + RELOAD_SCRIPT + b'</body>')
+    assert b'Content-Type: text/css\r\n' in style
+    assert style.endswith(b'\r\n\r\np {}')
+    assert missing.startswith(b'HTTP/1.1 404 Not Found\r\n')
+
+
+def test_reload_event(tmp_path: Path) -> None:
+    server: Server = Server(str(tmp_path), port=0)
+
+    async def run() -> bytes:
+        await server.start()
+        reader, writer = await asyncio.open_connection('localhost',
+                                                       server.port)
+        try:
+            writer.write(f'GET {EVENTS_PATH} HTTP/1.1\r\n\r\n'.encode())
+            await writer.drain()
+            await reader.readuntil(b'\r\n\r\n')
+            # wait for the client to be registered
+            while not server.clients:
+                await asyncio.sleep(0.01)
+            server.reload()
+            return await reader.readuntil(b'\n\n')
+        finally:
+            writer.close()
+            await server.stop()
+
+    assert asyncio.run(run()) == b'data: reload\n\n'
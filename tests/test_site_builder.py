@@ -0,0 +1,119 @@
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable
+from pyssg.site_builder import SiteBuilder
+
+
+def get_tree(path: str) -> dict[str, bytes]:
+    tree: dict[str, bytes] = dict()
+    for root, _, files in os.walk(path):
+        for f in files:
+            file_path: str = os.path.join(root, f)
+            tree[os.path.relpath(file_path, path)] = \
+                Path(file_path).read_bytes()
+    return tree
+
+
+def test_build_jobs(tmp_site: Callable[[str], dict[str, Any]]) -> None:
+    serial_config: dict[str, Any] = tmp_site('serial')
+    parallel_config: dict[str, Any] = tmp_site('parallel')
+    serial: SiteBuilder = SiteBuilder(serial_config, 1)
+    parallel: SiteBuilder = SiteBuilder(parallel_config, 2)
+    serial.build()
+    parallel.build()
+
+    serial_tree: dict[str, bytes] = get_tree(serial_config['path']['dst'])
+    assert len(serial_tree) == 17
+    assert serial_tree == get_tree(parallel_config['path']['dst'])
+    assert Path(serial_config['path']['db']).read_text() == \
+        Path(parallel_config['path']['db']).read_text()
+    assert serial.manifest.e == parallel.manifest.e
+
+    serial_tag_index: dict[str, list[str]] = \
+        {t: [p.name for p in pages]
+         for t, pages in serial.builders[0].tag_index.items()}
+    parallel_tag_index: dict[str, list[str]] = \
+        {t: [p.name for p in pages]
+         for t, pages in parallel.builders[0].tag_index.items()}
+    assert serial_tag_index == parallel_tag_index
+
+
+def test_build_jobs_thread(tmp_site: Callable[[str], dict[str, Any]]) -> None:
+    serial_config: dict[str, Any] = tmp_site('serial')
+    thread_config: dict[str, Any] = tmp_site('thread')
+    SiteBuilder(serial_config, 1).build()
+    # like the serve mode rebuilds, the workers can't be forked from here
+    thread: threading.Thread = \
+        threading.Thread(target=SiteBuilder(thread_config, 2).build)
+    thread.start()
+    thread.join()
+    assert get_tree(serial_config['path']['dst']) == \
+        get_tree(thread_config['path']['dst'])
+
+
+def test_build_outputs(tmp_site: Callable[[str], dict[str, Any]]) -> None:
+    config: dict[str, Any] = tmp_site('site')
+    outputs: dict[str, bytes] = dict()
+    site_builder: SiteBuilder = SiteBuilder(config, 1, True, outputs=outputs)
+    # the first build is only written to disk
+    site_builder.build()
+    assert outputs == dict()
+    tree: dict[str, bytes] = get_tree(config['path']['dst'])
+    assert len(tree) == 17
+
+    # the files rendered again are kept in memory too
+    page: Path = Path(config['path']['src'])/'page0.md'
+    page.write_text(page.read_text().replace('Content', 'New content'))
+    site_builder.build()
+    assert set(outputs.keys()) == {'page0.html', 'posts/page1.html',
+                                   'index/2.html', 'tag/@t0.html',
+                                   'tag/@all/3.html', 'rss.xml',
+                                   'sitemap.xml'}
+    tree = get_tree(config['path']['dst'])
+    assert all(tree[f] == content for f, content in outputs.items())
+
+
+def test_build_html_files(tmp_site: Callable[[str], dict[str, Any]]) -> None:
+    config: dict[str, Any] = tmp_site('site')
+    site_builder: SiteBuilder = SiteBuilder(config)
+    site_builder.build()
+    src: Path = Path(config['path']['src'])/'static.html'
+    dst: Path = Path(config['path']['dst'])/'static.html'
+    assert dst.read_text() == '<p>static</p>\n'
+    src.write_text('<p>changed</p>\n')
+    site_builder.build()
+    assert dst.read_text() == '<p>changed</p>\n'
+    assert 'static.html' in site_builder.manifest.e
+
+
+def test_build_exclude_dirs(tmp_site: Callable[[str], dict[str, Any]]) -> None:
+    config: dict[str, Any] = tmp_site('site')
+    config['dirs']['/']['cfg']['exclude_dirs'] = ['drafts']
+    drafts: Path = Path(config['path']['src'])/'drafts'
+    drafts.mkdir()
+    (drafts/'draft.html').write_text('<p>draft</p>\n')
+    site_builder: SiteBuilder = SiteBuilder(config)
+    site_builder.build()
+    # excluded by the only dir_path, so not even scanned
+    assert 'drafts' not in site_builder.builders[0].dirs
+    assert 'drafts/draft.html' not in get_tree(config['path']['dst'])
+
+
+def test_build_shared_db(tmp_site: Callable[[str], dict[str, Any]]) -> None:
+    # two config documents with the same db (so the same manifest too)
+    full_config: dict[str, Any] = tmp_site('full')
+    root_config: dict[str, Any] = tmp_site('root')
+    root_config['path']['db'] = full_config['path']['db']
+    root_config['dirs']['/']['cfg']['exclude_dirs'] = ['posts']
+    full: SiteBuilder = SiteBuilder(full_config)
+    full.build()
+    SiteBuilder(root_config).build()
+    # excluded by the second one, but its source still exists
+    assert 'posts/page1.md' in SiteBuilder(full_config).db.e
+
+    full = SiteBuilder(full_config)
+    full.build()
+    assert full.manifest.written == 0
+    assert len(get_tree(full_config['path']['dst'])) == 17
+    assert 'posts/page1.html' not in get_tree(root_config['path']['dst'])
@@ -0,0 +1,85 @@
+import sqlite3
+from pathlib import Path
+from logging import INFO, WARNING
+from pytest import LogCaptureFixture
+from pyssg.database_entry import DatabaseEntry
+from pyssg.sqlite_database import SQLiteDatabase, is_sqlite_path
+
+
+def test_is_sqlite_path() -> None:
+    assert is_sqlite_path('/tmp/.files.sqlite') is True
+    assert is_sqlite_path('/tmp/db.sqlite3') is True
+    assert is_sqlite_path('/tmp/db.psv') is False
+
+
+def test_read_no_db(tmp_path: Path, caplog: LogCaptureFixture) -> None:
+    path: Path = tmp_path/'db.sqlite'
+    war: tuple[str, int, str] = ('pyssg.sqlite_database',
+                                 WARNING,
+                                 f'"{path}" doesn\'t exist, will be created '
+                                 'once process finishes, ignore if it\'s the '
+                                 'first run')
+    db: SQLiteDatabase = SQLiteDatabase(str(path))
+    db.read()
+    assert db.e == dict()
+    assert caplog.record_tuples[-1] == war
+
+
+def test_migrate(tmp_db: Path,
+                 tmp_db_e1: DatabaseEntry,
+                 tmp_db_e2: DatabaseEntry,
+                 caplog: LogCaptureFixture) -> None:
+    path: Path = tmp_db.with_name(f'{tmp_db.name}.sqlite')
+    inf: tuple[str, int, str] = ('pyssg.sqlite_database',
+                                 INFO,
+                                 f'migrating db "{tmp_db}" to "{path}"')
+    db: SQLiteDatabase = SQLiteDatabase(str(path))
+    db.read()
+    assert caplog.record_tuples[-1] == inf
+    db.write()
+    db2: SQLiteDatabase = SQLiteDatabase(str(path))
+    db2.read()
+    assert str(db2.e[tmp_db_e1.fname]) == str(tmp_db_e1)
+    assert str(db2.e[tmp_db_e2.fname]) == str(tmp_db_e2)
+
+
+def test_write_changed_only(tmp_db: Path,
+                            tmp_src_dir: Path) -> None:
+    path: Path = tmp_db.with_name(f'{tmp_db.name}.sqlite')
+    db: SQLiteDatabase = SQLiteDatabase(str(path))
+    db.read()
+    db.write()
+    db.update(f'{tmp_src_dir}/new.md', f'{tmp_src_dir}/')
+    db.update_tags('new.md', {'tag'})
+    assert db.dirty == {'new.md'}
+    db.write()
+    assert db.dirty == set()
+
+    db2: SQLiteDatabase = SQLiteDatabase(str(path))
+    db2.read()
+    assert set(db2.e.keys()) == {'first.md', 'a/second.md', 'new.md'}
+    assert db2.e['new.md'].tags == {'tag'}
+    assert db2.e['new.md'].stat == db.e['new.md'].stat
+
+
+def test_wal_mode(tmp_path: Path) -> None:
+    path: Path = tmp_path/'db.sqlite'
+    SQLiteDatabase(str(path)).write()
+    conn: sqlite3.Connection = sqlite3.connect(path)
+    assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    conn.close()
+
+
+def test_write_removed(tmp_db: Path,
+                       tmp_src_dir: Path) -> None:
+    path: Path = tmp_db.with_name(f'{tmp_db.name}.sqlite')
+    db: SQLiteDatabase = SQLiteDatabase(str(path))
+    db.read()
+    db.write()
+    db.update(f'{tmp_src_dir}/first.md', f'{tmp_src_dir}/')
+    (tmp_src_dir/'a/second.md').unlink()
+    db.prune([str(tmp_src_dir)])
+    db.write()
+    db2: SQLiteDatabase = SQLiteDatabase(str(path))
+    db2.read()
+    assert list(db2.e.keys()) == ['first.md']
@@ -0,0 +1,59 @@
+import sys
+import subprocess
+import pytest
+
+# only needed to build, watch or serve
+HEAVY_MODULES: list[str] = ['jinja2', 'markdown', 'yafg', 'pymdvar',
+                            'markdown_checklist', 'pymdownx', 'asyncio',
+                            'yaml', 'importlib.metadata']
+# for "import pyssg" in microseconds, it takes around a third of it on a
+#   slow machine, importing the builders alone takes more than this
+IMPORT_TIME_BUDGET: int = 200000
+
+
+def __run(code: str, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *args, '-c', code],
+                          capture_output=True,
+                          text=True,
+                          check=True)
+
+
+def __get_loaded_modules(code: str) -> list[str]:
+    result: subprocess.CompletedProcess = __run(
+        f'{code}\n'
+        'import sys\n'
+        f'print(",".join(m for m in {HEAVY_MODULES} if m in sys.modules))')
+    # the last line, pyssg logs to stdout too
+    lines: list[str] = result.stdout.splitlines()
+    return [m for m in lines[-1].split(',') if m in HEAVY_MODULES]
+
+
+def test_import_lazy() -> None:
+    assert __get_loaded_modules('import pyssg') == []
+
+
+@pytest.mark.parametrize('args, exp_modules', [
+    (['--version'], ['importlib.metadata']),
+    (['--copy-default-config', '--help'], [])
+])
+def test_cli_lazy(args: list[str], exp_modules: list[str]) -> None:
+    code: str = ('import sys\n'
+                 f'sys.argv = ["pyssg", *{args}]\n'
+                 'import pyssg\n'
+                 'try:\n'
+                 '    pyssg.main()\n'
+                 'except SystemExit:\n'
+                 '    pass')
+    assert __get_loaded_modules(code) == exp_modules
+
+
+def test_import_time() -> None:
+    result: subprocess.CompletedProcess = __run('import pyssg',
+                                                '-X', 'importtime')
+    # import time: self [us] | cumulative [us] | module
+    times: dict[str, int] = {line.split('|')[2].strip():
+                             int(line.split('|')[1])
+                             for line in result.stderr.splitlines()
+                             if line.startswith('import time:')
+                             and not line.endswith('package')}
+    assert times['pyssg'] < IMPORT_TIME_BUDGET
@@ -1,9 +1,12 @@
+import os
 import pytest
 from pytest import LogCaptureFixture
 from pathlib import Path
 from logging import INFO
 from pyssg.utils import (get_expanded_path, get_checksum, copy_file, create_dir,
-                         get_dir_structure, get_file_list)
+                         get_dir_structure, get_file_list,
+                         get_checksum_algorithm,
+                         atomic_open, fsync_files)
 
 
 # $PYSSG_HOME is the only env var set
@@ -40,6 +43,22 @@ def test_checksum(sample_files_path: str) -> None:
     assert checksum == simple_yaml_checksum
 
 
+def test_checksum_blake2b(sample_files_path: str) -> None:
+    path: str = f'{sample_files_path}/checksum.txt'
+    checksum: str = get_checksum(path, 'blake2b')
+    assert checksum.startswith('blake2b:')
+    assert len(checksum) == len('blake2b:') + 64
+    assert get_checksum_algorithm(checksum) == 'blake2b'
+    assert get_checksum_algorithm(get_checksum(path)) == 'md5'
+
+
+def test_checksum_unsupported(sample_files_path: str) -> None:
+    path: str = f'{sample_files_path}/checksum.txt'
+    with pytest.raises(SystemExit) as system_exit:
+        get_checksum(path, 'sha1')
+    assert system_exit.value.code == 1
+
+
 # TODO: actually check the existence of the files and not just the log
 def test_copy_file(tmp_path: Path, caplog: LogCaptureFixture) -> None:
     src: Path = tmp_path/'src'
@@ -74,6 +93,63 @@ def test_copy_file_already_exists(tmp_path: Path,
     assert caplog.record_tuples[-1] == inf
 
 
+def test_copy_file_stat(tmp_path: Path) -> None:
+    src_file: Path = tmp_path/'src.txt'
+    dst_file: Path = tmp_path/'dst.txt'
+    src_file.write_text('something')
+    os.utime(src_file, ns=(1_000_000_000, 2_000_000_000))
+    copy_file(str(src_file), str(dst_file), os.stat(src_file))
+    assert dst_file.read_text() == 'something'
+    assert os.stat(dst_file).st_mtime_ns == 2_000_000_000
+
+
+def test_copy_file_overwrite(tmp_path: Path) -> None:
+    src_file: Path = tmp_path/'src.txt'
+    dst_file: Path = tmp_path/'dst.txt'
+    src_file.write_text('something')
+    dst_file.write_text('some')
+    copy_file(str(src_file), str(dst_file))
+    assert dst_file.read_text() == 'some'
+    # as if a previous copy was interrupted
+    copy_file(str(src_file), str(dst_file), overwrite=True)
+    assert dst_file.read_text() == 'something'
+    # no tmp file left behind
+    assert sorted(os.listdir(tmp_path)) == ['dst.txt', 'src.txt']
+    # unchanged, not copied again
+    dst_st: os.stat_result = os.stat(dst_file)
+    copy_file(str(src_file), str(dst_file), overwrite=True)
+    assert os.stat(dst_file).st_ino == dst_st.st_ino
+
+
+def test_atomic_open(tmp_path: Path) -> None:
+    path: Path = tmp_path/'file.html'
+    path.write_text('old')
+    with atomic_open(str(path), 'w') as f:
+        f.write('new')
+        # not replaced until done
+        assert path.read_text() == 'old'
+    assert path.read_text() == 'new'
+    assert [p.name for p in tmp_path.iterdir()] == ['file.html']
+
+
+def test_atomic_open_failure(tmp_path: Path) -> None:
+    path: Path = tmp_path/'file.html'
+    path.write_text('old')
+    with pytest.raises(RuntimeError):
+        with atomic_open(str(path), 'w') as f:
+            f.write('new')
+            raise RuntimeError('interrupted')
+    assert path.read_text() == 'old'
+    assert [p.name for p in tmp_path.iterdir()] == ['file.html']
+
+
+def test_fsync_files(tmp_path: Path) -> None:
+    path: Path = tmp_path/'file.html'
+    path.write_text('content')
+    # missing files are ignored
+    fsync_files([str(path), str(tmp_path/'missing.html')])
+
+
 def test_create_dir(tmp_path: Path, caplog: LogCaptureFixture) -> None:
     path: Path = tmp_path/'new_dir'
     inf: tuple[str, int, str] = ('pyssg.utils',
@@ -0,0 +1,60 @@
+import os
+from pathlib import Path
+from pyssg.watcher import Snapshot, Watcher, get_changes, get_snapshot
+
+
+def test_snapshot(tmp_path: Path) -> None:
+    (tmp_path/'sub').mkdir()
+    (tmp_path/'a.md').write_text('a')
+    (tmp_path/'sub'/'b.md').write_text('bb')
+    snapshot: Snapshot = get_snapshot([str(tmp_path)])
+    assert sorted(snapshot.keys()) == [f'{tmp_path}/a.md',
+                                       f'{tmp_path}/sub/b.md']
+    assert snapshot[f'{tmp_path}/sub/b.md'][1] == 2
+
+
+def test_snapshot_exclude(tmp_path: Path) -> None:
+    (tmp_path/'dst').mkdir()
+    (tmp_path/'a.md').write_text('a')
+    (tmp_path/'dst'/'a.html').write_text('a')
+    snapshot: Snapshot = get_snapshot([str(tmp_path)],
+                                      [str(tmp_path/'dst')])
+    assert list(snapshot.keys()) == [f'{tmp_path}/a.md']
+
+
+def test_snapshot_missing_path(tmp_path: Path) -> None:
+    assert get_snapshot([str(tmp_path/'missing')]) == dict()
+
+
+def test_snapshot_broken_symlink(tmp_path: Path) -> None:
+    (tmp_path/'a.md').write_text('a')
+    (tmp_path/'b.md').symlink_to(tmp_path/'missing.md')
+    snapshot: Snapshot = get_snapshot([str(tmp_path)])
+    assert list(snapshot.keys()) == [f'{tmp_path}/a.md']
+
+
+def test_snapshot_symlink_loop(tmp_path: Path) -> None:
+    (tmp_path/'sub').mkdir()
+    (tmp_path/'sub'/'a.md').write_text('a')
+    (tmp_path/'sub'/'parent').symlink_to(tmp_path)
+    snapshot: Snapshot = get_snapshot([str(tmp_path)])
+    assert list(snapshot.keys()) == [f'{tmp_path}/sub/a.md']
+
+
+def test_changes() -> None:
+    old: Snapshot = {'a': (1, 1), 'b': (1, 1), 'c': (1, 1)}
+    new: Snapshot = {'a': (1, 1), 'b': (2, 1), 'd': (1, 1)}
+    assert get_changes(old, new) == {'b', 'c', 'd'}
+
+
+def test_watcher_poll(tmp_path: Path) -> None:
+    file_path: Path = tmp_path/'a.md'
+    file_path.write_text('a')
+    watcher: Watcher = Watcher([str(tmp_path)], debounce=0)
+    assert watcher.poll() == set()
+    file_path.write_text('changed')
+    # make sure the mtime differs even on coarse filesystems
+    os.utime(file_path, ns=(0, 0))
+    (tmp_path/'b.md').write_text('b')
+    assert watcher.poll() == {str(file_path), str(tmp_path/'b.md')}
+    assert watcher.poll() == set()